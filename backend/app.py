@@ -1,15 +1,28 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from config.config import create_app
-from routes.feedback_routes import feedback_bp
+from routes.feedback_routes import feedback_bp, feedback_buffer
 from routes.incidents_routes import incidents_bp
-from routes.enrichment_routes import enrichment_bp
-from routes.escape_routes import escape_routes_bp
-from auth_utils import verify_jwt_from_request
+from routes.enrichment_routes import enrichment_bp, news_cache, reddit_cache, weather_cache
+from routes.escape_routes import escape_routes_bp, tile_cache
+from auth_utils import get_jwt_cache_stats, verify_admin_from_request, verify_jwt_from_request
+from config.supabase_client import get_jwt_client_cache_stats
+from utils.breaker import get_breaker_states
+from utils.metrics import METRICS_ENABLED, http_request_duration, http_requests_in_flight, registry
+from utils.profiler import (PROFILE_FORMATS, PROFILE_REQUESTS, PROFILE_SLOW_MS, profile_store, profiler,
+                            to_collapsed, to_speedscope)
 from flask_cors import CORS
 from dotenv import load_dotenv
+import hmac
+import json
+import logging
 import os
+import time
 load_dotenv()
 
+# Per-request diagnostics are logged at DEBUG; set LOG_LEVEL=DEBUG to see them
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format="%(levelname)s %(name)s: %(message)s")
+logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per Supabase request otherwise
+
 # =====================================
 # 🔍 Verify External API Dependencies
 # =====================================
@@ -109,6 +122,9 @@ app.register_blueprint(incidents_bp)
 app.register_blueprint(enrichment_bp)
 app.register_blueprint(escape_routes_bp)
 
+# Replay feedback spooled by a previous run now rather than on the first submit
+feedback_buffer.start()
+
 # =====================================
 # 🔐 Global Auth Test Route
 # =====================================
@@ -140,6 +156,209 @@ def home():
     return jsonify({"message": "🚀 PhantomOps backend is live and operational!"}), 200
 
 
+# =====================================
+# 🩺 Health Check
+# =====================================
+@app.route('/api/health', methods=['GET'])
+def health():
+    """
+    Liveness plus the circuit-breaker state of every external provider.
+    Open breakers mean degraded (cached or partial) answers, not an outage.
+    """
+    providers = get_breaker_states()
+    degraded = any(state["state"] != "closed" for state in providers.values())
+    return jsonify({
+        "status": "degraded" if degraded else "ok",
+        "providers": providers
+    }), 200
+
+
+# =====================================
+# 📈 Request Metrics
+# =====================================
+# Every request is timed into a histogram labelled by blueprint, route
+# template (never the raw path), method and status class, and counted in an
+# in-flight gauge while it runs. /metrics serves them with the external-call
+# timings in the Prometheus text format to scrapes that send
+# "Authorization: Bearer <METRICS_TOKEN>". Without a token the endpoint
+# answers 404, so breaker, queue and latency data is never public by default.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+
+def _request_labels():
+    blueprint = request.blueprint or "app"
+    route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    return blueprint, route
+
+
+@app.before_request
+def start_request_timer():
+    if METRICS_ENABLED:
+        g.metrics_started = time.perf_counter()
+        g.metrics_blueprint = _request_labels()[0]
+        http_requests_in_flight.inc(g.metrics_blueprint)
+
+
+def _finish_request(status):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return
+    blueprint, route = _request_labels()
+    http_requests_in_flight.dec(g.metrics_blueprint)
+    http_request_duration.observe(time.perf_counter() - started, blueprint, route, request.method, f"{status // 100}xx")
+
+
+@app.after_request
+def record_request_metrics(response):
+    _finish_request(response.status_code)
+    return response
+
+
+@app.teardown_request
+def record_failed_request_metrics(error):
+    # Only still pending when the request raised before a response was built
+    _finish_request(500)
+
+
+def _collect_provider_state():
+    breakers = get_breaker_states()
+    stats = feedback_buffer.stats()
+    return [
+        ("phantomops_circuit_breaker_open", "gauge", "1 while a provider's circuit breaker is open or half-open.",
+         [({"breaker": name}, 0 if state["state"] == "closed" else 1) for name, state in breakers.items()]),
+        ("phantomops_feedback_queue_depth", "gauge", "Feedback rows accepted but not yet inserted.",
+         [({}, stats["depth"])]),
+        ("phantomops_feedback_flushed_total", "counter", "Feedback rows inserted by the write-behind flusher.",
+         [({}, stats["flushed"])]),
+    ]
+
+
+registry.register_collector(_collect_provider_state)
+
+
+def _collect_cache_stats():
+    caches = [
+        get_jwt_cache_stats(),
+        get_jwt_client_cache_stats(),
+        reddit_cache.stats(),
+        weather_cache.stats(),
+        news_cache.stats(),
+        tile_cache.stats(),
+    ]
+    return [
+        ("phantomops_cache_hits_total", "counter", "Lookups answered from an in-process cache.",
+         [({"cache": stats["name"]}, stats["hits"]) for stats in caches]),
+        ("phantomops_cache_misses_total", "counter", "Lookups that missed an in-process cache.",
+         [({"cache": stats["name"]}, stats["misses"]) for stats in caches]),
+        ("phantomops_cache_entries", "gauge", "Entries currently held by an in-process cache.",
+         [({"cache": stats["name"]}, stats["size"]) for stats in caches]),
+    ]
+
+
+registry.register_collector(_collect_cache_stats)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    if not METRICS_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    supplied = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+        return jsonify({"error": "Invalid metrics token"}), 401
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+# =====================================
+# 🔥 Request Profiling (opt-in)
+# =====================================
+# PROFILE_REQUESTS=1 samples every request and keeps those slower than
+# PROFILE_SLOW_MS. An admin can profile a single request instead by sending
+# "X-Profile: 1"; that profile is always kept and its id is returned in the
+# X-Profile-Id response header. Streamed bodies are profiled until the
+# response is returned, not until the stream ends.
+PROFILE_HEADER = "X-Profile"
+
+
+@app.before_request
+def start_request_profile():
+    forced = request.headers.get(PROFILE_HEADER) == "1"
+    if not (PROFILE_REQUESTS or forced):
+        return
+    if forced:
+        decoded, err, code = verify_admin_from_request()
+        forced = err is None
+        if not (PROFILE_REQUESTS or forced):
+            return  # non-admins are served normally, just not profiled
+    g.profile_session = profiler.start()
+    g.profile_forced = forced
+
+
+def _finish_profile(status):
+    session = g.pop("profile_session", None)
+    if session is None:
+        return None
+    duration = profiler.stop(session)
+    if not g.get("profile_forced") and duration * 1000 < PROFILE_SLOW_MS:
+        return None
+    profile = profile_store.add(
+        session, duration, profiler.interval,
+        method=request.method,
+        path=request.path,
+        route=request.url_rule.rule if request.url_rule is not None else None,
+        status=status,
+    )
+    print(f"🔥 Profiled {request.method} {request.path} ({profile['duration_ms']} ms, {profile['samples']} samples) as {profile['id']}")
+    return profile
+
+
+@app.after_request
+def record_request_profile(response):
+    profile = _finish_profile(response.status_code)
+    if profile is not None:
+        response.headers["X-Profile-Id"] = profile["id"]
+    return response
+
+
+@app.teardown_request
+def record_failed_request_profile(error):
+    _finish_profile(500)
+
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Captured request profiles, newest first (metadata only)."""
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+    return jsonify({"slow_ms": PROFILE_SLOW_MS, "always_on": PROFILE_REQUESTS, "profiles": profile_store.list()}), 200
+
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Download one profile: ?format=collapsed (default) or speedscope."""
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+
+    profile_format = request.args.get("format", "collapsed").lower()
+    if profile_format not in PROFILE_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(PROFILE_FORMATS)}"}), 400
+
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        return jsonify({"error": "Profile not found (the buffer keeps only the most recent ones)"}), 404
+
+    if profile_format == "speedscope":
+        body, extension = json.dumps(to_speedscope(profile)), "speedscope.json"
+    else:
+        body, extension = to_collapsed(profile), "collapsed.txt"
+    return Response(
+        body,
+        mimetype=PROFILE_FORMATS[profile_format],
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{extension}"'},
+    )
+
+
 # =====================================
 # ⚠️ Global Error Handlers
 # =====================================
@@ -1,7 +1,13 @@
+import hashlib
+import logging
 import os
+import time
 import jwt
 from flask import request, jsonify
 from dotenv import load_dotenv
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
 
 # ======================================================
 # ✅ Load environment variables from backend/.env safely
@@ -19,16 +25,45 @@ if not SUPABASE_URL:
 
 print(f"🔑 Loaded SUPABASE_ANON_KEY: {SUPABASE_JWT_SECRET[:25]}...")
 
+# ======================================================
+# 🧠 Verified-Token Cache
+# ======================================================
+# The same dashboard presents the same token dozens of times a minute, so
+# verified claims are cached (keyed by a SHA-256 of the token) until the
+# token's own `exp`. Invalid or expired tokens are never cached.
+JWT_CACHE_SIZE = int(os.getenv("JWT_CACHE_SIZE", "1024"))
+JWT_CACHE_MAX_TTL = int(os.getenv("JWT_CACHE_MAX_TTL", "3600"))  # seconds
+
+_verified_tokens = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=JWT_CACHE_MAX_TTL, name="verified_jwts")
+
+
+def get_jwt_cache_stats():
+    """Hit/miss counters for the verified-token cache."""
+    return _verified_tokens.stats()
+
+
 # ======================================================
 # 🔐 JWT Verification Function
 # ======================================================
-def verify_jwt_from_request():
-    """Verify Supabase JWT (HS256) from Authorization header"""
+def verify_jwt_from_request(allow_query_token=False):
+    """
+    Verify Supabase JWT (HS256) from Authorization header.
+    With allow_query_token=True, an `access_token` query parameter is accepted
+    as well, for browser EventSource streams that cannot send headers.
+    """
     auth_header = request.headers.get("Authorization", None)
+    if allow_query_token and not auth_header and request.args.get("access_token"):
+        auth_header = f"Bearer {request.args['access_token']}"
+
     if not auth_header or not auth_header.startswith("Bearer "):
         return None, jsonify({"error": "Missing or invalid Authorization header"}), 401
 
     token = auth_header.split(" ")[1]
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    decoded = _verified_tokens.get(cache_key)
+    if decoded is not None:
+        return decoded, None, 200
 
     try:
         decoded = jwt.decode(
@@ -38,13 +73,62 @@ def verify_jwt_from_request():
             options={"verify_aud": False}  # Supabase tokens may omit 'aud'
         )
 
-        print(f"✅ JWT verified for user: {decoded.get('email', 'unknown')}")
+        exp = decoded.get("exp")
+        ttl = JWT_CACHE_MAX_TTL if exp is None else min(JWT_CACHE_MAX_TTL, exp - time.time())
+        _verified_tokens.set(cache_key, decoded, ttl=ttl)
+
+        logger.debug("✅ JWT verified for user: %s", decoded.get("email", "unknown"))
         return decoded, None, 200
 
     except jwt.ExpiredSignatureError:
-        print("⚠️ Token expired")
+        logger.info("⚠️ Token expired")
         return None, jsonify({"error": "Token has expired"}), 401
 
     except jwt.InvalidTokenError as e:
-        print(f"❌ JWT verification failed: {e}")
+        logger.warning("❌ JWT verification failed: %s", e)
         return None, jsonify({"error": f"Invalid JWT: {str(e)}"}), 401
+
+
+# ======================================================
+# 👑 Admin Check (role from the users table)
+# ======================================================
+# Roles live in the `users` table, not in the JWT, so they are looked up with
+# the caller's own token (RLS applies) and cached briefly per user.
+USER_ROLE_CACHE_TTL = int(os.getenv("USER_ROLE_CACHE_TTL", "300"))  # seconds
+
+_user_roles = TTLCache(maxsize=JWT_CACHE_SIZE, ttl=USER_ROLE_CACHE_TTL, name="user_roles")
+
+
+def get_user_role(decoded, token=None):
+    """Role of the verified caller from the users table ("" when none is set)."""
+    user_id = decoded.get("sub")
+    role = _user_roles.get(user_id)
+    if role is not None:
+        return role
+
+    from config.supabase_client import get_supabase_for_jwt
+
+    if token is None:
+        auth_header = request.headers.get("Authorization", "")
+        token = auth_header.split(" ")[-1] if auth_header else request.args.get("access_token", "")
+    response = get_supabase_for_jwt(token).table("users").select("role").eq("id", user_id).limit(1).execute()
+    role = (response.data[0].get("role") if response.data else None) or ""
+    _user_roles.set(user_id, role)
+    return role
+
+
+def verify_admin_from_request():
+    """Like verify_jwt_from_request(), but also requires the admin role."""
+    decoded, err, code = verify_jwt_from_request()
+    if err:
+        return None, err, code
+
+    try:
+        role = get_user_role(decoded)
+    except Exception as e:
+        logger.warning("❌ Role lookup failed: %s", e)
+        return None, jsonify({"error": "Could not verify admin role"}), 503
+
+    if role != "admin":
+        return None, jsonify({"error": "Admin access required"}), 403
+    return decoded, None, 200
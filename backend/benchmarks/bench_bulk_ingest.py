@@ -0,0 +1,86 @@
+"""
+Incident ingest throughput: one POST /api/incidents per row vs. batched
+POST /api/incidents/bulk (JSON array and NDJSON), through the Flask app
+against a local PostgREST stand-in.
+
+Run from backend/:  python -m benchmarks.bench_bulk_ingest [rows] [batch_size]
+"""
+import json
+import os
+import random
+import sys
+import time
+import jwt
+
+from benchmarks.postgrest_stub import start_stub
+
+SECRET = "bench-secret-bench-secret-bench-secret!"
+server, base_url = start_stub()
+os.environ["SUPABASE_URL"] = base_url
+os.environ["SUPABASE_ANON_KEY"] = jwt.encode({"role": "anon"}, SECRET, algorithm="HS256")
+os.environ["SUPABASE_JWT_SECRET"] = SECRET
+os.environ["INCIDENT_DEDUP_WINDOW_SECONDS"] = "0"  # measure raw ingest
+os.environ["ENRICHMENT_PREFETCH_QUEUE_SIZE"] = "0"  # keep background enrichment out of the timing
+
+from app import app  # noqa: E402
+
+TOKEN = jwt.encode({"sub": "bench-user", "exp": int(time.time()) + 3600}, SECRET, algorithm="HS256")
+HEADERS = {"Authorization": f"Bearer {TOKEN}"}
+
+
+def make_rows(n, rng):
+    return [
+        {
+            "user_id": "bench-user",
+            "name": f"Incident {i}",
+            "description": "Synthetic incident",
+            "type": rng.choice(["fire", "accident", "flood", "other"]),
+            "latitude": rng.uniform(12.7, 13.2),
+            "longitude": rng.uniform(77.3, 77.8),
+            "severity": rng.randint(1, 5),
+        }
+        for i in range(n)
+    ]
+
+
+def timed(label, n, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {n:>6} rows  {elapsed:7.2f} s  {n / elapsed:9.0f} rows/s")
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    rows = make_rows(n, random.Random(3))
+    client = app.test_client()
+    single_n = min(n, 500)  # one request per row is slow; sample it
+
+    def single():
+        for row in rows[:single_n]:
+            assert client.post("/api/incidents", json=row, headers=HEADERS).status_code == 201
+
+    def bulk_json():
+        response = client.post(f"/api/incidents/bulk?batch_size={batch_size}", json=rows, headers=HEADERS)
+        assert response.status_code == 201, response.get_json()
+
+    def bulk_ndjson():
+        body = "\n".join(json.dumps(row) for row in rows)
+        response = client.post(
+            f"/api/incidents/bulk?batch_size={batch_size}", data=body,
+            headers=dict(HEADERS, **{"Content-Type": "application/x-ndjson"}),
+        )
+        assert response.status_code == 201, response.get_json()
+
+    single_time = timed("POST /api/incidents x row", single_n, single)
+    json_time = timed(f"bulk JSON (batch {batch_size})", n, bulk_json)
+    ndjson_time = timed(f"bulk NDJSON (batch {batch_size})", n, bulk_ndjson)
+    per_row = single_time / single_n
+    print(f"speedup vs single: JSON {per_row * n / json_time:.0f}x, NDJSON {per_row * n / ndjson_time:.0f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Scalar vs. vectorized haversine ranking: distances from one point to N
+candidates plus top-k selection, as used by the escape-route ranking.
+
+Run from backend/:  python -m benchmarks.bench_haversine [candidates] [k]
+"""
+import heapq
+import random
+import sys
+import time
+
+from utils.geo import haversine_km, haversine_many, nearest_k
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rng = random.Random(1)
+    latitudes = [rng.uniform(12.0, 13.0) for _ in range(n)]
+    longitudes = [rng.uniform(77.0, 78.0) for _ in range(n)]
+    origin = (12.5, 77.5)
+    repeat = max(1, 200_000 // n)
+
+    scalar_distances = timed(
+        lambda: [haversine_km(*origin, lat, lon) for lat, lon in zip(latitudes, longitudes)], repeat
+    )
+    vector_distances = timed(lambda: haversine_many(*origin, latitudes, longitudes), repeat)
+    scalar_top_k = timed(
+        lambda: heapq.nsmallest(k, ((haversine_km(*origin, lat, lon), i)
+                                    for i, (lat, lon) in enumerate(zip(latitudes, longitudes)))),
+        repeat,
+    )
+    vector_top_k = timed(lambda: nearest_k(*origin, latitudes, longitudes, k), repeat)
+
+    print(f"{n} candidates, top-{k}")
+    print(f"distances  scalar {scalar_distances * 1000:9.3f} ms   vectorized {vector_distances * 1000:9.3f} ms"
+          f"   ({scalar_distances / vector_distances:.1f}x)")
+    print(f"top-k      scalar {scalar_top_k * 1000:9.3f} ms   vectorized {vector_top_k * 1000:9.3f} ms"
+          f"   ({scalar_top_k / vector_top_k:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
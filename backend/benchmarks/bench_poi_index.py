@@ -0,0 +1,75 @@
+"""
+Offline POI index benchmark on a synthetic dataset (default 1,000,000 places).
+
+Measures index build, save/load, and per-query latency for the escape-route
+lookup (5 nearest per amenity type within 5 km), compared with a linear scan.
+
+Run from backend/:  python -m benchmarks.bench_poi_index [places] [queries]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from utils.geo import haversine_km
+from utils.poi_index import POI_TYPES, PoiIndex
+
+
+def synthetic_places(n, seed=42):
+    """Places clustered around a few hundred 'cities' so density looks urban."""
+    rng = random.Random(seed)
+    cities = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(500)]
+    for i in range(n):
+        lat, lon = rng.choice(cities)
+        yield (
+            POI_TYPES[i % len(POI_TYPES)],
+            max(-90.0, min(90.0, lat + rng.gauss(0, 0.3))),
+            (lon + rng.gauss(0, 0.3) + 180) % 360 - 180,
+            f"Place {i}",
+        )
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    rng = random.Random(7)
+
+    points = list(synthetic_places(n))
+
+    started = time.perf_counter()
+    index = PoiIndex.from_points(points)
+    print(f"build            {n:>9} places  {time.perf_counter() - started:8.2f} s")
+
+    path = os.path.join(tempfile.mkdtemp(), "pois.idx")
+    started = time.perf_counter()
+    index.save(path)
+    print(f"save             {os.path.getsize(path) / 1e6:>9.1f} MB      {time.perf_counter() - started:8.2f} s")
+
+    started = time.perf_counter()
+    index = PoiIndex.load(path)
+    print(f"load                                {time.perf_counter() - started:8.2f} s")
+
+    # Query near real places so most lookups have results
+    probes = [(lat + rng.gauss(0, 0.01), lon + rng.gauss(0, 0.01)) for _, lat, lon, _ in rng.sample(points, queries)]
+    started = time.perf_counter()
+    found = 0
+    for latitude, longitude in probes:
+        found += sum(len(v) for v in index.nearby(latitude, longitude, 5.0, 5).values())
+    elapsed = time.perf_counter() - started
+    print(f"nearby (3 types) {queries:>9} queries {elapsed * 1e6 / queries:8.1f} µs/query  ({found / queries:.1f} results/query)")
+
+    # Linear scan baseline over one type, on a handful of probes
+    scan_probes = probes[:5]
+    hospitals = [p for p in points if p[0] == "hospital"]
+    started = time.perf_counter()
+    for latitude, longitude in scan_probes:
+        sorted(
+            d for d in (haversine_km(latitude, longitude, lat, lon) for _, lat, lon, _ in hospitals) if d <= 5.0
+        )[:5]
+    elapsed = time.perf_counter() - started
+    print(f"linear scan (1 type) {len(scan_probes):>5} queries {elapsed * 1e6 / len(scan_probes):8.1f} µs/query")
+
+
+if __name__ == "__main__":
+    main()
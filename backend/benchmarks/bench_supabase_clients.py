@@ -0,0 +1,50 @@
+"""
+Per-request overhead of creating a Supabase client per request vs. the pooled
+per-JWT client cache, measured against a local PostgREST stand-in.
+
+Run from backend/:  python -m benchmarks.bench_supabase_clients [requests]
+"""
+import os
+import sys
+import time
+import jwt
+
+from benchmarks.postgrest_stub import start_stub
+
+server, base_url = start_stub()
+os.environ["SUPABASE_URL"] = base_url
+os.environ.setdefault("SUPABASE_ANON_KEY", jwt.encode({"role": "anon"}, "bench-secret", algorithm="HS256"))
+
+from supabase import create_client  # noqa: E402
+from config.supabase_client import get_supabase_for_jwt, get_jwt_client_cache_stats  # noqa: E402
+
+TOKEN = jwt.encode({"sub": "bench-user", "exp": int(time.time()) + 3600}, "bench-secret", algorithm="HS256")
+
+
+def per_request_client():
+    client = create_client(base_url, os.environ["SUPABASE_ANON_KEY"])
+    client.postgrest.auth(TOKEN)
+    return client.table("incidents").select("*").limit(1).execute()
+
+
+def pooled_client():
+    return get_supabase_for_jwt(TOKEN).table("incidents").select("*").limit(1).execute()
+
+
+def run(label, fn, n):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {n:>6} req  {elapsed * 1000 / n:8.3f} ms/req  {n / elapsed:9.1f} req/s")
+    return elapsed
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    before = run("create_client/request", per_request_client, n)
+    after = run("pooled per-JWT client", pooled_client, n)
+    print(f"speedup: {before / after:.1f}x")
+    print(f"cache: {get_jwt_client_cache_stats()}")
+    server.shutdown()
@@ -0,0 +1,67 @@
+"""
+Minimal local PostgREST stand-in used by the benchmarks.
+
+Serves /rest/v1/<table> over keep-alive HTTP/1.1 and keeps rows in memory,
+so client overhead can be measured without a network round-trip to Supabase.
+"""
+import itertools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _table(self):
+        path = urlparse(self.path).path
+        return path.rsplit("/", 1)[-1]
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        rows = self.server.tables.get(self._table(), [])
+        limit = int(query.get("limit", [len(rows)])[0])
+        self._send_json(rows[:limit])
+
+    def do_POST(self):
+        payload = self._read_json()
+        rows = payload if isinstance(payload, list) else [payload]
+        with self.server.lock:
+            stored = self.server.tables.setdefault(self._table(), [])
+            for row in rows:
+                row = dict(row, id=next(self.server.ids))
+                stored.append(row)
+            inserted = stored[-len(rows):]
+        self._send_json(inserted, status=201)
+
+    def do_PATCH(self):
+        self._read_json()
+        self._send_json([])
+
+
+def start_stub(host="127.0.0.1", port=0):
+    """Start the stand-in on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.tables = {}
+    server.ids = itertools.count(1)
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
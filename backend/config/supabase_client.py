@@ -1,6 +1,11 @@
+import hashlib
 import os
-from supabase import create_client
+import time
+import jwt
+from supabase import create_client, ClientOptions
 from dotenv import load_dotenv
+from utils.cache import TTLCache
+from utils.metrics import classify_exception, observe_external_call
 
 # ✅ Load environment variables from .env file
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
@@ -13,7 +18,126 @@ SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")  # Use anon key with RLS (more sec
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("❌ Missing Supabase credentials in environment variables! Please check your .env file.")
 
-# Initialize Supabase client
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+# =====================================
+# 🔁 Pooled Per-User (JWT) Clients
+# =====================================
+# Building a client per request means a new HTTP session, TLS handshake and
+# auth/postgrest/storage sub-clients every time. Clients are cached per token
+# (keyed by its SHA-256, never the raw token) until the token expires, and all
+# of them share one keep-alive connection pool when supabase-py supports it.
+# The module-level anon client uses the same pool, whose transport times every
+# round trip for /metrics.
+
+JWT_CLIENT_CACHE_SIZE = int(os.getenv("SUPABASE_JWT_CLIENT_CACHE_SIZE", "256"))
+JWT_CLIENT_CACHE_TTL = int(os.getenv("SUPABASE_JWT_CLIENT_CACHE_TTL", "900"))  # seconds
+
+_jwt_clients = TTLCache(maxsize=JWT_CLIENT_CACHE_SIZE, ttl=JWT_CLIENT_CACHE_TTL, name="supabase_jwt_clients")
+_shared_http_client = None
+
+
+def _timed_transport(transport):
+    """Wrap an httpx transport so every Supabase round trip lands in the external-call metrics."""
+    import httpx
+
+    class TimedTransport(httpx.BaseTransport):
+        def handle_request(self, request):
+            started = time.perf_counter()
+            try:
+                response = transport.handle_request(request)
+            except Exception as e:
+                observe_external_call("supabase", classify_exception(e), time.perf_counter() - started)
+                raise
+            # Time to response headers; PostgREST bodies are read right after
+            status = response.status_code
+            outcome = "success" if status < 400 else "client_error" if status < 500 else "server_error"
+            observe_external_call("supabase", outcome, time.perf_counter() - started)
+            return response
+
+        def close(self):
+            transport.close()
+
+    return TimedTransport()
+
+
+def _get_shared_http_client():
+    """Lazily create the keep-alive httpx pool shared by all per-user clients."""
+    global _shared_http_client
+    if _shared_http_client is None:
+        import httpx
+        limits = httpx.Limits(
+            max_connections=int(os.getenv("SUPABASE_HTTP_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("SUPABASE_HTTP_MAX_KEEPALIVE", "20")),
+        )
+        _shared_http_client = httpx.Client(
+            timeout=httpx.Timeout(120.0),
+            transport=_timed_transport(httpx.HTTPTransport(limits=limits)),
+        )
+    return _shared_http_client
+
+
+# Initialize Supabase client (on the shared, instrumented pool when supported)
+try:
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=_get_shared_http_client()))
+except TypeError:
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 print("✅ Supabase client initialized successfully")
 print(f"🔑 Loaded SUPABASE_KEY: {SUPABASE_KEY[:25]}..." if SUPABASE_KEY else "❌ No key loaded")
+
+# =====================================
+# 🛠️ Service-Role Client (server-side jobs only)
+# =====================================
+# Background work that must not depend on whichever user happens to be calling
+# (stored enrichment, cluster counters, ...) uses the service-role key, which
+# bypasses RLS. Never hand this client's results to a caller without an
+# authorization check. None when SUPABASE_SERVICE_ROLE_KEY is not set.
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+
+supabase_service = None
+if SUPABASE_SERVICE_ROLE_KEY:
+    try:
+        supabase_service = create_client(
+            SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, options=ClientOptions(httpx_client=_get_shared_http_client())
+        )
+    except TypeError:
+        supabase_service = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    print("✅ Supabase service-role client initialized")
+
+
+def _build_client_for_jwt(jwt_token):
+    """Create a Supabase client whose requests carry the user's JWT (for RLS)."""
+    headers = {"Authorization": f"Bearer {jwt_token}"}
+    try:
+        options = ClientOptions(headers=headers, httpx_client=_get_shared_http_client())
+    except TypeError:
+        # Older supabase-py without a pluggable httpx client
+        options = ClientOptions(headers=headers)
+
+    client = create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+    client.postgrest.auth(jwt_token)
+    return client
+
+
+def _seconds_until_expiry(jwt_token):
+    """Remaining lifetime of the token from its `exp` claim (signature is verified elsewhere)."""
+    try:
+        claims = jwt.decode(jwt_token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        return 0
+    exp = claims.get("exp")
+    if exp is None:
+        return JWT_CLIENT_CACHE_TTL
+    return min(JWT_CLIENT_CACHE_TTL, exp - time.time())
+
+
+def get_supabase_for_jwt(jwt_token):
+    """Return a cached Supabase client authenticated as the given JWT."""
+    key = hashlib.sha256(jwt_token.encode("utf-8")).hexdigest()
+    client = _jwt_clients.get(key)
+    if client is None:
+        client = _build_client_for_jwt(jwt_token)
+        _jwt_clients.set(key, client, ttl=_seconds_until_expiry(jwt_token))
+    return client
+
+
+def get_jwt_client_cache_stats():
+    return _jwt_clients.stats()
@@ -0,0 +1,10 @@
+-- Keyset pagination for GET /api/incidents orders by (created_at DESC, id DESC)
+-- and filters on status/type/severity; these indexes keep each page an index scan.
+create index if not exists incidents_created_at_id_idx
+    on public.incidents (created_at desc, id desc);
+
+create index if not exists incidents_status_created_at_id_idx
+    on public.incidents (status, created_at desc, id desc);
+
+create index if not exists incidents_user_id_created_at_id_idx
+    on public.incidents (user_id, created_at desc, id desc);
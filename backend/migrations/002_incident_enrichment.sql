@@ -0,0 +1,17 @@
+-- Optional store for pre-computed enrichment payloads (set ENRICHMENT_STORE_TABLE=incident_enrichment).
+-- The background pre-enrichment worker upserts one row per incident; /enrich reads it while fresh.
+create table if not exists public.incident_enrichment (
+    incident_id bigint primary key references public.incidents (id) on delete cascade,
+    payload     jsonb       not null,
+    fetched_at  timestamptz not null default now()
+);
+
+-- Only the backend writes payloads, with its service-role client (SUPABASE_SERVICE_ROLE_KEY,
+-- which bypasses RLS). There is deliberately no insert/update/delete policy: the anon key
+-- ships in the frontend, so anon/authenticated must not touch what /enrich serves.
+alter table public.incident_enrichment enable row level security;
+
+create policy "Authenticated users can read enrichment"
+    on public.incident_enrichment for select
+    to authenticated
+    using (true);
@@ -0,0 +1,11 @@
+-- GET /api/incidents/nearby and /api/incidents/bbox push a latitude/longitude
+-- range filter down to Postgres before ranking by haversine distance.
+-- Latitude leads the index: it is the more selective range for small radii.
+create index if not exists incidents_latitude_longitude_idx
+    on public.incidents (latitude, longitude)
+    where latitude is not null and longitude is not null;
+
+-- "Active incidents near me" is the common case; keep it to the open rows.
+create index if not exists incidents_active_latitude_longitude_idx
+    on public.incidents (latitude, longitude)
+    where status = 'active';
@@ -0,0 +1,33 @@
+-- Near-duplicate reports (same type, a few hundred meters apart, within minutes)
+-- are linked to the existing incident instead of inserted as new rows.
+alter table public.incidents
+    add column if not exists report_count integer not null default 1,
+    add column if not exists last_reported_at timestamptz;
+
+-- Atomic "+1" for POST /api/incidents. Duplicate reports usually come from
+-- *other* users, who cannot update the incident under RLS, so it runs with the
+-- owner's rights. It can do nothing else: only report_count / last_reported_at
+-- of an active incident change, and only the counters are returned (not the
+-- row, which the reporter may not be allowed to see).
+--
+-- Only the backend may call it (with SUPABASE_SERVICE_ROLE_KEY, after its own
+-- duplicate check): granted to authenticated, any user could bump any
+-- incident's count straight through /rpc/increment_incident_report_count.
+drop function if exists public.increment_incident_report_count(bigint);
+
+create function public.increment_incident_report_count(incident_id bigint)
+returns table (id bigint, report_count integer, last_reported_at timestamptz)
+language sql
+security definer
+set search_path = public, pg_temp
+as $$
+    update public.incidents as i
+       set report_count = i.report_count + 1,
+           last_reported_at = now()
+     where i.id = incident_id
+       and i.status = 'active'
+    returning i.id, i.report_count, i.last_reported_at;
+$$;
+
+revoke all on function public.increment_incident_report_count(bigint) from public, anon, authenticated;
+grant execute on function public.increment_incident_report_count(bigint) to service_role;
@@ -1,71 +1,131 @@
-from flask import Blueprint, jsonify
-from auth_utils import verify_jwt_from_request
-from config.supabase_client import supabase
-from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, jsonify, request, Response
+from auth_utils import get_jwt_cache_stats, verify_admin_from_request, verify_jwt_from_request
+from config.supabase_client import supabase, supabase_service
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
 from datetime import datetime, timedelta
+from utils.breaker import get_breaker
+from utils.cache import TTLCache
+from utils.http import get_http_session
+from utils.jobs import JobQueue
+from utils.profiler import profiler
+import calendar
+import json
 import os
+import threading
+from urllib.parse import urlparse
 
 enrichment_bp = Blueprint('enrichment_bp', __name__)
 
+# Reddit has no geo-search, so we search popular news/emergency subreddits
+REDDIT_SUBREDDITS = ['news', 'worldnews', 'emergencies', 'PublicFreakout']
+REDDIT_QUERY = 'emergency OR incident OR fire'
+
 # =====================================
 # 🔗 External Service Integration Functions
 # =====================================
 
+# =====================================
+# ♻️ Long-Lived Clients
+# =====================================
+# The Reddit clients (and their OAuth tokens) and the enrichment thread pool
+# are created once per worker instead of once per request. praw instances are
+# not thread-safe (session, rate limiter and auth state are shared), so each
+# reddit_executor thread builds and keeps its own client.
+
+ENRICHMENT_MAX_WORKERS = int(os.getenv("ENRICHMENT_MAX_WORKERS", "8"))
+enrichment_executor = ThreadPoolExecutor(max_workers=ENRICHMENT_MAX_WORKERS, thread_name_prefix="enrichment")
+
+# praw fixes its request timeout when a client is built, so Reddit keeps this
+# static timeout; its breaker only tracks outcomes (no adaptive timeout)
+REDDIT_TIMEOUT_SECONDS = float(os.getenv("REDDIT_TIMEOUT_SECONDS", "16"))
+
+_reddit_clients = threading.local()
+
+# Subreddit searches run in parallel on their own pool: fetch_reddit_posts
+# itself runs on enrichment_executor, so sharing it could deadlock
+reddit_executor = ThreadPoolExecutor(max_workers=len(REDDIT_SUBREDDITS), thread_name_prefix="reddit")
+
+# Per-provider circuit breakers (see utils/breaker.py); the ceilings are the old static timeouts
+weather_breaker = get_breaker("openweathermap", max_timeout=5.0)
+reddit_breaker = get_breaker("reddit", max_timeout=REDDIT_TIMEOUT_SECONDS)
+
+
+def reddit_configured():
+    """True when Reddit API credentials are set."""
+    return bool(os.getenv("REDDIT_CLIENT_ID") and os.getenv("REDDIT_CLIENT_SECRET"))
+
+
+def get_reddit_client():
+    """Return this thread's read-only Reddit client, or None if credentials are missing."""
+    client = getattr(_reddit_clients, "client", None)
+    if client is None:
+        import praw
+
+        # Check if credentials are configured
+        if not reddit_configured():
+            print("⚠️  Reddit API credentials not configured")
+            return None
+
+        client = _reddit_clients.client = praw.Reddit(
+            client_id=os.getenv("REDDIT_CLIENT_ID"),
+            client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+            user_agent=os.getenv("REDDIT_USER_AGENT"),
+            timeout=REDDIT_TIMEOUT_SECONDS,
+        )
+    return client
+
+
+def search_subreddit(subreddit_name):
+    """Search one subreddit for recent incident posts. Returns up to 2 Reddit posts."""
+    reddit = get_reddit_client()
+    if reddit is None:
+        return []
+
+    # The timeout is the client's (see REDDIT_TIMEOUT_SECONDS), so the breaker only tracks outcomes here.
+    # Listings are lazy, so the request happens while they are iterated.
+    with reddit_breaker.guard():
+        posts = list(reddit.subreddit(subreddit_name).search(REDDIT_QUERY, time_filter='day', limit=2))
+
+    return [
+        {
+            "id": post.id,
+            "username": f"u/{post.author.name}" if post.author else "u/[deleted]",
+            "text": post.title,
+            "created_at": datetime.fromtimestamp(post.created_utc).isoformat(),
+            "subreddit": f"r/{subreddit_name}",
+            "url": f"https://reddit.com{post.permalink}"
+        }
+        for post in posts
+    ]
+
+
 def fetch_reddit_posts(latitude, longitude):
     """
     Fetch Reddit posts from location-based subreddits near incident coordinates.
     Returns list of up to 5 Reddit posts.
     """
     try:
-        import praw
-        
-        # Get Reddit API credentials from environment
-        client_id = os.getenv("REDDIT_CLIENT_ID")
-        client_secret = os.getenv("REDDIT_CLIENT_SECRET")
-        user_agent = os.getenv("REDDIT_USER_AGENT")
-        
-        # Check if credentials are configured
-        if not client_id or not client_secret:
+        import praw  # checked here so a missing library is reported once
+
+        if not reddit_configured():
             print("⚠️  Reddit API credentials not configured")
             return []
         
-        # Initialize Reddit API client
-        reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent
-        )
-        
-        # Search for posts in relevant subreddits (news, local, emergency)
-        # Since Reddit doesn't have geo-search, we search popular subreddits
-        subreddits = ['news', 'worldnews', 'emergencies', 'PublicFreakout']
-        search_terms = ['emergency', 'incident', 'fire', 'accident', 'breaking']
-        
+        # All subreddits are searched at once; results are collected in
+        # configured order so the same posts win the 5 slots every time
+        futures = [
+            (subreddit_name, reddit_executor.submit(profiler.wrap(search_subreddit), subreddit_name))
+            for subreddit_name in REDDIT_SUBREDDITS
+        ]
         reddit_posts = []
-        
-        for subreddit_name in subreddits:
+        for subreddit_name, future in futures:
             try:
-                subreddit = reddit.subreddit(subreddit_name)
-                # Search for recent posts
-                for post in subreddit.search('emergency OR incident OR fire', time_filter='day', limit=2):
-                    if len(reddit_posts) >= 5:
-                        break
-                    
-                    reddit_post = {
-                        "id": post.id,
-                        "username": f"u/{post.author.name}" if post.author else "u/[deleted]",
-                        "text": post.title,
-                        "created_at": datetime.fromtimestamp(post.created_utc).isoformat(),
-                        "subreddit": f"r/{subreddit_name}",
-                        "url": f"https://reddit.com{post.permalink}"
-                    }
-                    reddit_posts.append(reddit_post)
-                
-                if len(reddit_posts) >= 5:
-                    break
+                reddit_posts.extend(future.result())
             except Exception as e:
+                # One failing subreddit should not hide the others
                 print(f"⚠️  Error fetching from r/{subreddit_name}: {str(e)}")
-                continue
+        reddit_posts = reddit_posts[:5]
         
         print(f"✅  Fetched {len(reddit_posts)} Reddit posts")
         return reddit_posts
@@ -84,8 +144,6 @@ def fetch_weather_data(latitude, longitude):
     Returns weather data object with temperature, conditions, etc.
     """
     try:
-        import requests
-        
         # Get OpenWeatherMap API key from environment
         api_key = os.getenv("OPENWEATHERMAP_API_KEY")
         
@@ -103,9 +161,10 @@ def fetch_weather_data(latitude, longitude):
             "units": "metric"  # Use Celsius
         }
         
-        # Make API request
-        response = requests.get(base_url, params=params, timeout=5)
-        response.raise_for_status()
+        # Make API request over the shared keep-alive session
+        with weather_breaker.guard() as timeout:
+            response = get_http_session().get(base_url, params=params, timeout=timeout)
+            response.raise_for_status()
         
         data = response.json()
         
@@ -125,71 +184,130 @@ def fetch_weather_data(latitude, longitude):
         print(f"✅  Fetched weather data for {data['name']}")
         return weather_data
         
-    except ImportError:
-        print("⚠️  requests library not installed")
-        return None
     except Exception as e:
         print(f"⚠️  Error fetching weather data: {str(e)}")
         return None
 
 
+# =====================================
+# 📰 RSS Feeds (conditional GET, parsed-feed cache)
+# =====================================
+# RSS_FEED_URL may list several feeds separated by commas. Each feed keeps its
+# last parsed entries with the ETag/Last-Modified validators it came with, so a
+# refetch is a conditional request and a 304 reuses the parsed entries instead
+# of downloading and re-parsing the whole document. Feeds are fetched in
+# parallel on their own small pool (enrichment tasks already run on
+# enrichment_executor, so sharing it could deadlock) and merged newest first.
+
+RSS_PLACEHOLDER_URL = "https://example.com/local-news-feed.rss"
+RSS_MAX_ITEMS = 5
+RSS_TIMEOUT_SECONDS = float(os.getenv("RSS_TIMEOUT_SECONDS", "10"))
+
+rss_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RSS_MAX_WORKERS", "4")), thread_name_prefix="rss"
+)
+
+_feed_state = {}  # url -> {"etag", "modified", "items"}
+_feed_state_lock = threading.Lock()
+
+
+def get_rss_feed_urls():
+    """Configured feed URLs (RSS_FEED_URL, comma-separated), without the .env placeholder."""
+    urls = [url.strip() for url in os.getenv("RSS_FEED_URL", "").split(",")]
+    return [url for url in urls if url and url != RSS_PLACEHOLDER_URL]
+
+
+def _entry_to_news_item(entry):
+    """Convert a feedparser entry into (sort_timestamp, NewsItem)."""
+    # Extract published date (try multiple fields for compatibility)
+    parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+    if parsed:
+        published = datetime(*parsed[:6]).isoformat()
+        timestamp = calendar.timegm(parsed)
+    else:
+        published = entry.get('published') or entry.get('updated') or datetime.utcnow().isoformat()
+        timestamp = 0  # undated entries sort last
+
+    news_item = {
+        "title": entry.get('title', 'No title'),
+        "link": entry.get('link', ''),
+        "published": published
+    }
+    return timestamp, news_item
+
+
+def fetch_feed(url):
+    """
+    Fetch one feed with a conditional GET and return its newest
+    (sort_timestamp, NewsItem) pairs. Unchanged feeds (304) reuse the entries
+    parsed last time; only a 200 response is parsed again.
+    """
+    import feedparser
+
+    with _feed_state_lock:
+        state = dict(_feed_state.get(url) or {})
+
+    headers = {}
+    if state.get("etag"):
+        headers["If-None-Match"] = state["etag"]
+    if state.get("modified"):
+        headers["If-Modified-Since"] = state["modified"]
+
+    breaker = get_breaker(f"rss:{urlparse(url).netloc}", max_timeout=RSS_TIMEOUT_SECONDS)
+    with breaker.guard() as timeout:
+        response = get_http_session().get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and "items" in state:
+            return state["items"]
+        response.raise_for_status()
+
+    feed = feedparser.parse(response.content, response_headers=dict(response.headers))
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"RSS feed parsing error: {feed.bozo_exception}")
+
+    items = [_entry_to_news_item(entry) for entry in feed.entries]
+    items.sort(key=lambda item: item[0], reverse=True)
+    items = items[:RSS_MAX_ITEMS]
+
+    with _feed_state_lock:
+        _feed_state[url] = {
+            "etag": response.headers.get("ETag"),
+            "modified": response.headers.get("Last-Modified"),
+            "items": items,
+        }
+    return items
+
+
 def fetch_news_items():
     """
-    Fetch and parse RSS feed for local news items.
-    Returns list of up to 5 NewsItem objects.
+    Fetch and parse the configured RSS feeds for local news items.
+    Returns list of up to 5 NewsItem objects, newest first across all feeds.
     """
     try:
-        import feedparser
-        
-        # Get RSS feed URL from environment
-        rss_url = os.getenv("RSS_FEED_URL")
-        
+        import feedparser  # checked here so a missing library is reported once
+
         # Check if RSS URL is configured
-        if not rss_url or rss_url == "https://example.com/local-news-feed.rss":
+        urls = get_rss_feed_urls()
+        if not urls:
             print("⚠️  RSS feed URL not configured")
             return []
-        
-        # Parse RSS feed
-        feed = feedparser.parse(rss_url)
-        
-        # Check if feed was successfully parsed
-        if feed.bozo:
-            print(f"⚠️  RSS feed parsing error: {feed.bozo_exception}")
-            return []
-        
-        # Extract news items
-        news_items = []
-        
-        for entry in feed.entries[:5]:  # Limit to 5 items
-            # Extract title
-            title = entry.get('title', 'No title')
-            
-            # Extract link
-            link = entry.get('link', '')
-            
-            # Extract published date (try multiple fields for compatibility)
-            published = None
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published = datetime(*entry.published_parsed[:6]).isoformat()
-            elif hasattr(entry, 'published'):
-                published = entry.published
-            elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                published = datetime(*entry.updated_parsed[:6]).isoformat()
-            elif hasattr(entry, 'updated'):
-                published = entry.updated
-            else:
-                published = datetime.utcnow().isoformat()
-            
-            news_item = {
-                "title": title,
-                "link": link,
-                "published": published
-            }
-            news_items.append(news_item)
-        
-        print(f"✅  Fetched {len(news_items)} news items from RSS feed")
+
+        # All feeds are in flight at once; results are collected in configured
+        # order so ties on the published date break the same way every time
+        futures = [(url, rss_executor.submit(profiler.wrap(fetch_feed), url)) for url in urls]
+        merged = []
+        for url, future in futures:
+            try:
+                merged.extend(future.result())
+            except Exception as e:
+                # One broken feed should not hide the others
+                print(f"⚠️  Error fetching RSS feed {url}: {str(e)}")
+
+        merged.sort(key=lambda item: item[0], reverse=True)
+        news_items = [news_item for _, news_item in merged[:RSS_MAX_ITEMS]]
+
+        print(f"✅  Fetched {len(news_items)} news items from {len(urls)} RSS feed(s)")
         return news_items
-        
+
     except ImportError:
         print("⚠️  feedparser library not installed")
         return []
@@ -198,6 +316,227 @@ def fetch_news_items():
         return []
 
 
+# =====================================
+# 🗃️ Per-Source Result Caches
+# =====================================
+# Every source is cached on its own key so different incidents share results:
+# weather by rounded coordinates, news by feed URL list, Reddit by search query.
+# Concurrent misses on the same key wait for one in-flight fetch. Expired
+# results are kept for ENRICHMENT_STALE_TTL more seconds and served when a
+# provider fails or its circuit breaker is open.
+
+WEATHER_COORD_PRECISION = int(os.getenv("ENRICHMENT_WEATHER_PRECISION", "2"))  # ~1.1 km
+ENRICHMENT_STALE_TTL = int(os.getenv("ENRICHMENT_STALE_TTL", "3600"))
+
+weather_cache = TTLCache(
+    maxsize=int(os.getenv("ENRICHMENT_WEATHER_CACHE_SIZE", "512")),
+    ttl=int(os.getenv("ENRICHMENT_WEATHER_CACHE_TTL", "600")),
+    name="weather",
+    stale_ttl=ENRICHMENT_STALE_TTL,
+)
+news_cache = TTLCache(
+    maxsize=int(os.getenv("ENRICHMENT_NEWS_CACHE_SIZE", "32")),
+    ttl=int(os.getenv("ENRICHMENT_NEWS_CACHE_TTL", "300")),
+    name="news",
+    stale_ttl=ENRICHMENT_STALE_TTL,
+)
+reddit_cache = TTLCache(
+    maxsize=int(os.getenv("ENRICHMENT_REDDIT_CACHE_SIZE", "32")),
+    ttl=int(os.getenv("ENRICHMENT_REDDIT_CACHE_TTL", "180")),
+    name="reddit",
+    stale_ttl=ENRICHMENT_STALE_TTL,
+)
+
+
+def get_reddit_posts(latitude, longitude, refresh=False):
+    """Cached fetch_reddit_posts(), keyed by the search query."""
+    key = (tuple(REDDIT_SUBREDDITS), REDDIT_QUERY)
+    return reddit_cache.get_or_load(
+        key, lambda: fetch_reddit_posts(latitude, longitude), refresh=refresh, cache_if=bool, serve_stale=True
+    )
+
+
+def get_weather_data(latitude, longitude, refresh=False):
+    """Cached fetch_weather_data(), keyed by coordinates rounded to WEATHER_COORD_PRECISION."""
+    key = (round(float(latitude), WEATHER_COORD_PRECISION), round(float(longitude), WEATHER_COORD_PRECISION))
+    return weather_cache.get_or_load(
+        key, lambda: fetch_weather_data(*key), refresh=refresh,
+        cache_if=lambda data: data is not None, serve_stale=True,
+    )
+
+
+def get_news_items(refresh=False):
+    """Cached fetch_news_items(), keyed by the configured feed URLs."""
+    key = ",".join(get_rss_feed_urls())
+    return news_cache.get_or_load(key, fetch_news_items, refresh=refresh, cache_if=bool, serve_stale=True)
+
+
+# =====================================
+# 🏃 Background Pre-Enrichment
+# =====================================
+# report_incident() enqueues new incidents so the first viewer of the panel
+# reads warm caches instead of paying for the external APIs. With
+# ENRICHMENT_STORE_TABLE set, the assembled payload is also upserted into that
+# table (see migrations/002_incident_enrichment.sql) so every worker can serve it.
+# The table is only writable by the service role (no write policy), so the store
+# needs SUPABASE_SERVICE_ROLE_KEY and stays off without it.
+
+ENRICHMENT_STORE_TABLE = os.getenv("ENRICHMENT_STORE_TABLE")
+if ENRICHMENT_STORE_TABLE and supabase_service is None:
+    print("⚠️  ENRICHMENT_STORE_TABLE needs SUPABASE_SERVICE_ROLE_KEY; stored enrichment disabled")
+    ENRICHMENT_STORE_TABLE = None
+ENRICHMENT_STORE_MAX_AGE = int(os.getenv("ENRICHMENT_STORE_MAX_AGE", "600"))  # seconds
+
+prefetch_queue = JobQueue(
+    "enrichment-prefetch",
+    workers=int(os.getenv("ENRICHMENT_PREFETCH_WORKERS", "2")),
+    maxsize=int(os.getenv("ENRICHMENT_PREFETCH_QUEUE_SIZE", "500")),
+    max_retries=int(os.getenv("ENRICHMENT_PREFETCH_RETRIES", "3")),
+)
+
+
+def prefetch_enrichment(payload):
+    """Job handler: warm every source cache for one incident and store the result."""
+    latitude, longitude = payload["latitude"], payload["longitude"]
+    # Use the cached loaders so concurrent panel opens join this fetch
+    result = {
+        "incident_id": payload["incident_id"],
+        "reddit_posts": get_reddit_posts(latitude, longitude),
+        "weather_data": get_weather_data(latitude, longitude),
+        "news_items": get_news_items(),
+        "errors": {},
+    }
+
+    # The fetchers swallow errors; a missing forecast with a configured key means a failed call
+    if result["weather_data"] is None and os.getenv("OPENWEATHERMAP_API_KEY"):
+        raise RuntimeError("weather fetch failed")
+
+    store_enrichment(payload["incident_id"], result)
+
+
+def store_enrichment(incident_id, result):
+    if not ENRICHMENT_STORE_TABLE:
+        return
+    supabase_service.table(ENRICHMENT_STORE_TABLE).upsert({
+        "incident_id": incident_id,
+        "payload": result,
+        "fetched_at": datetime.utcnow().isoformat(),
+    }).execute()
+
+
+def load_stored_enrichment(incident_id):
+    """Return a stored enrichment payload younger than ENRICHMENT_STORE_MAX_AGE, else None."""
+    if not ENRICHMENT_STORE_TABLE:
+        return None
+    try:
+        min_fetched_at = (datetime.utcnow() - timedelta(seconds=ENRICHMENT_STORE_MAX_AGE)).isoformat()
+        response = supabase_service.table(ENRICHMENT_STORE_TABLE).select("payload") \
+            .eq("incident_id", incident_id) \
+            .gte("fetched_at", min_fetched_at) \
+            .limit(1).execute()
+        return response.data[0]["payload"] if response.data else None
+    except Exception as e:
+        print(f"⚠️  Could not read stored enrichment: {str(e)}")
+        return None
+
+
+def enqueue_enrichment(incident):
+    """Queue pre-enrichment for a newly created incident (no-op without coordinates)."""
+    if incident.get("id") is None or incident.get("latitude") is None or incident.get("longitude") is None:
+        return False
+    accepted = prefetch_queue.enqueue("prefetch_enrichment", {
+        "incident_id": incident["id"],
+        "latitude": incident["latitude"],
+        "longitude": incident["longitude"],
+    })
+    if not accepted:
+        print(f"⚠️  Pre-enrichment queue full, skipping incident {incident['id']}")
+    return accepted
+
+
+prefetch_queue.register("prefetch_enrichment", prefetch_enrichment)
+
+
+@enrichment_bp.route('/api/enrichment/cache-stats', methods=['GET'])
+def enrichment_cache_stats():
+    """Hit/miss/coalescing counters for the enrichment caches, the pre-fetch queue and JWT verification."""
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+
+    return jsonify({
+        "reddit": reddit_cache.stats(),
+        "weather": weather_cache.stats(),
+        "news": news_cache.stats(),
+        "prefetch_queue": prefetch_queue.stats(),
+        "verified_jwts": get_jwt_cache_stats(),
+    }), 200
+
+
+# =====================================
+# ⏱️ Deadline & Streaming Helpers
+# =====================================
+
+ENRICHMENT_DEADLINE = float(os.getenv("ENRICHMENT_DEADLINE_SECONDS", "10"))
+
+# Source name -> (response key, value reported when the source fails)
+ENRICHMENT_SOURCES = {
+    "reddit": ("reddit_posts", []),
+    "weather": ("weather_data", None),
+    "news": ("news_items", []),
+}
+
+
+def submit_enrichment(latitude, longitude, refresh=False):
+    """Start every source on the shared pool; returns {future: source name}."""
+    return {
+        # profiler.wrap: a profiled request also samples the pool workers running its sources
+        enrichment_executor.submit(profiler.wrap(get_reddit_posts), latitude, longitude, refresh): "reddit",
+        enrichment_executor.submit(profiler.wrap(get_weather_data), latitude, longitude, refresh): "weather",
+        enrichment_executor.submit(profiler.wrap(get_news_items), refresh): "news",
+    }
+
+
+def stream_enrichment(incident_id, futures):
+    """
+    Yield one NDJSON line per source as soon as it finishes, e.g.
+    {"source": "weather", "key": "weather_data", "data": {...}}, then a final
+    {"done": true, "errors": {...}} line once all sources finished or the deadline passed.
+    """
+    errors = {}
+    try:
+        for future in as_completed(futures, timeout=ENRICHMENT_DEADLINE):
+            source = futures[future]
+            response_key, empty_value = ENRICHMENT_SOURCES[source]
+            line = {"source": source, "key": response_key}
+            try:
+                line["data"] = future.result()
+            except Exception as e:
+                errors[source] = line["error"] = str(e)
+                line["data"] = empty_value
+            yield json.dumps(line, default=str) + "\n"
+    except FuturesTimeoutError:
+        for future, source in futures.items():
+            if not future.done():
+                response_key, empty_value = ENRICHMENT_SOURCES[source]
+                errors[source] = f"Timed out after {ENRICHMENT_DEADLINE:g}s"
+                yield json.dumps({"source": source, "key": response_key, "data": empty_value,
+                                  "error": errors[source]}) + "\n"
+
+    yield json.dumps({"done": True, "incident_id": incident_id, "errors": errors}) + "\n"
+
+
+def stream_stored_enrichment(incident_id, stored):
+    """Same NDJSON lines as stream_enrichment(), all served from a pre-enriched payload."""
+    errors = stored.get("errors") or {}
+    for source, (response_key, empty_value) in ENRICHMENT_SOURCES.items():
+        line = {"source": source, "key": response_key, "data": stored.get(response_key, empty_value)}
+        if source in errors:
+            line["error"] = errors[source]
+        yield json.dumps(line, default=str) + "\n"
+    yield json.dumps({"done": True, "incident_id": incident_id, "errors": errors, "stored": True}) + "\n"
+
+
 # =====================================
 # 🎯 Main Enrichment Endpoint
 # =====================================
@@ -205,8 +544,10 @@ def fetch_news_items():
 @enrichment_bp.route('/api/incidents/<int:incident_id>/enrich', methods=['GET'])
 def enrich_incident(incident_id):
     """
-    Main enrichment endpoint that aggregates data from Twitter, Google Maps, and RSS feeds.
-    Protected with JWT authentication.
+    Main enrichment endpoint that aggregates data from Reddit, OpenWeatherMap, and RSS feeds.
+    Protected with JWT authentication. Pass ?refresh=1 to bypass the source caches,
+    or ?stream=ndjson to receive each source as soon as it is ready.
+    All sources share one deadline (ENRICHMENT_DEADLINE_SECONDS).
     """
     # Verify JWT authentication
     decoded, err, code = verify_jwt_from_request()
@@ -228,53 +569,50 @@ def enrich_incident(incident_id):
         if latitude is None or longitude is None:
             return jsonify({"error": "Incident missing geolocation data"}), 400
         
-        # Execute all three external service calls in parallel using ThreadPoolExecutor
-        errors = {
-            "twitter": None,
-            "traffic": None,
-            "news": None
-        }
-        
-        twitter_posts = []
-        traffic_map_url = None
-        news_items = []
-        
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            # Submit all tasks
-            reddit_future = executor.submit(fetch_reddit_posts, latitude, longitude)
-            weather_future = executor.submit(fetch_weather_data, latitude, longitude)
-            news_future = executor.submit(fetch_news_items)
-            
-            # Collect results with error handling
-            try:
-                reddit_posts = reddit_future.result(timeout=10)
-            except Exception as e:
-                errors["reddit"] = str(e)
-                print(f"⚠️  Reddit service failed: {str(e)}")
-            
-            try:
-                weather_data = weather_future.result(timeout=10)
-            except Exception as e:
-                errors["weather"] = str(e)
-                print(f"⚠️  Weather service failed: {str(e)}")
-            
+        refresh = request.args.get("refresh") in ("1", "true")
+        streaming = request.args.get("stream") == "ndjson"
+
+        # Pre-enriched by the background worker: just read it
+        stored = None if refresh else load_stored_enrichment(incident_id)
+        if stored is not None:
+            if streaming:
+                return Response(
+                    stream_stored_enrichment(incident_id, stored),
+                    mimetype="application/x-ndjson",
+                    headers={"Cache-Control": "no-cache"},
+                )
+            return jsonify(stored), 200
+
+        futures = submit_enrichment(latitude, longitude, refresh)
+
+        # Stream each source as it arrives: ?stream=ndjson
+        if streaming:
+            return Response(
+                stream_enrichment(incident_id, futures),
+                mimetype="application/x-ndjson",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+
+        # One deadline for the whole request; late sources keep running and fill the cache
+        done, _ = wait(futures, timeout=ENRICHMENT_DEADLINE)
+
+        response_data = {"incident_id": incident_id}
+        errors = {}
+        for future, source in futures.items():
+            response_key, empty_value = ENRICHMENT_SOURCES[source]
+            response_data[response_key] = empty_value
+            if future not in done:
+                errors[source] = f"Timed out after {ENRICHMENT_DEADLINE:g}s"
+                print(f"⏱️  {source} missed the enrichment deadline")
+                continue
             try:
-                news_items = news_future.result(timeout=10)
+                response_data[response_key] = future.result()
             except Exception as e:
-                errors["news"] = str(e)
-                print(f"⚠️  News service failed: {str(e)}")
-        
-        # Clean up errors object (remove None values)
-        errors = {k: v for k, v in errors.items() if v is not None}
-        
+                errors[source] = str(e)
+                print(f"⚠️  {source} service failed: {str(e)}")
+
         # Build response with partial data
-        response_data = {
-            "incident_id": incident_id,
-            "reddit_posts": reddit_posts,
-            "weather_data": weather_data,
-            "news_items": news_items,
-            "errors": errors if errors else {}
-        }
+        response_data["errors"] = errors
         
         print(f"✅  Enrichment completed for incident {incident_id}")
         return jsonify(response_data), 200
@@ -1,10 +1,30 @@
 from flask import Blueprint, jsonify, request
 from auth_utils import verify_jwt_from_request
+from utils.breaker import CircuitOpenError, get_breaker
+from utils.cache import TTLCache
+from utils.geo import geohash_bbox, geohash_encode, geohashes_covering, nearest_k
+from utils.http import get_http_session
+from utils.poi_index import load_index
+import json
 import os
+import tempfile
+import threading
+import time
 import requests
 
 escape_routes_bp = Blueprint('escape_routes_bp', __name__)
 
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+SEARCH_RADIUS_M = 5000  # Search within 5km radius
+MAX_PLACES_PER_TYPE = 5
+
+# OSM amenity tag -> key in the escape routes response
+PLACE_TYPES = {
+    "hospital": "hospitals",
+    "police": "police_stations",
+    "fire_station": "fire_stations",
+}
+
 @escape_routes_bp.route('/api/escape-routes', methods=['GET'])
 def get_escape_routes():
     """
@@ -34,11 +54,11 @@ def get_escape_routes():
         
         print(f"🔍 Searching for escape routes near ({latitude}, {longitude})")
         
-        # Get nearby places using OpenStreetMap Overpass API (free, no key needed)
+        # One Overpass round-trip covers hospitals, police and fire stations
+        places_by_type = fetch_all_nearby_places(latitude, longitude)
         escape_routes = {
-            "hospitals": fetch_nearby_places(latitude, longitude, "hospital"),
-            "police_stations": fetch_nearby_places(latitude, longitude, "police"),
-            "fire_stations": fetch_nearby_places(latitude, longitude, "fire_station"),
+            response_key: places_by_type[place_type]
+            for place_type, response_key in PLACE_TYPES.items()
         }
         
         # Log results
@@ -51,6 +71,12 @@ def get_escape_routes():
         
         return jsonify(escape_routes), 200
         
+    except CircuitOpenError as e:
+        print(f"🔌 {str(e)}")
+        response = jsonify({"error": "The mapping service is temporarily unavailable. Please try again shortly."})
+        response.headers["Retry-After"] = str(max(1, int(e.retry_after)))
+        return response, 503
+    
     except requests.exceptions.Timeout:
         print(f"⏱️ Timeout fetching escape routes")
         return jsonify({"error": "Request timed out. The mapping service is taking too long to respond. Please try again."}), 503
@@ -72,122 +98,347 @@ def get_escape_routes():
         return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
 
 
-def fetch_nearby_places(latitude, longitude, place_type):
-    """
-    Fetch nearby places using OpenStreetMap Overpass API (free, no API key needed).
-    Returns list of up to 5 nearby places.
-    """
+def element_to_place(element):
+    """Convert an Overpass element into a place dict, or None if it is unusable."""
     try:
-        # Map place types to OSM tags
-        osm_tags = {
-            "hospital": "amenity=hospital",
-            "police": "amenity=police",
-            "fire_station": "amenity=fire_station"
+        place_type = element.get("tags", {}).get("amenity")
+        if place_type not in PLACE_TYPES:
+            return None
+
+        # Get coordinates (center for ways, direct for nodes)
+        if element["type"] == "way" and "center" in element:
+            place_lat = element["center"]["lat"]
+            place_lon = element["center"]["lon"]
+        else:
+            place_lat = element.get("lat")
+            place_lon = element.get("lon")
+
+        # Skip if coordinates are missing
+        if place_lat is None or place_lon is None:
+            return None
+
+        # Get name
+        name = element.get("tags", {}).get("name", f"Unnamed {place_type.replace('_', ' ').title()}")
+
+        return {
+            "name": name,
+            "latitude": place_lat,
+            "longitude": place_lon,
+            "type": place_type
         }
-        
-        tag = osm_tags.get(place_type, "amenity=hospital")
-        
-        # Build Overpass API query
-        # Search within 5km radius
-        radius = 5000  # meters
-        overpass_url = "https://overpass-api.de/api/interpreter"
-        
-        query = f"""
-        [out:json];
-        (
-          node[{tag}](around:{radius},{latitude},{longitude});
-          way[{tag}](around:{radius},{latitude},{longitude});
-        );
-        out center 5;
-        """
-        
-        response = requests.post(overpass_url, data={"data": query}, timeout=15)
+
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        print(f"⚠️ Error processing Overpass element: {str(e)}")
+        return None
+
+
+def rank_places(places, latitude, longitude, radius_km=None, limit=MAX_PLACES_PER_TYPE):
+    """
+    Bucket places by type in one pass and keep the `limit` nearest per type.
+    Places farther than `radius_km` (when given) are dropped.
+    Returns {place_type: [places with distance_km]}.
+    """
+    places_by_type = {place_type: [] for place_type in PLACE_TYPES}
+    for place in places:
+        bucket = places_by_type.get(place["type"])
+        if bucket is not None:
+            bucket.append(place)
+
+    # Distances for each bucket are computed in one vectorized pass
+    for place_type, bucket in places_by_type.items():
+        indices, distances = nearest_k(
+            latitude, longitude,
+            [place["latitude"] for place in bucket],
+            [place["longitude"] for place in bucket],
+            limit, max_km=radius_km,
+        )
+        places_by_type[place_type] = [
+            dict(bucket[i], distance_km=round(distance, 2)) for i, distance in zip(indices, distances)
+        ]
+
+    return places_by_type
+
+
+def parse_overpass_elements(elements, latitude, longitude, limit=MAX_PLACES_PER_TYPE):
+    """Rank raw Overpass elements: {place_type: [`limit` nearest places]}."""
+    places = filter(None, (element_to_place(element) for element in elements))
+    return rank_places(places, latitude, longitude, limit=limit)
+
+
+# =====================================
+# 🧱 Geohash Tile Cache
+# =====================================
+# Nearby users differ only by GPS jitter, so amenities are fetched per
+# geohash tile (every tile touching the search radius) and cached. Any point
+# whose covering tiles are cached is answered from memory by re-ranking.
+# Expired tiles are kept for ESCAPE_ROUTES_TILE_STALE_TTL more seconds and
+# used when Overpass fails or its circuit breaker is open.
+
+TILE_PRECISION = int(os.getenv("ESCAPE_ROUTES_TILE_PRECISION", "5"))  # ~4.9 km cells
+TILE_CACHE_PATH = os.getenv("ESCAPE_ROUTES_TILE_CACHE_PATH")  # optional JSON snapshot
+TILE_CACHE_SAVE_DELAY = float(os.getenv("ESCAPE_ROUTES_TILE_CACHE_SAVE_DELAY", "30"))  # seconds
+# Cells shrink towards the poles; past this many tiles one radius query is cheaper
+MAX_TILES = int(os.getenv("ESCAPE_ROUTES_MAX_TILES", "64"))
+
+tile_cache = TTLCache(
+    maxsize=int(os.getenv("ESCAPE_ROUTES_TILE_CACHE_SIZE", "4096")),
+    ttl=int(os.getenv("ESCAPE_ROUTES_TILE_CACHE_TTL", "86400")),  # amenities rarely move
+    name="escape_route_tiles",
+    stale_ttl=int(os.getenv("ESCAPE_ROUTES_TILE_STALE_TTL", "604800")),
+)
+_tile_cache_file_lock = threading.Lock()
+_tile_cache_save_timer = None
+
+# Overpass queries vary a lot in cost, so the adaptive timeout never drops below 5s
+overpass_breaker = get_breaker("overpass", max_timeout=15.0, min_timeout=5.0)
+
+
+class OverpassResponseError(requests.exceptions.RequestException):
+    """Overpass answered, but not with the JSON structure we expect."""
+
+
+def query_overpass(query):
+    """POST one query to Overpass and return its elements list."""
+    with overpass_breaker.guard() as timeout:
+        response = get_http_session().post(OVERPASS_URL, data={"data": query}, timeout=timeout)
         response.raise_for_status()
-        
-        data = response.json()
-        
+
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise OverpassResponseError(f"Invalid Overpass response: {str(e)}")
+
         # Check if response has valid structure
         if not isinstance(data, dict) or "elements" not in data:
-            print(f"⚠️ Invalid response structure for {place_type}")
-            return []
-        
-        places = []
-        
-        for element in data.get("elements", [])[:5]:
-            try:
-                # Get coordinates (center for ways, direct for nodes)
-                if element["type"] == "way" and "center" in element:
-                    place_lat = element["center"]["lat"]
-                    place_lon = element["center"]["lon"]
-                else:
-                    place_lat = element.get("lat")
-                    place_lon = element.get("lon")
-                
-                # Skip if coordinates are missing
-                if place_lat is None or place_lon is None:
-                    continue
-                
-                # Get name
-                name = element.get("tags", {}).get("name", f"Unnamed {place_type.replace('_', ' ').title()}")
-                
-                # Calculate approximate distance
-                distance = calculate_distance(latitude, longitude, place_lat, place_lon)
-                
-                place = {
-                    "name": name,
-                    "latitude": place_lat,
-                    "longitude": place_lon,
-                    "distance_km": round(distance, 2),
-                    "type": place_type
-                }
-                places.append(place)
-            
-            except (KeyError, TypeError, ValueError) as e:
-                print(f"⚠️ Error processing element for {place_type}: {str(e)}")
-                continue
-        
-        # Sort by distance
-        places.sort(key=lambda x: x["distance_km"])
-        
-        print(f"✅ Found {len(places)} {place_type}(s)")
-        return places
-    
-    except requests.exceptions.Timeout:
-        print(f"⏱️ Timeout fetching {place_type}")
-        return []
-    
-    except requests.exceptions.RequestException as e:
-        print(f"⚠️ Network error fetching {place_type}: {str(e)}")
-        return []
-    
-    except Exception as e:
-        print(f"⚠️ Unexpected error fetching {place_type}: {str(e)}")
-        return []
+            raise OverpassResponseError("Invalid Overpass response structure")
+
+    return data["elements"]
 
 
-def calculate_distance(lat1, lon1, lat2, lon2):
+def build_tile_query(geohashes):
+    """Build one Overpass query fetching every safety amenity inside the given tiles."""
+    amenities = "|".join(PLACE_TYPES)
+    clauses = []
+    for geohash in sorted(geohashes):
+        south, west, north, east = geohash_bbox(geohash)
+        selector = f'["amenity"~"^({amenities})$"]({south},{west},{north},{east})'
+        clauses.append(f"node{selector};")
+        clauses.append(f"way{selector};")
+
+    body = "\n      ".join(clauses)
+    return f"""
+    [out:json];
+    (
+      {body}
+    );
+    out center;
     """
-    Calculate distance between two coordinates using Haversine formula.
-    Returns distance in kilometers.
+
+
+def fetch_tiles(geohashes):
     """
-    from math import radians, sin, cos, sqrt, atan2
-    
-    # Earth radius in kilometers
-    R = 6371.0
-    
-    # Convert to radians
-    lat1_rad = radians(lat1)
-    lon1_rad = radians(lon1)
-    lat2_rad = radians(lat2)
-    lon2_rad = radians(lon2)
-    
-    # Differences
-    dlat = lat2_rad - lat1_rad
-    dlon = lon2_rad - lon1_rad
-    
-    # Haversine formula
-    a = sin(dlat / 2)**2 + cos(lat1_rad) * cos(lat2_rad) * sin(dlon / 2)**2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    
-    distance = R * c
-    return distance
+    Fetch all amenities for the given tiles with a single Overpass request.
+    Returns {geohash: [places]}. Network errors (and CircuitOpenError while
+    Overpass is failing) propagate to the caller.
+    """
+    elements = query_overpass(build_tile_query(geohashes))
+
+    tiles = {geohash: [] for geohash in geohashes}
+    for element in elements:
+        place = element_to_place(element)
+        if place is None:
+            continue
+        # Ways are filed under the tile containing their center
+        geohash = geohash_encode(place["latitude"], place["longitude"], TILE_PRECISION)
+        if geohash in tiles:
+            tiles[geohash].append(place)
+
+    return tiles
+
+
+def load_tile_cache(path=TILE_CACHE_PATH):
+    """Warm the tile cache from its on-disk snapshot, skipping expired tiles."""
+    if not path or not os.path.exists(path):
+        return 0
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not load escape-route tile cache: {str(e)}")
+        return 0
+
+    now = time.time()
+    loaded = 0
+    for geohash, tile in snapshot.items():
+        remaining = tile_cache.ttl - (now - tile.get("fetched_at", 0))
+        if remaining > 0:
+            tile_cache.set(geohash, tile, ttl=remaining)
+            loaded += 1
+
+    print(f"✅ Loaded {loaded} escape-route tiles from {path}")
+    return loaded
+
+
+def save_tile_cache(path=TILE_CACHE_PATH):
+    """Atomically write the live tiles to disk so a restarted worker starts warm."""
+    if not path:
+        return
+
+    with _tile_cache_file_lock:
+        # Unique temp file: other workers may be saving the same snapshot right now
+        tmp_path = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=os.path.dirname(os.path.abspath(path)),
+                prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False,
+            ) as f:
+                tmp_path = f.name
+                json.dump(dict(tile_cache.items()), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not save escape-route tile cache: {str(e)}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def schedule_tile_cache_save():
+    """
+    Save the snapshot TILE_CACHE_SAVE_DELAY seconds from now, off the request
+    thread; misses in the meantime share that one write.
+    """
+    global _tile_cache_save_timer
+    if not TILE_CACHE_PATH:
+        return
+
+    def run():
+        global _tile_cache_save_timer
+        with _tile_cache_file_lock:
+            _tile_cache_save_timer = None
+        save_tile_cache()
+
+    with _tile_cache_file_lock:
+        if _tile_cache_save_timer is not None:
+            return
+        _tile_cache_save_timer = threading.Timer(TILE_CACHE_SAVE_DELAY, run)
+        _tile_cache_save_timer.daemon = True
+        _tile_cache_save_timer.start()
+
+
+def fetch_radius_places(latitude, longitude):
+    """
+    Uncached single `around:` query for points whose radius would span more
+    than MAX_TILES tiles (near the poles).
+    Returns {place_type: [up to 5 nearest places]}.
+    """
+    amenities = "|".join(PLACE_TYPES)
+    selector = f'["amenity"~"^({amenities})$"](around:{SEARCH_RADIUS_M},{latitude},{longitude})'
+    query = f"""
+    [out:json];
+    (
+      node{selector};
+      way{selector};
+    );
+    out center;
+    """
+    elements = query_overpass(query)
+    print(f"🧱 Escape-route radius query: {len(elements)} elements")
+    return parse_overpass_elements(elements, latitude, longitude)
+
+
+def fetch_overpass_places(latitude, longitude):
+    """
+    Find nearby hospitals, police and fire stations, served from the tile
+    cache when possible; missing tiles are fetched with one Overpass request.
+    Returns {place_type: [up to 5 nearest places]}.
+    """
+    radius_km = SEARCH_RADIUS_M / 1000
+    geohashes = geohashes_covering(latitude, longitude, radius_km, TILE_PRECISION, max_cells=MAX_TILES)
+    if geohashes is None:
+        return fetch_radius_places(latitude, longitude)
+
+    tiles = {}
+    missing = []
+    for geohash in geohashes:
+        tile = tile_cache.get(geohash)
+        if tile is None:
+            missing.append(geohash)
+        else:
+            tiles[geohash] = tile
+
+    if missing:
+        try:
+            fetched = fetch_tiles(missing)
+        except (CircuitOpenError, requests.exceptions.RequestException):
+            # Serve expired tiles rather than failing, as long as every missing tile has one
+            stale = {geohash: tile_cache.get_stale(geohash) for geohash in missing}
+            if not all(stale.values()):
+                raise
+            print(f"🧱 Overpass unavailable, serving {len(stale)} stale escape-route tiles")
+            tiles.update(stale)
+        else:
+            fetched_at = time.time()
+            for geohash, places in fetched.items():
+                tile = {"fetched_at": fetched_at, "places": places}
+                tile_cache.set(geohash, tile)
+                tiles[geohash] = tile
+            schedule_tile_cache_save()
+
+    print(f"🧱 Escape-route tiles: {len(geohashes) - len(missing)} cached, {len(missing)} fetched")
+
+    places = (place for tile in tiles.values() for place in tile["places"])
+    return rank_places(places, latitude, longitude, radius_km=radius_km)
+
+
+# =====================================
+# 🗺️ Offline POI Index Backend
+# =====================================
+# With POI_INDEX_PATH set, lookups are answered from a local KD-tree index
+# (see utils/poi_index.py) and Overpass is only a fallback.
+#   ESCAPE_ROUTES_BACKEND=auto     - local index, Overpass when it has nothing nearby (default with an index)
+#   ESCAPE_ROUTES_BACKEND=local    - local index only
+#   ESCAPE_ROUTES_BACKEND=overpass - Overpass only (default without an index)
+
+POI_INDEX_PATH = os.getenv("POI_INDEX_PATH")
+ESCAPE_ROUTES_BACKEND = os.getenv("ESCAPE_ROUTES_BACKEND", "auto" if POI_INDEX_PATH else "overpass").lower()
+
+_poi_index = None
+_poi_index_lock = threading.Lock()
+
+
+def get_poi_index():
+    """Load the offline POI index once per worker; returns None when unavailable."""
+    global _poi_index
+    if _poi_index is None and POI_INDEX_PATH and ESCAPE_ROUTES_BACKEND != "overpass":
+        with _poi_index_lock:
+            if _poi_index is None:
+                try:
+                    started = time.perf_counter()
+                    _poi_index = load_index(POI_INDEX_PATH)
+                    print(f"✅ Loaded {len(_poi_index)} places from POI index in {time.perf_counter() - started:.2f}s")
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Could not load POI index {POI_INDEX_PATH}: {str(e)}")
+    return _poi_index
+
+
+def fetch_all_nearby_places(latitude, longitude):
+    """
+    Find nearby hospitals, police and fire stations using the configured backend.
+    Returns {place_type: [up to 5 nearest places]}.
+    """
+    if ESCAPE_ROUTES_BACKEND in ("local", "auto"):
+        index = get_poi_index()
+        if index is not None:
+            places_by_type = index.nearby(latitude, longitude, SEARCH_RADIUS_M / 1000, MAX_PLACES_PER_TYPE)
+            if ESCAPE_ROUTES_BACKEND == "local" or any(places_by_type.values()):
+                return places_by_type
+            print("🗺️ No indexed places nearby, falling back to Overpass")
+        elif ESCAPE_ROUTES_BACKEND == "local":
+            print("⚠️ POI index unavailable and Overpass fallback disabled")
+            return {place_type: [] for place_type in PLACE_TYPES}
+
+    return fetch_overpass_places(latitude, longitude)
+
+
+# Start warm from the on-disk snapshot, if configured
+load_tile_cache()
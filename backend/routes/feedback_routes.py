@@ -1,37 +1,207 @@
 from flask import Blueprint, jsonify, request
+from auth_utils import verify_admin_from_request
 from config.supabase_client import supabase
+from utils.conditional import collection_etag, not_modified_response, with_etag
+from utils.export import export_response, iter_table_rows
+from utils.feedback_stats import RatingAggregates
+from utils.live_aggregate import LiveAggregate
+from utils.pubsub import broker
+from utils.writebehind import QueueFullError, WriteBehindBuffer
+from datetime import datetime
+import os
 
 feedback_bp = Blueprint("feedback", __name__)
 
 # ✅ GET all feedback
 @feedback_bp.route("/api/feedback", methods=["GET"])
 def get_feedback():
+    # Unchanged since the client's last poll: answer 304 without querying (shared broker only)
+    etag = collection_etag("feedback")
+    cached = not_modified_response(etag)
+    if cached is not None:
+        return cached
+
     try:
         response = supabase.table("feedback").select("*").order("created_at", desc=True).execute()
-        return jsonify(response.data), 200
+        return with_etag(jsonify(response.data), etag)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 📤 Export all feedback (streamed NDJSON / CSV, operators only)
+@feedback_bp.route("/api/feedback/export", methods=["GET"])
+def export_feedback():
+    """Stream the feedback table newest first; ?format=ndjson (default) or csv."""
+    # Rows carry submitter emails: admins only
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+
+    try:
+        export_format = request.args.get("format", "ndjson").lower()
+        return export_response(
+            iter_table_rows(lambda: supabase.table("feedback").select("*")),
+            export_format,
+            "feedback",
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# =====================================
+# ✍️ Write-Behind Feedback Ingestion
+# =====================================
+# Submissions are validated, spooled to FEEDBACK_SPOOL_PATH and acknowledged
+# with 202; utils/writebehind.py inserts them in batches in the background.
+# Set FEEDBACK_SPOOL_PATH to an empty value to buffer in memory only. The
+# spool is opened by app.py (feedback_buffer.start()) or the first submit,
+# so importing this blueprint touches no files.
+
+def insert_feedback_batch(rows):
+    """Flush callback: one bulk insert per batch, then bump the feedback version."""
+    response = supabase.table("feedback").insert(rows).execute()
+    # Bumps the feedback version so cached listings revalidate
+    try:
+        broker.publish("feedback", "insert", response.data)
+    except Exception as e:
+        print(f"⚠️ Failed to publish feedback event: {str(e)}")
+
+
+def is_rejected_row(error):
+    """Postgres refused the row itself (bad value, constraint, unknown column): retrying cannot help."""
+    code = str(getattr(error, "code", "") or "")
+    return code[:2] in ("22", "23", "42")
+
+
+FEEDBACK_TEXT_LIMITS = {"name": 200, "email": 320, "message": 5000}
+
+
+def validate_feedback(data):
+    """Return (row, None) for a storable submission, else (None, error message)."""
+    if not isinstance(data, dict):
+        return None, "Request body must be a JSON object"
+    if not all(data.get(field) for field in ("name", "email", "rating", "message")):
+        return None, "All fields are required"
+
+    row = {}
+    for field, limit in FEEDBACK_TEXT_LIMITS.items():
+        value = data[field]
+        if not isinstance(value, str) or not value.strip():
+            return None, f"{field} must be a non-empty string"
+        if len(value) > limit:
+            return None, f"{field} must be at most {limit} characters"
+        row[field] = value.strip()
+
+    # The form sends the number input's value as a string
+    rating = data["rating"]
+    if isinstance(rating, str) and rating.strip().isdigit():
+        rating = int(rating)
+    if isinstance(rating, bool) or not isinstance(rating, int) or not 1 <= rating <= 5:
+        return None, "rating must be an integer from 1 to 5"
+    row["rating"] = rating
+    return row, None
+
+
+# Relative spool paths resolve against backend/, not the working directory,
+# so a restart from anywhere finds the same spool
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SPOOL_PATH = os.getenv("FEEDBACK_SPOOL_PATH", os.path.join("data", "feedback_spool.ndjson"))
+if SPOOL_PATH:
+    SPOOL_PATH = os.path.normpath(os.path.join(BACKEND_DIR, SPOOL_PATH))
+
+feedback_buffer = WriteBehindBuffer(
+    "feedback",
+    insert_feedback_batch,
+    spool_path=SPOOL_PATH,
+    batch_size=int(os.getenv("FEEDBACK_BATCH_SIZE", "100")),
+    flush_seconds=float(os.getenv("FEEDBACK_FLUSH_SECONDS", "1.0")),
+    max_pending=int(os.getenv("FEEDBACK_MAX_PENDING", "10000")),
+    fsync=os.getenv("FEEDBACK_SPOOL_FSYNC", "0") == "1",
+    is_permanent=is_rejected_row,
+)
+
+
 # ✅ POST new feedback
 @feedback_bp.route("/api/feedback", methods=["POST"])
 def add_feedback():
-    data = request.get_json()
+    data = request.get_json(silent=True)
     try:
-        name = data.get("name")
-        email = data.get("email")
-        rating = data.get("rating")
-        message = data.get("message")
-
-        if not all([name, email, rating, message]):
-            return jsonify({"error": "All fields are required"}), 400
-
-        supabase.table("feedback").insert({
-            "name": name,
-            "email": email,
-            "rating": rating,
-            "message": message
-        }).execute()
-
-        return jsonify({"message": "Feedback added successfully ✅"}), 201
+        # Rows are acknowledged before they are written, so anything the
+        # table would reject has to be caught here
+        row, error = validate_feedback(data)
+        if error:
+            return jsonify({"error": error}), 400
+
+        # Stamped now, not at flush time, so listings keep submission order
+        row["created_at"] = datetime.utcnow().isoformat()
+        feedback_buffer.submit(row)
+
+        return jsonify({"message": "Feedback received ✅"}), 202
+    except QueueFullError:
+        return jsonify({"error": "Too much feedback right now, please try again shortly"}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 📊 Write-behind queue depth and flush latency
+@feedback_bp.route("/api/feedback/ingest-stats", methods=["GET"])
+def feedback_ingest_stats():
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+    return jsonify(feedback_buffer.stats()), 200
+
+
+# =====================================
+# ⭐ Feedback Rating Stats
+# =====================================
+# Aggregates live in memory (utils/feedback_stats.py), loaded once per worker
+# and kept current from the feedback change feed (every flushed batch is
+# published there) by utils/live_aggregate.py, so /api/feedback/stats never
+# scans the table.
+STATS_FIELDS = "id,rating,created_at"
+STATS_MAX_DAYS = 365
+
+feedback_aggregates = RatingAggregates()
+
+
+def load_feedback_aggregates(client=None):
+    """(Re)build the rating aggregates from the feedback table, folding in one keyset page at a time."""
+    count = feedback_aggregates.rebuild(iter_table_rows(lambda: supabase.table("feedback").select(STATS_FIELDS)))
+    print(f"⭐ Loaded {count} feedback rows into the rating aggregates")
+
+
+def apply_feedback_change(event):
+    """Fold one feedback change event (a row or a flushed batch) into the aggregates."""
+    if event["type"] == "insert":
+        rows = event["data"] if isinstance(event["data"], list) else [event["data"]]
+        for row in rows:
+            feedback_aggregates.add(row)
+
+
+live_feedback_aggregates = LiveAggregate(
+    "feedback-stats", "feedback", load_feedback_aggregates, apply_feedback_change,
+)
+
+
+@feedback_bp.route("/api/feedback/stats", methods=["GET"])
+def get_feedback_stats():
+    """
+    Rating count, mean and histogram, 1/7/30-day trends against the window
+    before, and a daily series. Query params: days - length of the daily
+    series (default 30, max 365).
+    """
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+
+    try:
+        try:
+            days = max(1, min(int(request.args.get("days", "30")), STATS_MAX_DAYS))
+        except ValueError:
+            return jsonify({"error": "days must be an integer"}), 400
+
+        live_feedback_aggregates.ensure()
+        return jsonify(feedback_aggregates.summary(days=days)), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
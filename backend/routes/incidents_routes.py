@@ -1,28 +1,111 @@
-from flask import Blueprint, request, jsonify
-from config.supabase_client import supabase
-from auth_utils import verify_jwt_from_request
-from datetime import datetime
+from flask import Blueprint, request, jsonify, Response
+from config.supabase_client import supabase, supabase_service, get_supabase_for_jwt
+from auth_utils import get_user_role, verify_admin_from_request, verify_jwt_from_request
+from routes.enrichment_routes import enqueue_enrichment
+from utils.pagination import MAX_PAGE_SIZE, fetch_page, normalize_timestamp, parse_limit
+from utils.pubsub import broker
+from utils.conditional import collection_etag, not_modified_response, with_etag
+from utils.dedup import RecentIncidentIndex
+from utils.export import export_response, iter_table_rows
+from utils.clusters import MAX_PRECISION, IncidentClusters, precision_for_zoom
+from utils.live_aggregate import LiveAggregate
+from utils.geo import nearest_k, radius_bbox
+from datetime import datetime, timedelta
+import json
 import os
-from supabase import create_client, Client
+import time
 
 incidents_bp = Blueprint('incidents_bp', __name__)
 
 def get_supabase_with_jwt():
-    """Create a Supabase client with the user's JWT token for RLS"""
+    """Return a pooled Supabase client carrying the user's JWT token for RLS"""
     auth_header = request.headers.get("Authorization", "")
     if auth_header.startswith("Bearer "):
         jwt_token = auth_header.split(" ")[1]
-        # Create a new client with custom headers including JWT
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_ANON_KEY")
-        
-        # Create client and manually set auth header
-        client: Client = create_client(url, key)
-        # Override the postgrest client headers to include JWT
-        client.postgrest.auth(jwt_token)
-        return client
+        # Reuses the cached client (and its open connections) for this token
+        return get_supabase_for_jwt(jwt_token)
     return supabase  # Fallback to default client
 
+
+def publish_linked_incident(incident_id):
+    """Publish the full row after a report-count bump (the RPC only returns the counters)."""
+    if supabase_service is None:
+        return  # subscribers pick the new count up on their next refetch
+    try:
+        response = supabase_service.table("incidents").select("*").eq("id", incident_id).limit(1).execute()
+        publish_incident_changes("update", response.data)
+    except Exception as e:
+        print(f"⚠️ Failed to publish linked incident {incident_id}: {str(e)}")
+
+
+def publish_incident_changes(event_type, rows):
+    """Publish one change event per written row to /api/incidents/stream subscribers."""
+    for row in rows or []:
+        try:
+            broker.publish("incidents", event_type, row)
+        except Exception as e:
+            # The write already succeeded; streams recover with a full refetch on reset
+            print(f"⚠️ Failed to publish incident {event_type} event: {str(e)}")
+
+# 🧲 Near-duplicate detection
+# Reports of the same type within INCIDENT_DEDUP_RADIUS_M of an active incident
+# reported in the last INCIDENT_DEDUP_WINDOW_SECONDS bump its report_count
+# (migrations/004) instead of inserting a new row. The bump needs
+# SUPABASE_SERVICE_ROLE_KEY; set the window to 0 to disable.
+recent_incidents = RecentIncidentIndex(
+    window_seconds=float(os.getenv("INCIDENT_DEDUP_WINDOW_SECONDS", "900")),
+    radius_km=float(os.getenv("INCIDENT_DEDUP_RADIUS_M", "300")) / 1000,
+)
+
+
+def incident_location(incident):
+    """(latitude, longitude) as floats, or None when missing or malformed."""
+    try:
+        return float(incident["latitude"]), float(incident["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def remember_incidents(rows):
+    """Make freshly inserted active incidents match targets for later reports."""
+    for row in rows or []:
+        location = incident_location(row)
+        if location is not None and row.get("status", "active") == "active":
+            recent_incidents.add(row["id"], row.get("type"), *location)
+
+
+def find_duplicate_incident(incident_data):
+    """Id of a recent active incident this report duplicates, or None."""
+    if supabase_service is None or not recent_incidents.enabled or incident_data["status"] != "active":
+        return None
+    location = incident_location(incident_data)
+    if location is None:
+        return None
+    return recent_incidents.match(incident_data["type"], *location)
+
+
+def build_incident(data, created_at=None):
+    """Map a request payload onto the incidents columns (explicit mapping for safety)."""
+    return {
+        "user_id": data.get("user_id"),
+        "name": data.get("name"),
+        "type": data.get("type", "other"),
+        "description": data.get("description"),
+        "latitude": data.get("latitude"),
+        "longitude": data.get("longitude"),
+        "severity": data.get("severity", 3),
+        "status": data.get("status", "active"),
+        "created_at": created_at or datetime.utcnow().isoformat()
+    }
+
+
+def missing_incident_fields(incident_data):
+    """Error message when a critical field is missing, else None."""
+    if not incident_data["user_id"] or not incident_data["name"] or not incident_data["description"]:
+        return "Missing required fields (user_id, name, or description)."
+    return None
+
+
 # 🧾 Report a new incident
 @incidents_bp.route('/api/incidents', methods=['POST'])
 def report_incident():
@@ -33,27 +116,47 @@ def report_incident():
     
     try:
         data = request.get_json(force=True)
-
-        # Explicit mapping for safety
-        incident_data = {
-            "user_id": data.get("user_id"),
-            "name": data.get("name"),
-            "type": data.get("type", "other"),
-            "description": data.get("description"),
-            "latitude": data.get("latitude"),
-            "longitude": data.get("longitude"),
-            "severity": data.get("severity", 3),
-            "status": data.get("status", "active"),
-            "created_at": datetime.utcnow().isoformat()
-        }
+        incident_data = build_incident(data)
 
         # Validation for critical fields
-        if not incident_data["user_id"] or not incident_data["name"] or not incident_data["description"]:
-            return jsonify({"error": "Missing required fields (user_id, name, or description)."}), 400
+        error = missing_incident_fields(incident_data)
+        if error:
+            return jsonify({"error": error}), 400
 
         # Use Supabase client with JWT token for RLS
         supabase_with_jwt = get_supabase_with_jwt()
+
+        duplicate_of = find_duplicate_incident(incident_data)
+        if duplicate_of is not None:
+            # Service role only (migrations/004): works on other users' incidents,
+            # returns only the counters
+            try:
+                response = supabase_service.rpc(
+                    "increment_incident_report_count", {"incident_id": duplicate_of}
+                ).execute()
+                linked = response.data
+            except Exception as e:
+                print(f"⚠️ Could not link duplicate report to incident {duplicate_of}: {str(e)}")
+                linked = None  # unknown state: keep it in the index, just insert this one
+
+            if linked:
+                recent_incidents.touch(duplicate_of)
+                publish_linked_incident(duplicate_of)
+                return jsonify({
+                    "message": "✅ Incident already reported nearby; your report was added to it",
+                    "data": linked,
+                    "duplicate_of": duplicate_of
+                }), 200
+            if linked is not None:
+                # No longer active (resolved or deleted): report it as a new incident
+                recent_incidents.remove(duplicate_of)
+
         response = supabase_with_jwt.table("incidents").insert(incident_data).execute()
+        publish_incident_changes("insert", response.data)
+        remember_incidents(response.data)
+        # Warm the enrichment caches before anyone opens the panel
+        for incident in response.data or []:
+            enqueue_enrichment(incident)
 
         return jsonify({
             "message": "✅ Incident reported successfully!",
@@ -64,22 +167,486 @@ def report_incident():
         return jsonify({"error": str(e)}), 500
 
 
-# 📡 Get all incidents
+# 📦 Bulk ingest (partner feeds, backlog replays)
+# Rows are validated in one pass and inserted with one Supabase bulk insert
+# per batch; the response reports the outcome of every row by its index.
+BULK_BATCH_SIZE = int(os.getenv("INCIDENT_BULK_BATCH_SIZE", "500"))
+BULK_MAX_BATCH_SIZE = 1000
+BULK_MAX_ROWS = int(os.getenv("INCIDENT_BULK_MAX_ROWS", "10000"))
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+_INVALID_JSON = object()
+
+
+def _read_lines(stream, chunk_size=65536):
+    """Split a byte stream into lines, reading it in large chunks (line-by-line reads are slow)."""
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        *lines, pending = (pending + chunk).split(b"\n")
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _parse_ndjson_lines(lines):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield _INVALID_JSON
+
+
+def read_bulk_payload():
+    """Yield (index, item) from a JSON array body or an NDJSON stream (one object per line)."""
+    if request.mimetype in NDJSON_MIMETYPES:
+        yield from enumerate(_parse_ndjson_lines(_read_lines(request.stream)))
+        return
+
+    payload = request.get_json(force=True, silent=True)
+    if not isinstance(payload, list):
+        raise ValueError("Body must be a JSON array of incidents or NDJSON (Content-Type: application/x-ndjson)")
+    yield from enumerate(payload)
+
+
+def validate_bulk_incident(item):
+    """Return (incident_data, None) for a valid bulk row, or (None, error)."""
+    if item is _INVALID_JSON:
+        return None, "Invalid JSON"
+    if not isinstance(item, dict):
+        return None, "Each incident must be a JSON object"
+
+    # Backlog replays may keep their original timestamps
+    created_at = item.get("created_at")
+    if created_at is not None:
+        try:
+            created_at = normalize_timestamp(str(created_at))
+        except ValueError:
+            return None, "created_at must be an ISO 8601 timestamp"
+
+    incident_data = build_incident(item, created_at)
+    error = missing_incident_fields(incident_data)
+    if error:
+        return None, error
+
+    # One malformed value would make Postgres reject its whole batch, so types are checked up front
+    for column, low, high in (("latitude", -90, 90), ("longitude", -180, 180)):
+        value = incident_data[column]
+        if value is None:
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = None
+        if value is None or not (low <= value <= high):
+            return None, f"{column} must be a number between {low} and {high}"
+        incident_data[column] = value
+
+    try:
+        incident_data["severity"] = int(incident_data["severity"])
+    except (TypeError, ValueError):
+        return None, "severity must be an integer"
+
+    return incident_data, None
+
+
+@incidents_bp.route('/api/incidents/bulk', methods=['POST'])
+def bulk_report_incidents():
+    """
+    Insert many incidents in one request.
+    Body: a JSON array of incidents, or NDJSON with Content-Type application/x-ndjson.
+    Query params: batch_size - rows per Supabase insert (default 500, max 1000).
+    Returns per-row results: {"index", "status": "created", "id"} or {"index", "status": "error", "error"}.
+    """
+    decoded, err, code = verify_jwt_from_request()
+    if err:
+        return err, code
+
+    try:
+        batch_size = max(1, min(int(request.args.get("batch_size", BULK_BATCH_SIZE)), BULK_MAX_BATCH_SIZE))
+    except ValueError:
+        return jsonify({"error": "batch_size must be an integer"}), 400
+
+    results = []
+    valid = []  # (index, incident_data)
+    try:
+        for index, item in read_bulk_payload():
+            if index >= BULK_MAX_ROWS:
+                return jsonify({"error": f"At most {BULK_MAX_ROWS} incidents per request"}), 413
+            incident_data, error = validate_bulk_incident(item)
+            if error:
+                results.append({"index": index, "status": "error", "error": error})
+            else:
+                valid.append((index, incident_data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    supabase_with_jwt = get_supabase_with_jwt()
+    for start in range(0, len(valid), batch_size):
+        batch = valid[start:start + batch_size]
+        try:
+            response = supabase_with_jwt.table("incidents").insert([row for _, row in batch]).execute()
+        except Exception as e:
+            results.extend({"index": index, "status": "error", "error": str(e)} for index, _ in batch)
+            continue
+
+        rows = response.data or []
+        for position, (index, _) in enumerate(batch):
+            row = rows[position] if position < len(rows) else {}
+            results.append({"index": index, "status": "created", "id": row.get("id")})
+        # Bulk rows skip de-duplication and pre-enrichment; /enrich still works on demand
+        publish_incident_changes("insert", rows)
+        remember_incidents(rows)
+
+    if not results:
+        return jsonify({"error": "No incidents in request body"}), 400
+    results.sort(key=lambda result: result["index"])
+    created = sum(1 for result in results if result["status"] == "created")
+
+    return jsonify({
+        "message": f"✅ {created} of {len(results)} incidents created",
+        "created": created,
+        "failed": len(results) - created,
+        "results": results
+    }), 201 if created == len(results) else (207 if created else 400)
+
+
+# Columns clients may request through ?fields= (id and created_at always come back for the cursor)
+INCIDENT_FIELDS = {
+    "id", "user_id", "name", "type", "description", "latitude",
+    "longitude", "severity", "status", "created_at", "report_count",
+    "last_reported_at",
+}
+
+
+def parse_incident_fields(fields_param):
+    """Turn ?fields=a,b,c into a select() projection, validating column names."""
+    if not fields_param:
+        return "*"
+    fields = [f.strip() for f in fields_param.split(",") if f.strip()]
+    unknown = [f for f in fields if f not in INCIDENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    for required in ("id", "created_at"):
+        if required not in fields:
+            fields.append(required)
+    return ",".join(fields)
+
+
+def apply_incident_filters(query, args):
+    """Push ?status=, ?type=, ?severity= and ?user_id= filters down into the query."""
+    for column in ("status", "type", "user_id"):
+        value = args.get(column)
+        if value:
+            values = [v.strip() for v in value.split(",") if v.strip()]
+            query = query.in_(column, values) if len(values) > 1 else query.eq(column, values[0])
+
+    severity = args.get("severity")
+    if severity:
+        try:
+            levels = [int(v) for v in severity.split(",") if v.strip()]
+        except ValueError:
+            raise ValueError("severity must be an integer or comma-separated integers")
+        query = query.in_("severity", levels) if len(levels) > 1 else query.eq("severity", levels[0])
+    return query
+
+
+# 📡 Get incidents (keyset-paginated, newest first)
 @incidents_bp.route('/api/incidents', methods=['GET'])
 def get_incidents():
+    """
+    Query params:
+      limit   - page size (default 100, max 1000)
+      cursor  - next_cursor from the previous page
+      fields  - comma-separated column projection
+      status, type, severity, user_id - filters (comma-separated for several values)
+    """
     # Verify JWT first
     decoded, err, code = verify_jwt_from_request()
     if err:
         return err, code
     
+    # Nothing written since the client's copy: skip the query and serialization (shared broker only)
+    etag = collection_etag("incidents", decoded.get("sub"), request.query_string.decode("utf-8"))
+    cached = not_modified_response(etag)
+    if cached is not None:
+        return cached
+
     try:
+        limit = parse_limit(request.args.get("limit"))
+        columns = parse_incident_fields(request.args.get("fields"))
+
         # Use Supabase client with JWT token for RLS
         supabase_with_jwt = get_supabase_with_jwt()
-        response = supabase_with_jwt.table("incidents").select("*").order("created_at", desc=True).execute()
-        return jsonify({"incidents": response.data}), 200
+        query = apply_incident_filters(supabase_with_jwt.table("incidents").select(columns), request.args)
+        incidents, next_cursor = fetch_page(query, request.args.get("cursor"), limit)
+
+        return with_etag(jsonify({"incidents": incidents, "next_cursor": next_cursor}), etag)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# 📍 Proximity queries
+# A latitude/longitude range filter is pushed down to Supabase (indexed, see
+# migrations/003_incidents_location_index.sql) and the candidates are then
+# ranked exactly by haversine distance.
+#
+# A box holding more than NEARBY_MAX_CANDIDATES rows is not cut by recency.
+# The radius is halved until its box fits; once that smaller circle already
+# holds `limit` incidents they are the true nearest ones. Failing that (very
+# uneven density), the smallest box that was too full (then, only if needed,
+# the requested one) is walked in keyset pages keeping the best k.
+NEARBY_DEFAULT_RADIUS_KM = 10.0
+NEARBY_MAX_RADIUS_KM = 200.0
+NEARBY_MAX_CANDIDATES = int(os.getenv("NEARBY_MAX_CANDIDATES", "5000"))
+NEARBY_MAX_SHRINKS = 8  # the smallest probe covers 1/256 of the requested radius
+
+
+def parse_coordinate(args, name, low, high, default=None):
+    """Read a float query parameter and check its range."""
+    value = args.get(name)
+    if value is None or value == "":
+        if default is None:
+            raise ValueError(f"Missing {name} parameter")
+        return default
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+    if not (low <= value <= high):
+        raise ValueError(f"{name} must be between {low} and {high}")
+    return value
+
+
+def apply_bbox(query, south, west, north, east):
+    """Restrict a query to a bounding box; boxes crossing the antimeridian become two longitude ranges."""
+    query = query.gte("latitude", south).lte("latitude", north)
+    if west < -180:
+        return query.or_(f"longitude.gte.{west + 360},longitude.lte.{east}")
+    if east > 180:
+        return query.or_(f"longitude.gte.{west},longitude.lte.{east - 360}")
+    if west > east:  # explicit box wrapping around 180°
+        return query.or_(f"longitude.gte.{west},longitude.lte.{east}")
+    return query.gte("longitude", west).lte("longitude", east)
+
+
+def rank_nearby(rows, latitude, longitude, limit, radius_km):
+    """The `limit` rows nearest to (lat, lon) within `radius_km`, as (rows, distances)."""
+    indices, distances = nearest_k(
+        latitude, longitude,
+        [row["latitude"] for row in rows],
+        [row["longitude"] for row in rows],
+        limit, max_km=radius_km,
+    )
+    return [rows[i] for i in indices], distances
+
+
+def find_nearby_incidents(build_query, latitude, longitude, radius_km, limit):
+    """
+    Exact `limit` nearest incidents within `radius_km`. `build_query()` returns a
+    fresh filtered incidents query (builders are consumed by execute()).
+    Returns (rows, distances), nearest first.
+    """
+    def box_query(radius):
+        return apply_bbox(build_query(), *radius_bbox(latitude, longitude, radius))
+
+    def walk(radius):
+        """Rank every row in the box of `radius`, one keyset page at a time."""
+        rows, distances = [], []
+        cursor = None
+        while True:
+            page, cursor = fetch_page(box_query(radius), cursor, MAX_PAGE_SIZE)
+            rows, distances = rank_nearby(rows + page, latitude, longitude, limit, radius)
+            if not cursor:
+                return rows, distances
+
+    dense_km = None  # smallest radius whose box held too many rows
+    probe_km = radius_km
+    for _ in range(NEARBY_MAX_SHRINKS + 1):
+        candidates = box_query(probe_km).limit(NEARBY_MAX_CANDIDATES + 1).execute().data or []
+        if len(candidates) <= NEARBY_MAX_CANDIDATES:
+            # Every row within probe_km is here, and anything outside is farther away
+            rows, distances = rank_nearby(candidates, latitude, longitude, limit, probe_km)
+            if dense_km is None or len(rows) >= limit:
+                return rows, distances
+            break
+        dense_km = probe_km
+        probe_km /= 2
+
+    # Too few within the last probe: walk the smallest dense box, and the full one only if that still falls short
+    rows, distances = walk(dense_km)
+    if len(rows) >= limit or dense_km == radius_km:
+        return rows, distances
+    return walk(radius_km)
+
+
+@incidents_bp.route('/api/incidents/nearby', methods=['GET'])
+def get_nearby_incidents():
+    """
+    Incidents within `radius` km of (lat, lon), nearest first, each with distance_km.
+    Query params: lat, lon, radius (km, default 10), limit, fields,
+    status/type/severity/user_id filters as for GET /api/incidents.
+    """
+    decoded, err, code = verify_jwt_from_request()
+    if err:
+        return err, code
+
+    etag = collection_etag("incidents", decoded.get("sub"), request.query_string.decode("utf-8"))
+    cached = not_modified_response(etag)
+    if cached is not None:
+        return cached
+
+    try:
+        latitude = parse_coordinate(request.args, "lat", -90, 90)
+        longitude = parse_coordinate(request.args, "lon", -180, 180)
+        radius_km = parse_coordinate(request.args, "radius", 0, NEARBY_MAX_RADIUS_KM, NEARBY_DEFAULT_RADIUS_KM)
+        limit = parse_limit(request.args.get("limit"))
+        columns = parse_incident_fields(request.args.get("fields"))
+        if columns != "*":
+            # Ranking needs the coordinates, a keyset walk needs the sort key
+            columns = ",".join(sorted(set(columns.split(",")) | {"latitude", "longitude", "created_at", "id"}))
+
+        supabase_with_jwt = get_supabase_with_jwt()
+        rows, distances = find_nearby_incidents(
+            lambda: apply_incident_filters(supabase_with_jwt.table("incidents").select(columns), request.args),
+            latitude, longitude, radius_km, limit,
+        )
+        incidents = []
+        for row, distance in zip(rows, distances):
+            incident = dict(row)
+            incident["distance_km"] = round(distance, 3)
+            incidents.append(incident)
+
+        return with_etag(jsonify({"incidents": incidents, "radius_km": radius_km}), etag)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@incidents_bp.route('/api/incidents/bbox', methods=['GET'])
+def get_incidents_in_bbox():
+    """
+    Incidents inside a bounding box, newest first and keyset-paginated like GET /api/incidents.
+    Query params: south, west, north, east, limit, cursor, fields and the usual filters.
+    A box with west > east wraps across the antimeridian.
+    """
+    decoded, err, code = verify_jwt_from_request()
+    if err:
+        return err, code
+
+    etag = collection_etag("incidents", decoded.get("sub"), request.query_string.decode("utf-8"))
+    cached = not_modified_response(etag)
+    if cached is not None:
+        return cached
+
+    try:
+        south = parse_coordinate(request.args, "south", -90, 90)
+        north = parse_coordinate(request.args, "north", -90, 90)
+        west = parse_coordinate(request.args, "west", -180, 180)
+        east = parse_coordinate(request.args, "east", -180, 180)
+        if south > north:
+            raise ValueError("south must not be greater than north")
+        limit = parse_limit(request.args.get("limit"))
+        columns = parse_incident_fields(request.args.get("fields"))
+
+        supabase_with_jwt = get_supabase_with_jwt()
+        query = apply_incident_filters(supabase_with_jwt.table("incidents").select(columns), request.args)
+        query = apply_bbox(query, south, west, north, east)
+        incidents, next_cursor = fetch_page(query, request.args.get("cursor"), limit)
+
+        return with_etag(jsonify({"incidents": incidents, "next_cursor": next_cursor}), etag)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 🗺️ Clustered incident counts for the admin map
+# Counters live in memory (utils/clusters.py), loaded once per worker and kept
+# current from the incident change feed by utils/live_aggregate.py, so each
+# request only reads the cells for the requested zoom level.
+# The counters cover every incident, so they are loaded with the service-role
+# client (falling back to the calling admin's token) and served to admins only.
+CLUSTER_FIELDS = "id,latitude,longitude,severity,status,created_at"
+
+incident_clusters = IncidentClusters()
+
+
+def load_incident_clusters(client):
+    """(Re)build the cluster counters from the incidents table, folding in one keyset page at a time."""
+    count = incident_clusters.rebuild(iter_table_rows(lambda: client.table("incidents").select(CLUSTER_FIELDS)))
+    print(f"🗺️ Loaded {count} incidents into the cluster counters")
+
+
+def apply_incident_change(event):
+    """Fold one incident change event into the cluster counters."""
+    if event["type"] in ("insert", "update"):
+        incident_clusters.upsert(event["data"])
+    elif event["type"] == "delete":
+        incident_clusters.remove(event["data"].get("id"))
+
+
+live_incident_clusters = LiveAggregate(
+    "incident-clusters", "incidents", load_incident_clusters, apply_incident_change,
+)
+
+
+@incidents_bp.route('/api/incidents/clusters', methods=['GET'])
+def get_incident_clusters():
+    """
+    Geohash-bucketed incident counts with a severity histogram per cell.
+    Query params:
+      zoom       - web-map zoom level (0-22), or
+      precision  - geohash precision (1-7) directly
+      status     - comma-separated statuses (default active, "all" for every status)
+      south, west, north, east - optional viewport; cells outside it are dropped
+    """
+    decoded, err, code = verify_admin_from_request()
+    if err:
+        return err, code
+
+    try:
+        try:
+            if request.args.get("precision"):
+                precision = max(1, min(int(request.args["precision"]), MAX_PRECISION))
+            else:
+                precision = precision_for_zoom(int(request.args.get("zoom", "10")))
+        except ValueError:
+            raise ValueError("zoom and precision must be integers")
+
+        status = request.args.get("status", "active")
+        statuses = None if status == "all" else {v.strip() for v in status.split(",") if v.strip()}
+
+        bbox = None
+        if any(request.args.get(edge) for edge in ("south", "west", "north", "east")):
+            bbox = (
+                parse_coordinate(request.args, "south", -90, 90),
+                parse_coordinate(request.args, "west", -180, 180),
+                parse_coordinate(request.args, "north", -90, 90),
+                parse_coordinate(request.args, "east", -180, 180),
+            )
+
+        live_incident_clusters.ensure(supabase_service or get_supabase_with_jwt())
+        clusters = incident_clusters.cells(precision, statuses, bbox)
+
+        return jsonify({
+            "precision": precision,
+            "clusters": clusters,
+            "total": sum(cluster["count"] for cluster in clusters)
+        }), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # ✅ Mark an incident as resolved
 @incidents_bp.route("/api/incidents/<int:incident_id>/resolve", methods=["PATCH"])
 def resolve_incident(incident_id):
@@ -99,6 +666,9 @@ def resolve_incident(incident_id):
         if not response.data:
             return jsonify({"error": "Incident not found"}), 404
 
+        recent_incidents.remove(incident_id)
+        publish_incident_changes("update", response.data)
+
         return jsonify({
             "message": "✅ Incident marked as resolved",
             "data": response.data
@@ -107,3 +677,215 @@ def resolve_incident(incident_id):
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+# 🧹 Batch status transitions
+INCIDENT_STATUSES = {"active", "acknowledged", "resolved"}
+BATCH_STATUS_MAX_IDS = 1000
+
+
+def build_status_filter(query, spec):
+    """
+    Apply a batch-update filter: {"status", "type", "severity",
+    "older_than_minutes", "bbox": {"south", "west", "north", "east"}}.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("filter must be an object")
+    unknown = set(spec) - {"status", "type", "severity", "older_than_minutes", "bbox"}
+    if unknown:
+        raise ValueError(f"Unknown filter key(s): {', '.join(sorted(unknown))}")
+    # An empty filter would update every row the caller can see
+    if not any(value not in (None, "", [], {}) for value in spec.values()):
+        raise ValueError("filter needs at least one of: status, type, severity, older_than_minutes, bbox")
+
+    query = apply_incident_filters(query, {
+        key: ",".join(str(v) for v in value) if isinstance(value, list) else str(value)
+        for key, value in spec.items()
+        if key in ("status", "type", "severity") and value not in (None, "")
+    })
+
+    if spec.get("older_than_minutes") is not None:
+        try:
+            minutes = float(spec["older_than_minutes"])
+        except (TypeError, ValueError):
+            raise ValueError("older_than_minutes must be a number")
+        if not 0 < minutes < float("inf"):
+            raise ValueError("older_than_minutes must be greater than 0")
+        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+        query = query.lt("created_at", cutoff.isoformat())
+
+    if spec.get("bbox") is not None:
+        bbox = spec["bbox"]
+        if not isinstance(bbox, dict):
+            raise ValueError("bbox must be an object with south, west, north and east")
+        bbox = {edge: str(bbox.get(edge, "")) for edge in ("south", "west", "north", "east")}
+        query = apply_bbox(
+            query,
+            parse_coordinate(bbox, "south", -90, 90),
+            parse_coordinate(bbox, "west", -180, 180),
+            parse_coordinate(bbox, "north", -90, 90),
+            parse_coordinate(bbox, "east", -180, 180),
+        )
+    return query
+
+
+@incidents_bp.route('/api/incidents/status', methods=['PATCH'])
+def update_incident_statuses():
+    """
+    Move many incidents to a new status in one UPDATE.
+    Body: {"status": "resolved", "ids": [1, 2, 3]}
+       or {"status": "resolved", "filter": {"status": "active", "older_than_minutes": 120,
+                                            "bbox": {"south", "west", "north", "east"}}}
+    Only rows whose status actually changes are updated and returned.
+    """
+    decoded, err, code = verify_jwt_from_request()
+    if err:
+        return err, code
+
+    try:
+        data = request.get_json(force=True, silent=True) or {}
+        new_status = data.get("status", "resolved")
+        if new_status not in INCIDENT_STATUSES:
+            raise ValueError(f"status must be one of: {', '.join(sorted(INCIDENT_STATUSES))}")
+
+        ids = data.get("ids")
+        spec = data.get("filter")
+        if (ids is None) == (spec is None):
+            raise ValueError("Provide either ids or filter")
+
+        supabase_with_jwt = get_supabase_with_jwt()
+        query = supabase_with_jwt.table("incidents").update({"status": new_status}).neq("status", new_status)
+
+        if ids is not None:
+            if not isinstance(ids, list) or not ids:
+                raise ValueError("ids must be a non-empty list")
+            if len(ids) > BATCH_STATUS_MAX_IDS:
+                raise ValueError(f"At most {BATCH_STATUS_MAX_IDS} ids per request")
+            try:
+                ids = sorted({int(i) for i in ids})
+            except (TypeError, ValueError):
+                raise ValueError("ids must be integers")
+            query = query.in_("id", ids)
+        else:
+            query = build_status_filter(query, spec)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        response = query.execute()
+        changed = response.data or []
+
+        if new_status != "active":
+            for row in changed:
+                recent_incidents.remove(row["id"])
+        publish_incident_changes("update", changed)
+
+        return jsonify({
+            "message": f"✅ {len(changed)} incident(s) marked as {new_status}",
+            "data": changed
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 📤 Export incidents (streamed NDJSON / CSV)
+@incidents_bp.route('/api/incidents/export', methods=['GET'])
+def export_incidents():
+    """
+    Stream every matching incident, newest first, one keyset page at a time.
+    Query params: format (ndjson | csv, default ndjson), fields, and the
+    status/type/severity/user_id filters of GET /api/incidents.
+    """
+    decoded, err, code = verify_jwt_from_request()
+    if err:
+        return err, code
+
+    try:
+        export_format = request.args.get("format", "ndjson").lower()
+        columns = parse_incident_fields(request.args.get("fields"))
+        supabase_with_jwt = get_supabase_with_jwt()
+        args = request.args.copy()  # the generator outlives the request
+
+        def make_query():
+            return apply_incident_filters(supabase_with_jwt.table("incidents").select(columns), args)
+
+        return export_response(
+            iter_table_rows(make_query),
+            export_format,
+            "incidents",
+            columns=None if columns == "*" else columns.split(","),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 📺 Stream incident changes (Server-Sent Events)
+STREAM_POLL_SECONDS = float(os.getenv("INCIDENT_STREAM_HEARTBEAT", "15"))
+
+
+def format_sse(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
+@incidents_bp.route('/api/incidents/stream', methods=['GET'])
+def stream_incidents():
+    """
+    Push `insert` / `update` events for incidents as they are written.
+    Resumes after the `Last-Event-ID` header (or ?last_event_id=); a `reset`
+    event tells the client its position is gone and it should refetch.
+    EventSource clients may pass the JWT as ?access_token=.
+    """
+    decoded, err, code = verify_jwt_from_request(allow_query_token=True)
+    if err:
+        return err, code
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    token_expires_at = decoded.get("exp")
+
+    # Events carry full rows and bypass RLS, so filter them like the listings do:
+    # admins see every incident, everyone else only their own
+    try:
+        is_admin = get_user_role(decoded) == "admin"
+    except Exception as e:
+        print(f"⚠️ Role lookup failed for incident stream: {str(e)}")
+        is_admin = False
+    user_id = decoded.get("sub")
+
+    def visible(event):
+        return is_admin or (event.get("data") or {}).get("user_id") == user_id
+
+    def generate():
+        cursor = last_event_id or broker.last_id("incidents")
+        # Tell EventSource how soon to reconnect if the connection drops
+        yield "retry: 3000\n\n"
+
+        while token_expires_at is None or time.time() < token_expires_at:
+            events, reset = broker.read("incidents", cursor, timeout=STREAM_POLL_SECONDS)
+            if reset:
+                cursor = broker.last_id("incidents")
+                yield format_sse({"id": cursor, "type": "reset", "data": {}})
+                continue
+
+            sent = False
+            for event in events:
+                cursor = event["id"]
+                if visible(event):
+                    sent = True
+                    yield format_sse(event)
+
+            if events and not sent:
+                # Move the client's Last-Event-ID past events it may not see
+                yield f"id: {cursor}\n\n"
+            elif not sent:
+                yield ": keep-alive\n\n"
+
+        # Token expired: end the stream so the client reconnects with a fresh one
+        yield "event: expired\ndata: {}\n\n"
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
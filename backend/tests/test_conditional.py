@@ -0,0 +1,48 @@
+from flask import Flask, jsonify
+
+from utils import conditional
+from utils.conditional import collection_etag, not_modified_response, with_etag
+
+app = Flask(__name__)
+
+
+def test_no_version_etag_without_a_shared_broker(monkeypatch):
+    monkeypatch.setattr(conditional.broker, "shared", False, raising=False)
+    with app.test_request_context("/", headers={"If-None-Match": '"anything"'}):
+        etag = collection_etag("incidents", "user")
+        assert etag is None
+        assert not_modified_response(etag) is None
+
+
+def test_body_hash_etag_answers_304_for_an_unchanged_body():
+    with app.test_request_context("/"):
+        first = with_etag(jsonify({"incidents": [1, 2]}))
+        assert first.status_code == 200
+        etag = first.get_etag()[0]
+
+    with app.test_request_context("/", headers={"If-None-Match": f'"{etag}"'}):
+        assert with_etag(jsonify({"incidents": [1, 2]})).status_code == 304
+        changed = with_etag(jsonify({"incidents": [1, 2, 3]}))
+        assert changed.status_code == 200
+        assert changed.get_etag()[0] != etag
+
+
+def test_version_etag_with_a_shared_broker(monkeypatch):
+    monkeypatch.setattr(conditional.broker, "shared", True, raising=False)
+    monkeypatch.setattr(conditional.broker, "last_id", lambda topic: "7-0", raising=False)
+    with app.test_request_context("/"):
+        etag = collection_etag("incidents", "user")
+    with app.test_request_context("/", headers={"If-None-Match": f'"{etag}"'}):
+        assert not_modified_response(etag).status_code == 304
+
+
+def test_broker_errors_fall_back_to_the_body_hash(monkeypatch):
+    def unavailable(topic):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(conditional.broker, "shared", True, raising=False)
+    monkeypatch.setattr(conditional.broker, "last_id", unavailable, raising=False)
+    with app.test_request_context("/"):
+        etag = collection_etag("incidents", "user")
+        assert etag is None
+        assert with_etag(jsonify({"incidents": []}), etag).status_code == 200
@@ -0,0 +1,45 @@
+from datetime import date
+
+from utils.feedback_stats import RatingAggregates
+
+TODAY = date(2026, 10, 1)
+
+
+def _row(row_id, rating=4, created_at="2026-10-01T12:00:00+00:00"):
+    return {"id": row_id, "rating": rating, "created_at": created_at}
+
+
+def test_replayed_event_leaves_the_stats_unchanged():
+    aggregates = RatingAggregates()
+    aggregates.rebuild([_row(2, rating=5), _row(1, rating=3)])
+    before = aggregates.summary(today=TODAY)
+
+    assert aggregates.add(_row(2, rating=5)) is False
+    assert aggregates.summary(today=TODAY) == before
+
+    assert aggregates.add(_row(3, rating=1)) is True
+    after = aggregates.summary(today=TODAY)
+    assert after["count"] == 3
+    assert after["histogram"] == {"1": 1, "2": 0, "3": 1, "4": 0, "5": 1}
+
+
+def test_newest_loaded_rows_are_still_recognised_as_replays():
+    aggregates = RatingAggregates(recent_ids=2)
+    # Keyset pages arrive newest first; a generator is folded in without being kept
+    loaded = aggregates.rebuild(_row(i, created_at=f"2026-10-01T12:00:0{i}+00:00") for i in (5, 4, 3, 2, 1))
+    before = aggregates.summary(today=TODAY)
+
+    assert loaded == 5
+    for replayed in (5, 4):
+        assert aggregates.add(_row(replayed)) is False
+    assert aggregates.summary(today=TODAY) == before
+
+
+def test_live_replays_are_recognised_within_the_window():
+    aggregates = RatingAggregates(recent_ids=2)
+    for row_id in (1, 2, 3):
+        aggregates.add(_row(row_id))
+
+    assert aggregates.add(_row(3)) is False
+    assert aggregates.add(_row(2)) is False
+    assert len(aggregates) == 3
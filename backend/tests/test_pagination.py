@@ -0,0 +1,39 @@
+import pytest
+
+from utils.pagination import decode_cursor, encode_cursor, normalize_timestamp
+
+
+def test_normalize_timestamp_pads_trimmed_fraction():
+    # Postgres drops trailing zeros, leaving 5 fractional digits here
+    assert normalize_timestamp("2024-01-01T00:00:00.12345+00:00") == "2024-01-01T00:00:00.123450+00:00"
+
+
+def test_normalize_timestamp_accepts_z_and_compact_offsets():
+    assert normalize_timestamp("2024-01-01T10:20:30.1Z") == "2024-01-01T10:20:30.100000+00:00"
+    assert normalize_timestamp("2024-01-01T10:20:30+0530") == "2024-01-01T10:20:30+05:30"
+    assert normalize_timestamp("2024-01-01 10:20") == "2024-01-01T10:20:00"
+    assert normalize_timestamp("2024-01-01") == "2024-01-01T00:00:00"
+
+
+@pytest.mark.parametrize("value", [
+    "2024-13-01T00:00:00",
+    "2024-01-01T00:00:00.1234567",
+    "2024-01-01T00:00:00\n",
+    '2024-01-01T00:00:00",id.gt.0',
+    "yesterday",
+    None,
+])
+def test_normalize_timestamp_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        normalize_timestamp(value)
+
+
+def test_cursor_round_trips_five_digit_fraction():
+    cursor = encode_cursor({"created_at": "2024-01-01T00:00:00.12345+00:00", "id": 42})
+    assert decode_cursor(cursor) == ("2024-01-01T00:00:00.123450+00:00", 42)
+
+
+def test_decode_cursor_rejects_tampered_timestamp():
+    cursor = encode_cursor({"created_at": "2024-01-01T00:00:00+00:00\")", "id": 1})
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
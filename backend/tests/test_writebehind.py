@@ -0,0 +1,95 @@
+import json
+import os
+import time
+
+from utils import writebehind
+from utils.writebehind import WriteBehindBuffer
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the flusher"
+        time.sleep(0.01)
+
+
+def _spool_lines(path):
+    with open(path, encoding="utf-8") as spool:
+        return [json.loads(line) for line in spool if line.strip()]
+
+
+def test_recover_compacts_spool_through_a_replaced_file(tmp_path):
+    path = str(tmp_path / "spool.ndjson")
+    with open(path, "w", encoding="utf-8") as spool:
+        for seq in (1, 2, 3):
+            spool.write(json.dumps({"seq": seq, "row": {"n": seq}}) + "\n")
+        spool.write(json.dumps({"ack": [1]}) + "\n")
+        spool.write('{"seq": 4, "row"')  # torn final line
+    inode = os.stat(path).st_ino
+
+    buffer = WriteBehindBuffer("test", lambda rows: None, spool_path=path, flush_seconds=60)
+    buffer.start()
+
+    assert buffer.recovered == 2
+    assert [record["seq"] for record in _spool_lines(path)] == [2, 3]
+    assert os.stat(path).st_ino != inode
+    assert not os.path.exists(path + ".tmp")
+
+
+def test_failed_compaction_keeps_the_old_spool(tmp_path, monkeypatch):
+    path = str(tmp_path / "spool.ndjson")
+    with open(path, "w", encoding="utf-8") as spool:
+        spool.write(json.dumps({"seq": 1, "row": {"n": 1}}) + "\n")
+
+    def no_space(src, dst):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(writebehind.os, "replace", no_space)
+    buffer = WriteBehindBuffer("test", lambda rows: None, spool_path=path, flush_seconds=60)
+    buffer.start()
+
+    assert buffer.recovered == 1
+    assert [record["seq"] for record in _spool_lines(path)] == [1]
+
+
+def test_flusher_survives_dead_letter_write_errors(tmp_path):
+    def reject(rows):
+        raise ValueError("bad row")
+
+    buffer = WriteBehindBuffer(
+        "test", reject, flush_seconds=0, retry_seconds=0.05,
+        is_permanent=lambda error: True, dead_letter_path=str(tmp_path / "missing" / "dead"),
+    )
+    buffer.submit({"n": 1})
+    _wait_until(lambda: buffer.stats()["failed_flushes"] >= 2)
+
+    stats = buffer.stats()
+    assert buffer._thread.is_alive()
+    assert stats["depth"] == 1  # kept queued until its dead letter can be written
+    assert stats["dead_lettered"] == 0
+    assert stats["failed_flushes"] >= 2
+
+
+def test_constructing_a_buffer_leaves_the_spool_alone(tmp_path):
+    path = tmp_path / "data" / "spool.ndjson"
+
+    buffer = WriteBehindBuffer("test", lambda rows: None, spool_path=str(path), flush_seconds=60)
+
+    assert not path.parent.exists()
+    assert buffer._thread is None
+
+
+def test_unavailable_store_backs_off_without_row_by_row_calls():
+    calls = []
+
+    def unavailable(rows):
+        calls.append(len(rows))
+        raise ConnectionError("store down")
+
+    buffer = WriteBehindBuffer("test", unavailable, batch_size=3, flush_seconds=60, retry_seconds=0.01)
+    for n in range(3):
+        buffer.submit({"n": n})
+    _wait_until(lambda: buffer.stats()["failed_flushes"] >= 3)
+
+    assert set(calls) == {3}
+    assert buffer.stats()["depth"] == 3
@@ -0,0 +1,220 @@
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from utils.metrics import classify_exception, observe_external_call
+
+# =====================================
+# 🔌 Circuit Breakers for External Providers
+# =====================================
+# Every outbound provider (Overpass, OpenWeatherMap, Reddit, RSS hosts) gets
+# its own breaker. Calls are recorded in a sliding time window; once enough of
+# them fail the breaker opens and calls fail fast with CircuitOpenError instead
+# of tying up a worker for the whole timeout. After `open_seconds` a single
+# trial call is let through (half-open): success closes the breaker, failure
+# re-opens it.
+#
+# Timeouts adapt to the provider: a high percentile of recent successful
+# latencies times a safety factor, clamped between a floor and the provider's
+# static ceiling. Callers pass `guard()`'s timeout on to their request; Reddit
+# cannot (praw fixes the timeout per client), so its breaker only tracks outcomes.
+#
+# Each guarded call is also timed into the external-call metrics, labelled by
+# provider and outcome.
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_FAILURE_RATE = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_TIMEOUT_PERCENTILE = float(os.getenv("BREAKER_TIMEOUT_PERCENTILE", "0.95"))
+BREAKER_TIMEOUT_FACTOR = float(os.getenv("BREAKER_TIMEOUT_FACTOR", "3"))
+
+LATENCY_SAMPLES = 100
+MIN_LATENCY_SAMPLES = 10
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker with a latency-percentile adaptive timeout."""
+
+    def __init__(self, name, max_timeout, min_timeout=1.0, window_seconds=BREAKER_WINDOW_SECONDS,
+                 min_calls=BREAKER_MIN_CALLS, failure_rate=BREAKER_FAILURE_RATE, open_seconds=BREAKER_OPEN_SECONDS):
+        self.name = name
+        self.provider = name.split(":", 1)[0]  # metrics label: "rss:<host>" -> "rss"
+        self.max_timeout = max_timeout
+        self.min_timeout = min(min_timeout, max_timeout)
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._outcomes = deque()  # (finished_at, ok)
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)  # successful calls only
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.times_opened = 0
+
+    # ---------- State ----------
+
+    def _trim(self, now):
+        cutoff = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] < cutoff:
+            self._outcomes.popleft()
+
+    def allow(self):
+        """Reserve a call. Raises CircuitOpenError when the breaker is open."""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == OPEN and now - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+
+            self.rejected += 1
+            retry_after = max(self.open_seconds - (now - self._opened_at), 0.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self, latency):
+        now = time.monotonic()
+        with self._lock:
+            self._latencies.append(latency)
+            if self.state == HALF_OPEN:
+                print(f"✅ Circuit {self.name} closed after a successful trial call")
+                self.state = CLOSED
+                self._trial_in_flight = False
+                self._outcomes.clear()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._open(now)
+                return
+
+            self._outcomes.append((now, False))
+            self._trim(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if (
+                self.state == CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open(now)
+
+    def _open(self, now):
+        self.state = OPEN
+        self._opened_at = now
+        self._trial_in_flight = False
+        self.times_opened += 1
+        print(f"🔌 Circuit {self.name} opened for {self.open_seconds:.0f}s")
+
+    # ---------- Adaptive timeout ----------
+
+    def timeout(self):
+        """Percentile-based timeout, or the static ceiling until enough calls have succeeded."""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.max_timeout
+
+        rank = min(len(samples) - 1, math.ceil(BREAKER_TIMEOUT_PERCENTILE * len(samples)) - 1)
+        adaptive = samples[rank] * BREAKER_TIMEOUT_FACTOR
+        return round(min(self.max_timeout, max(self.min_timeout, adaptive)), 3)
+
+    @contextmanager
+    def guard(self):
+        """
+        Wrap one provider call: raises CircuitOpenError when open, yields the
+        timeout to use and records the outcome (any exception is a failure).
+
+            with breaker.guard() as timeout:
+                session.get(url, timeout=timeout)
+        """
+        try:
+            self.allow()
+        except CircuitOpenError:
+            observe_external_call(self.provider, "circuit_open", 0.0)
+            raise
+        started = time.monotonic()
+        try:
+            yield self.timeout()
+        except BaseException as e:
+            self.record_failure()
+            observe_external_call(self.provider, classify_exception(e), time.monotonic() - started)
+            raise
+        latency = time.monotonic() - started
+        self.record_success(latency)
+        observe_external_call(self.provider, "success", latency)
+
+    def snapshot(self):
+        """JSON-serializable view of the breaker for the health endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            state = self.state
+            retry_after = max(self.open_seconds - (now - self._opened_at), 0.0) if state == OPEN else 0.0
+            rejected = self.rejected
+            times_opened = self.times_opened
+        return {
+            "state": state,
+            "window_calls": calls,
+            "window_failures": failures,
+            "failure_rate": round(failures / calls, 4) if calls else 0.0,
+            "timeout_seconds": self.timeout(),
+            "retry_after_seconds": round(retry_after, 1),
+            "rejected": rejected,
+            "times_opened": times_opened,
+        }
+
+
+# =====================================
+# 📋 Registry
+# =====================================
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, max_timeout=10.0, min_timeout=1.0):
+    """Return the process-wide breaker for `name`, creating it on first use."""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name, max_timeout, min_timeout)
+    return breaker
+
+
+def get_breaker_states():
+    """Snapshot of every breaker, keyed by provider name."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
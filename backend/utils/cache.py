@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class _InFlight:
+    """A load in progress that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+# =====================================
+# 🗃️ Bounded TTL Cache
+# =====================================
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire after a time-to-live.
+    Least recently used entries are evicted once `maxsize` is reached.
+    Expired entries are kept for another `stale_ttl` seconds so get_stale()
+    can serve them while an upstream is down.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, name=None, stale_ttl=0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.name = name
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _InFlight
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for `key`, or `default` if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            expires_at, value = entry
+            if expires_at <= now:
+                if expires_at + self.stale_ttl <= now:
+                    del self._data[key]
+                    self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_stale(self, key, default=None):
+        """Return the value for `key` even if expired, as long as it is within `stale_ttl`."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] + self.stale_ttl <= now:
+                return default
+            self.stale_hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        """Store `value` under `key` for `ttl` seconds (defaults to the cache TTL)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key, loader, ttl=None, refresh=False, cache_if=None, serve_stale=False):
+        """
+        Return the cached value for `key`, calling `loader()` on a miss.
+        Concurrent misses for the same key are coalesced (single-flight): one
+        caller runs the loader while the others wait for its result.
+        `refresh=True` skips the cached value; `cache_if(value)` can veto
+        storing a result (e.g. an empty payload from a failed fetch).
+        With `serve_stale=True`, a loader error or vetoed result falls back to
+        an expired value still within `stale_ttl`, when there is one.
+        """
+        if not refresh:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+
+        with self._lock:
+            call = self._inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._inflight[key] = _InFlight()
+            else:
+                self.coalesced += 1
+
+        if not is_leader:
+            return call.wait()
+
+        try:
+            try:
+                call.value = loader()
+            except Exception:
+                stale = self.get_stale(key, _MISSING) if serve_stale else _MISSING
+                if stale is _MISSING:
+                    raise
+                call.value = stale
+                return call.value
+
+            if cache_if is None or cache_if(call.value):
+                self.set(key, call.value, ttl)
+            elif serve_stale:
+                call.value = self.get_stale(key, call.value)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def items(self):
+        """Return a list of (key, value) pairs for entries that have not expired."""
+        now = time.monotonic()
+        with self._lock:
+            return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at > now]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Return a JSON-serializable snapshot of cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "coalesced": self.coalesced,
+                "stale_hits": self.stale_hits,
+                "in_flight": len(self._inflight),
+            }
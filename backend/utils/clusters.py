@@ -0,0 +1,150 @@
+import threading
+
+from utils.geo import geohash_bbox, geohash_encode
+
+# =====================================
+# 🗺️ Incrementally Maintained Geohash Clusters
+# =====================================
+# Incident counts are kept per (status, geohash cell) for every precision from
+# 1 to MAX_PRECISION, with a severity histogram and a coordinate sum (for the
+# cell centroid). Each incident is encoded once at MAX_PRECISION and its
+# prefixes give every coarser cell, so an insert or status change touches
+# MAX_PRECISION cells instead of rescanning the table.
+
+MAX_PRECISION = 7  # ~150 m cells
+
+# Web-map zoom level -> geohash precision whose cells are a few dozen pixels wide
+_ZOOM_PRECISION = ((2, 1), (5, 2), (7, 3), (10, 4), (12, 5), (15, 6))
+
+
+def precision_for_zoom(zoom):
+    """Geohash precision to cluster at for a web-map zoom level (0-22)."""
+    for max_zoom, precision in _ZOOM_PRECISION:
+        if zoom <= max_zoom:
+            return precision
+    return MAX_PRECISION
+
+
+class IncidentClusters:
+    """Per-status geohash cell counters, updated one incident at a time."""
+
+    def __init__(self):
+        self._cells = {}  # status -> [ {geohash: cell} per precision 1..MAX_PRECISION ]
+        self._incidents = {}  # id -> (status, geohash, latitude, longitude, severity)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._incidents)
+
+    def _apply(self, entry, sign):
+        status, geohash, latitude, longitude, severity = entry
+        levels = self._cells.get(status)
+        if levels is None:
+            levels = self._cells[status] = [{} for _ in range(MAX_PRECISION)]
+
+        for precision in range(1, MAX_PRECISION + 1):
+            cells = levels[precision - 1]
+            key = geohash[:precision]
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "severity": {}}
+            cell["count"] += sign
+            cell["lat_sum"] += sign * latitude
+            cell["lon_sum"] += sign * longitude
+            cell["severity"][severity] = cell["severity"].get(severity, 0) + sign
+            if cell["count"] <= 0:
+                del cells[key]
+
+    def upsert(self, row):
+        """Add an incident row or move it to its new status/location/severity. Safe to replay."""
+        latitude = row.get("latitude")
+        longitude = row.get("longitude")
+        with self._lock:
+            previous = self._incidents.pop(row["id"], None)
+            if previous is not None:
+                self._apply(previous, -1)
+            if latitude is None or longitude is None:
+                return
+
+            latitude = float(latitude)
+            longitude = float(longitude)
+            entry = (
+                row.get("status") or "active",
+                geohash_encode(latitude, longitude, MAX_PRECISION),
+                latitude,
+                longitude,
+                int(row.get("severity") or 0),
+            )
+            self._incidents[row["id"]] = entry
+            self._apply(entry, 1)
+
+    def remove(self, incident_id):
+        with self._lock:
+            previous = self._incidents.pop(incident_id, None)
+            if previous is not None:
+                self._apply(previous, -1)
+
+    def rebuild(self, rows):
+        """
+        Replace every counter with the given incident rows (any iterable, folded
+        in as it is consumed); readers see the old counters until the swap.
+        Returns the number of rows read.
+        """
+        fresh = IncidentClusters()
+        count = 0
+        for row in rows:
+            count += 1
+            try:
+                fresh.upsert(row)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"⚠️ Skipping malformed incident row {row.get('id')}: {str(e)}")
+        with self._lock:
+            self._cells = fresh._cells
+            self._incidents = fresh._incidents
+        return count
+
+    def cells(self, precision, statuses=None, bbox=None):
+        """
+        Clusters at `precision` for the given statuses (all when None), merged
+        across statuses. `bbox` = (south, west, north, east) keeps cells whose
+        centroid falls inside it. Returns a list sorted by count, largest first.
+        """
+        precision = max(1, min(int(precision), MAX_PRECISION))
+        merged = {}
+        with self._lock:
+            for status, levels in self._cells.items():
+                if statuses is not None and status not in statuses:
+                    continue
+                for key, cell in levels[precision - 1].items():
+                    total = merged.setdefault(key, {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "severity": {}})
+                    total["count"] += cell["count"]
+                    total["lat_sum"] += cell["lat_sum"]
+                    total["lon_sum"] += cell["lon_sum"]
+                    for level, count in cell["severity"].items():
+                        total["severity"][level] = total["severity"].get(level, 0) + count
+
+        clusters = []
+        for key, total in merged.items():
+            latitude = total["lat_sum"] / total["count"]
+            longitude = total["lon_sum"] / total["count"]
+            if bbox is not None and not _in_bbox(latitude, longitude, bbox):
+                continue
+            clusters.append({
+                "geohash": key,
+                "count": total["count"],
+                "latitude": round(latitude, 6),
+                "longitude": round(longitude, 6),
+                "bounds": geohash_bbox(key),
+                "severity": {str(level): count for level, count in sorted(total["severity"].items()) if count},
+            })
+        clusters.sort(key=lambda cluster: cluster["count"], reverse=True)
+        return clusters
+
+
+def _in_bbox(latitude, longitude, bbox):
+    south, west, north, east = bbox
+    if not (south <= latitude <= north):
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east  # box wraps across the antimeridian
@@ -0,0 +1,66 @@
+import hashlib
+import os
+import time
+from flask import request, Response
+from utils.pubsub import broker
+
+# =====================================
+# 🏷️ Conditional GET (ETag / If-None-Match)
+# =====================================
+# With a shared (Redis) broker a listing's ETag is derived from its topic's
+# newest change-event id (bumped by every write through the API), the caller
+# and the query string, so an unchanged result set can be answered with 304
+# before touching Supabase. Writes that bypass the API are picked up once the
+# ETAG_MAX_AGE window rolls.
+#
+# The in-process broker only sees this worker's writes, so a version taken
+# from it could answer 304 for rows another worker just changed. Without
+# REDIS_URL the ETag is a hash of the response body instead: the query still
+# runs, but an unchanged result is answered with 304 and no body.
+
+ETAG_MAX_AGE = int(os.getenv("ETAG_MAX_AGE", "60"))  # seconds
+
+
+def collection_etag(topic, *scope):
+    """
+    Cheap version token for a listing on `topic`, varied by `scope` (user,
+    query...). None when the broker is per process (see above) or cannot be
+    read, in which case with_etag() hashes the body.
+    """
+    if not broker.shared:
+        return None
+    try:
+        version = broker.last_id(topic)
+    except Exception as e:
+        # Redis trouble must not fail the listing: fall back to the body-hash ETag
+        print(f"⚠️ Could not read the {topic} version for its ETag: {str(e)}")
+        return None
+    window = int(time.time() // ETAG_MAX_AGE) if ETAG_MAX_AGE > 0 else 0
+    parts = [version, str(window), *map(str, scope)]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:24]
+
+
+def not_modified_response(etag):
+    """Return a 304 response if the client already holds `etag`, else None."""
+    if etag is not None and request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return None
+
+
+def with_etag(response, etag=None):
+    """
+    Attach the ETag (and revalidation policy) to a 200 response. Without a
+    precomputed `etag` the body is hashed, and a client already holding that
+    hash gets a 304 instead.
+    """
+    if etag is None:
+        etag = hashlib.sha1(response.get_data()).hexdigest()[:24]
+        cached = not_modified_response(etag)
+        if cached is not None:
+            return cached
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
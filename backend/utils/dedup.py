@@ -0,0 +1,121 @@
+import threading
+import time
+
+from utils.geo import geohash_encode, geohashes_covering, haversine_km
+
+# =====================================
+# 🧲 Recent-Incident Index for Near-Duplicate Detection
+# =====================================
+# During a real event many people report the same fire within minutes. New
+# reports are checked against the active incidents seen in the last
+# `window_seconds`, bucketed by geohash cell: only the cells touching the
+# match radius are scanned, and a candidate must share the incident type and
+# lie within `radius_km` (exact haversine).
+
+DEDUP_PRECISION = 6  # ~1.2 km x 0.6 km cells
+SWEEP_EVERY = 1024  # full prune of cells that no lookup has visited lately
+
+
+class RecentIncidentIndex:
+    """Geohash-bucketed index of recent incidents, pruned as they age out."""
+
+    def __init__(self, window_seconds=900, radius_km=0.3, precision=DEDUP_PRECISION):
+        self.window_seconds = window_seconds
+        self.radius_km = radius_km
+        self.precision = precision
+        self._cells = {}  # geohash -> {incident_id: (seen_at, type, latitude, longitude)}
+        self._cell_of = {}  # incident_id -> geohash
+        self._lock = threading.Lock()
+        self._adds = 0
+        self.checks = 0
+        self.matches = 0
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    @property
+    def enabled(self):
+        return self.window_seconds > 0 and self.radius_km > 0
+
+    def add(self, incident_id, incident_type, latitude, longitude, seen_at=None):
+        """Remember an active incident as a match target for the next `window_seconds`."""
+        seen_at = time.time() if seen_at is None else seen_at
+        geohash = geohash_encode(latitude, longitude, self.precision)
+        with self._lock:
+            self._discard(incident_id)
+            self._cells.setdefault(geohash, {})[incident_id] = (seen_at, incident_type, latitude, longitude)
+            self._cell_of[incident_id] = geohash
+            self._adds += 1
+            if self._adds % SWEEP_EVERY == 0:
+                self._sweep(seen_at - self.window_seconds)
+
+    def _sweep(self, cutoff):
+        expired = [
+            incident_id
+            for cell in self._cells.values()
+            for incident_id, entry in cell.items()
+            if entry[0] < cutoff
+        ]
+        for incident_id in expired:
+            self._discard(incident_id)
+
+    def touch(self, incident_id, seen_at=None):
+        """Extend the window of a matched incident: it is still being reported."""
+        seen_at = time.time() if seen_at is None else seen_at
+        with self._lock:
+            geohash = self._cell_of.get(incident_id)
+            if geohash is not None:
+                _, incident_type, latitude, longitude = self._cells[geohash][incident_id]
+                self._cells[geohash][incident_id] = (seen_at, incident_type, latitude, longitude)
+
+    def remove(self, incident_id):
+        """Forget an incident (e.g. once it is resolved)."""
+        with self._lock:
+            self._discard(incident_id)
+
+    def _discard(self, incident_id):
+        geohash = self._cell_of.pop(incident_id, None)
+        if geohash is not None:
+            cell = self._cells[geohash]
+            cell.pop(incident_id, None)
+            if not cell:
+                del self._cells[geohash]
+
+    def match(self, incident_type, latitude, longitude, now=None):
+        """
+        Return the id of the closest recent incident of the same type within
+        `radius_km`, or None. Expired entries found along the way are pruned.
+        """
+        now = time.time() if now is None else now
+        cutoff = now - self.window_seconds
+        best_id, best_km = None, None
+
+        with self._lock:
+            self.checks += 1
+            for geohash in geohashes_covering(latitude, longitude, self.radius_km, self.precision):
+                cell = self._cells.get(geohash)
+                if not cell:
+                    continue
+                for incident_id, (seen_at, other_type, other_lat, other_lon) in list(cell.items()):
+                    if seen_at < cutoff:
+                        self._discard(incident_id)
+                        continue
+                    if other_type != incident_type:
+                        continue
+                    distance = haversine_km(latitude, longitude, other_lat, other_lon)
+                    if distance <= self.radius_km and (best_km is None or distance < best_km):
+                        best_id, best_km = incident_id, distance
+            if best_id is not None:
+                self.matches += 1
+        return best_id
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tracked": len(self._cell_of),
+                "cells": len(self._cells),
+                "window_seconds": self.window_seconds,
+                "radius_km": self.radius_km,
+                "checks": self.checks,
+                "matches": self.matches,
+            }
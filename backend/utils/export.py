@@ -0,0 +1,102 @@
+import csv
+import io
+import itertools
+import json
+
+from flask import Response
+
+from utils.pagination import MAX_PAGE_SIZE, fetch_page
+
+# =====================================
+# 📤 Streaming Table Exports
+# =====================================
+# Exports walk a table one keyset page at a time and stream each page out as
+# soon as it arrives, so memory stays at one page no matter how large the
+# table is and the client receives the first rows before the scan finishes.
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+_END = object()
+
+
+def iter_table_rows(make_query, page_size=MAX_PAGE_SIZE):
+    """
+    Yield every row of a keyset-paginated scan. `make_query()` must return a
+    fresh filtered select() builder for each page (builders are mutable).
+    """
+    cursor = None
+    while True:
+        rows, cursor = fetch_page(make_query(), cursor, page_size)
+        yield from rows
+        if not cursor:
+            return
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def ndjson_chunks(rows):
+    for row in rows:
+        yield json.dumps(row, default=str) + "\n"
+
+
+def csv_chunks(rows, columns=None):
+    """CSV text for `rows`; the header comes from `columns` or the first row's keys."""
+    buffer = io.StringIO()
+
+    def flush():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer = None
+    if columns:
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        yield flush()
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(row), extrasaction="ignore")
+            writer.writeheader()
+        writer.writerow({key: _csv_value(value) for key, value in row.items()})
+        yield flush()
+
+
+def export_response(rows, export_format, filename, columns=None):
+    """Stream `rows` (an iterator) as an NDJSON or CSV attachment."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    # Run the first page query now, so a bad filter still gets a proper error status
+    rows = iter(rows)
+    first = next(rows, _END)
+    rows = iter(()) if first is _END else itertools.chain([first], rows)
+
+    def generate():
+        chunks = csv_chunks(rows, columns) if export_format == "csv" else ndjson_chunks(rows)
+        try:
+            yield from chunks
+        except Exception as e:
+            # Headers are already sent, so the failure can only be reported in-band
+            print(f"❌ Export of {filename} failed mid-stream: {str(e)}")
+            if export_format == "ndjson":
+                yield json.dumps({"error": "Export interrupted", "detail": str(e)}) + "\n"
+
+    return Response(
+        generate(),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format}"',
+            "Cache-Control": "no-store",
+            "X-Accel-Buffering": "no",
+        },
+    )
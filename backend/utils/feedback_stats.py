@@ -0,0 +1,161 @@
+import threading
+from collections import deque
+from datetime import date, datetime, timedelta
+
+# =====================================
+# ⭐ Incrementally Maintained Feedback Rating Aggregates
+# =====================================
+# Ratings are folded into per-day buckets (count, rating sum, histogram) and
+# a running total as feedback rows arrive, so the stats endpoint reads a few
+# dozen buckets instead of scanning the feedback table.
+#
+# Replays only happen right after a (re)load, for rows inserted while the
+# table was being read, so only the ids of the newest `recent_ids` rows are
+# remembered to skip them. Memory stays bounded however large the table gets.
+
+RATING_SCALE = (1, 2, 3, 4, 5)
+RECENT_IDS = 10000
+TREND_WINDOWS = (1, 7, 30)  # days
+
+
+def _rating(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str) and len(value) >= 10:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _new_bucket():
+    return {"count": 0, "sum": 0, "histogram": {}}
+
+
+def _add_to(bucket, rating):
+    bucket["count"] += 1
+    bucket["sum"] += rating
+    bucket["histogram"][rating] = bucket["histogram"].get(rating, 0) + 1
+
+
+def _mean(count, total):
+    return round(total / count, 2) if count else None
+
+
+class RatingAggregates:
+    """Running rating count / mean / histogram, overall and per UTC day."""
+
+    def __init__(self, recent_ids=RECENT_IDS):
+        self.recent_ids = recent_ids
+        self._total = _new_bucket()
+        self._days = {}  # date -> bucket
+        self._ids = set()  # the last `recent_ids` ids added, for replay detection
+        self._id_order = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._total["count"]
+
+    def add(self, row):
+        """Fold one feedback row in. Returns False for replays and unrated rows."""
+        return self._fold(row, self._id_order.append)
+
+    def rebuild(self, rows):
+        """
+        Replace the aggregates with `rows`, newest first as keyset pages return
+        them. `rows` may be a generator: rows are folded in as they arrive and
+        not kept. Readers see the old aggregates until the swap. Returns the
+        number of rows read.
+        """
+        fresh = RatingAggregates(self.recent_ids)
+        count = 0
+        for row in rows:
+            count += 1
+            # Only the newest rows can be replayed, and they come first
+            remember = fresh._id_order.appendleft if len(fresh._id_order) < fresh.recent_ids else None
+            fresh._fold(row, remember)
+        with self._lock:
+            self._total = fresh._total
+            self._days = fresh._days
+            self._ids = fresh._ids
+            self._id_order = fresh._id_order
+        return count
+
+    def _fold(self, row, remember):
+        """Add one row; `remember(id)` records its id for replay detection (None skips the check)."""
+        rating = _rating(row.get("rating"))
+        day = _day(row.get("created_at"))
+        if rating is None or day is None:
+            return False
+
+        with self._lock:
+            row_id = row.get("id")
+            if row_id is not None and remember is not None:
+                if row_id in self._ids:
+                    return False
+                self._ids.add(row_id)
+                remember(row_id)
+                if len(self._id_order) > self.recent_ids:
+                    self._ids.discard(self._id_order.popleft())  # oldest remembered id
+            _add_to(self._total, rating)
+            _add_to(self._days.setdefault(day, _new_bucket()), rating)
+        return True
+
+    def _window(self, end, days):
+        """(count, sum) over the `days` days ending with `end` (inclusive)."""
+        count = total = 0
+        for offset in range(days):
+            bucket = self._days.get(end - timedelta(days=offset))
+            if bucket:
+                count += bucket["count"]
+                total += bucket["sum"]
+        return count, total
+
+    def summary(self, today=None, days=30):
+        """Overall stats, rolling-window trends and a `days`-long daily series."""
+        today = today or datetime.utcnow().date()
+
+        with self._lock:
+            histogram = {str(rating): 0 for rating in RATING_SCALE}
+            for rating, count in sorted(self._total["histogram"].items()):
+                histogram[str(rating)] = count
+
+            trends = {}
+            for window in TREND_WINDOWS:
+                count, total = self._window(today, window)
+                previous_count, previous_total = self._window(today - timedelta(days=window), window)
+                mean, previous_mean = _mean(count, total), _mean(previous_count, previous_total)
+                trends[f"{window}d"] = {
+                    "count": count,
+                    "mean": mean,
+                    "previous_count": previous_count,
+                    "previous_mean": previous_mean,
+                    "mean_change": round(mean - previous_mean, 2) if mean is not None and previous_mean is not None else None,
+                }
+
+            daily = []
+            for offset in range(days - 1, -1, -1):
+                day = today - timedelta(days=offset)
+                bucket = self._days.get(day)
+                count = bucket["count"] if bucket else 0
+                daily.append({
+                    "date": day.isoformat(),
+                    "count": count,
+                    "mean": _mean(count, bucket["sum"]) if bucket else None,
+                })
+
+            return {
+                "count": self._total["count"],
+                "mean": _mean(self._total["count"], self._total["sum"]),
+                "histogram": histogram,
+                "trends": trends,
+                "daily": daily,
+            }
@@ -0,0 +1,205 @@
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # Batched helpers fall back to the scalar formula
+    np = None
+
+# =====================================
+# 🌍 Geohash Helpers
+# =====================================
+# Standard base-32 geohash: each character adds 5 bits, alternating
+# longitude/latitude. Precision 5 cells are ~4.9 km x 4.9 km at the equator.
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def geohash_encode(latitude, longitude, precision=5):
+    """Encode a coordinate as a geohash string of `precision` characters."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True  # even bits refine longitude
+
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                bits = (bits << 1) | 1
+                lon_lo = mid
+            else:
+                bits <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                bits = (bits << 1) | 1
+                lat_lo = mid
+            else:
+                bits <<= 1
+                lat_hi = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+
+def geohash_bbox(geohash):
+    """Return the (south, west, north, east) bounds of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def geohash_cell_size(precision):
+    """Return the (lat_degrees, lon_degrees) size of a cell at `precision`."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """Bounding box (south, west, north, east) of a circle, clamped to valid latitudes."""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    dlon = min(dlat / cos_lat, 180.0)
+    return (
+        max(latitude - dlat, -90.0),
+        longitude - dlon,
+        min(latitude + dlat, 90.0),
+        longitude + dlon,
+    )
+
+
+def _wrap_longitude(longitude):
+    return ((longitude + 180.0) % 360.0) - 180.0
+
+
+def geohashes_covering(latitude, longitude, radius_km, precision=5, max_cells=None):
+    """
+    Return the set of geohash cells intersecting the bounding box of a circle,
+    or None when that takes more than `max_cells` cells (cells shrink towards
+    the poles, so the count grows without bound there).
+    """
+    south, west, north, east = radius_bbox(latitude, longitude, radius_km)
+    lat_step, lon_step = geohash_cell_size(precision)
+    if max_cells is not None:
+        # Upper bound on the loop below, checked before enumerating anything
+        rows = math.ceil((north - south) / lat_step) + 1
+        columns = math.ceil((east - west) / lon_step) + 1
+        if rows * min(columns, (1 << ((5 * precision + 1) // 2))) > max_cells:
+            return None
+    cells = set()
+
+    # Stepping by at most one cell size visits every cell the box touches
+    lat = south
+    while True:
+        lon = west
+        while True:
+            cells.add(geohash_encode(min(lat, 90.0 - 1e-9), _wrap_longitude(lon), precision))
+            if lon >= east:
+                break
+            lon = min(lon + lon_step, east)
+        if lat >= north:
+            break
+        lat = min(lat + lat_step, north)
+
+    return cells
+
+
+# =====================================
+# 📏 Haversine Distances
+# =====================================
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance in kilometers between two coordinates."""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = math.radians(lon2 - lon1)
+
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def haversine_many(latitude, longitude, latitudes, longitudes):
+    """
+    Distances in kilometers from one point to many, in a single vectorized pass.
+    Returns a NumPy array (or a list when NumPy is not installed).
+    """
+    if np is None:
+        return [haversine_km(latitude, longitude, lat, lon) for lat, lon in zip(latitudes, longitudes)]
+
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(np.asarray(latitudes, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(longitudes, dtype=np.float64) - longitude)
+
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_k(latitude, longitude, latitudes, longitudes, k, max_km=None):
+    """
+    Indices and distances of the `k` points nearest to (latitude, longitude),
+    nearest first, optionally limited to `max_km`. Uses a partial sort
+    (argpartition) so only the selected k are fully ordered.
+    Returns (indices, distances_km) as plain lists.
+    """
+    count = len(latitudes)
+    if count == 0 or k <= 0:
+        return [], []
+
+    distances = haversine_many(latitude, longitude, latitudes, longitudes)
+
+    if np is None:
+        candidates = (
+            (d, i) for i, d in enumerate(distances) if max_km is None or d <= max_km
+        )
+        best = heapq.nsmallest(k, candidates)
+        return [i for _, i in best], [d for d, _ in best]
+
+    indices = np.arange(count)
+    if max_km is not None:
+        within = distances <= max_km
+        indices = indices[within]
+        distances = distances[within]
+
+    if len(indices) > k:
+        top = np.argpartition(distances, k - 1)[:k]
+        indices, distances = indices[top], distances[top]
+
+    order = np.argsort(distances, kind="stable")
+    return indices[order].tolist(), distances[order].tolist()
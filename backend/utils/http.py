@@ -0,0 +1,31 @@
+import os
+import threading
+
+# =====================================
+# 🌐 Shared HTTP Session
+# =====================================
+# One keep-alive connection pool per worker for outbound API calls
+# (OpenWeatherMap, Overpass, ...), so TLS handshakes are paid once per host
+# instead of once per request.
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """Return the process-wide pooled requests.Session."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
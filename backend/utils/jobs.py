@@ -0,0 +1,203 @@
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+
+# =====================================
+# 🧵 Background Job Queue
+# =====================================
+# A bounded queue drained by a few worker threads. A failed job is retried
+# with exponential backoff (plus jitter) until max_retries. When the queue is
+# full, enqueue() refuses the job and counts it as rejected, so a burst cannot
+# grow memory without bound.
+#
+# Jobs are (name, JSON-serializable payload) pairs dispatched to handlers
+# registered by name. With REDIS_URL set (and `redis` installed) the queue is
+# shared by every worker process through a Redis list + delayed sorted set.
+
+
+class LocalJobBackend:
+    """In-process priority queue ordered by the time each job becomes ready."""
+
+    def __init__(self):
+        self._heap = []  # (ready_at, tiebreak, job)
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def put(self, job, ready_at):
+        with self._cond:
+            heapq.heappush(self._heap, (ready_at, next(self._counter), job))
+            self._cond.notify()
+
+    def get(self, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    return heapq.heappop(self._heap)[2]
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                wait = remaining if not self._heap else min(remaining, self._heap[0][0] - now)
+                self._cond.wait(max(wait, 0.01))
+
+    def depth(self):
+        return len(self._heap)
+
+
+class RedisJobBackend:
+    """Redis-backed queue: ready jobs in a list, retries waiting in a sorted set."""
+
+    def __init__(self, url, name):
+        import redis
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.ready_key = f"phantomops:jobs:{name}"
+        self.delayed_key = f"phantomops:jobs:{name}:delayed"
+
+    def put(self, job, ready_at):
+        payload = json.dumps(job)
+        if ready_at <= time.time():
+            self.redis.lpush(self.ready_key, payload)
+        else:
+            self.redis.zadd(self.delayed_key, {payload: ready_at})
+
+    def _promote_due(self):
+        for payload in self.redis.zrangebyscore(self.delayed_key, 0, time.time(), start=0, num=100):
+            # Only the worker that removes the entry moves it, so it is never duplicated
+            if self.redis.zrem(self.delayed_key, payload):
+                self.redis.lpush(self.ready_key, payload)
+
+    def get(self, timeout):
+        self._promote_due()
+        item = self.redis.brpop(self.ready_key, timeout=max(1, int(timeout)))
+        return json.loads(item[1]) if item else None
+
+    def depth(self):
+        return self.redis.llen(self.ready_key) + self.redis.zcard(self.delayed_key)
+
+
+class JobQueue:
+    """Named-handler job queue with retry/backoff and backpressure metrics."""
+
+    def __init__(self, name, workers=2, maxsize=1000, max_retries=3, backoff_base=1.0, backoff_max=60.0):
+        self.name = name
+        self.workers = workers
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.backend = _create_backend(name)
+        self._handlers = {}
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.enqueued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.in_progress = 0
+        self.max_depth = 0
+
+    def register(self, name, handler):
+        """Register `handler(payload)` for jobs called `name`."""
+        self._handlers[name] = handler
+
+    def enqueue(self, name, payload):
+        """Queue a job; returns False (and counts a rejection) when the queue is full."""
+        depth = self.backend.depth()
+        with self._stats_lock:
+            if depth >= self.maxsize:
+                self.rejected += 1
+                return False
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, depth + 1)
+
+        self._ensure_workers()
+        self.backend.put({"name": name, "payload": payload, "attempt": 0}, time.time())
+        return True
+
+    def _ensure_workers(self):
+        # Started lazily so importing the module never spawns threads
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"{self.name}-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        while True:
+            job = self.backend.get(timeout=5)
+            if job is None:
+                continue
+
+            handler = self._handlers.get(job["name"])
+            if handler is None:
+                print(f"⚠️  No handler registered for job {job['name']}")
+                with self._stats_lock:
+                    self.failed += 1
+                continue
+
+            with self._stats_lock:
+                self.in_progress += 1
+            try:
+                handler(job["payload"])
+                with self._stats_lock:
+                    self.completed += 1
+            except Exception as e:
+                if job["attempt"] < self.max_retries:
+                    delay = self._backoff(job["attempt"])
+                    print(f"⚠️  Job {job['name']} failed ({str(e)}), retry {job['attempt'] + 1} in {delay:.1f}s")
+                    job["attempt"] += 1
+                    self.backend.put(job, time.time() + delay)
+                    with self._stats_lock:
+                        self.retried += 1
+                else:
+                    print(f"❌  Job {job['name']} failed after {job['attempt'] + 1} attempts: {str(e)}")
+                    with self._stats_lock:
+                        self.failed += 1
+            finally:
+                with self._stats_lock:
+                    self.in_progress -= 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "name": self.name,
+                "backend": type(self.backend).__name__,
+                "depth": self.backend.depth(),
+                "maxsize": self.maxsize,
+                "max_depth": self.max_depth,
+                "in_progress": self.in_progress,
+                "workers": len(self._threads),
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "retried": self.retried,
+                "failed": self.failed,
+            }
+
+
+def _create_backend(name):
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            backend = RedisJobBackend(redis_url, name)
+            backend.redis.ping()
+            return backend
+        except Exception as e:
+            print(f"⚠️ Redis job broker unavailable ({str(e)}), using in-process queue")
+    return LocalJobBackend()
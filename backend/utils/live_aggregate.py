@@ -0,0 +1,102 @@
+import threading
+import time
+
+from utils.pubsub import broker
+
+# =====================================
+# 🔁 In-Memory Aggregates Kept Current from a Change Feed
+# =====================================
+# An aggregate (cluster counters, rating stats) is loaded from its table once
+# per worker, page by page without keeping the rows, then follows the table's
+# broker topic, so reads never scan the table. Loading is single-flight:
+# concurrent first requests wait for one load instead of each scanning the
+# table. Only a replay gap (a feed reset) schedules a reload, on the next
+# request; there is no timed full reload.
+#
+# The in-process broker only carries this worker's writes. Run several workers
+# with REDIS_URL set, or each one only sees its own changes.
+
+
+class LiveAggregate:
+    """
+    Drives one aggregate: `load(client)` rebuilds it from the table and
+    `apply(event)` folds in one change event (replays must be harmless).
+    """
+
+    def __init__(self, name, topic, load, apply, poll_seconds=15):
+        self.name = name
+        self.topic = topic
+        self.poll_seconds = poll_seconds
+        self._load = load
+        self._apply = apply
+        self._state = {"loaded": False, "cursor": None, "client": None}
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # one (re)load at a time
+        self._loaded = threading.Event()  # wakes the follower after each (re)load
+        self._thread = None
+
+    def ensure(self, client=None):
+        """
+        Load the aggregate if needed (concurrent callers share one load) and
+        make sure the follower runs. `client` is kept for reloads after a gap.
+        """
+        with self._lock:
+            if client is not None:
+                self._state["client"] = client
+            loaded = self._state["loaded"]
+            if self._thread is None:
+                if not getattr(broker, "shared", False):
+                    print(f"⚠️ {self.name} follows the in-process event feed; other workers' writes need REDIS_URL")
+                self._thread = threading.Thread(target=self._follow, name=f"{self.name}-feed", daemon=True)
+                self._thread.start()
+
+        if not loaded:
+            with self._load_lock:
+                with self._lock:
+                    loaded = self._state["loaded"]
+                if not loaded:
+                    self._reload()
+
+    def _reload(self):
+        """Rebuild from the table. Caller holds _load_lock."""
+        with self._lock:
+            client = self._state["client"]
+        # Take the feed position first: events published during the load are replayed, and replays are idempotent
+        cursor = broker.last_id(self.topic)
+        self._load(client)
+        with self._lock:
+            self._state["cursor"] = cursor
+            self._state["loaded"] = True
+        self._loaded.set()
+
+    def _follow(self):
+        """Background loop applying change events to the aggregate."""
+        while True:
+            with self._lock:
+                loaded = self._state["loaded"]
+                cursor = self._state["cursor"]
+            if not loaded:
+                self._loaded.wait()
+                continue
+
+            try:
+                events, reset = broker.read(self.topic, cursor, timeout=self.poll_seconds)
+            except Exception as e:
+                print(f"⚠️ {self.name} feed error: {str(e)}")
+                time.sleep(5)
+                continue
+
+            with self._lock:
+                if self._state["cursor"] != cursor:
+                    continue  # reloaded meanwhile
+                if reset:
+                    self._state["loaded"] = False
+                    self._loaded.clear()
+                    continue
+                for event in events:
+                    try:
+                        self._apply(event)
+                    except Exception as e:
+                        # One malformed row must not stop the aggregate from following the feed
+                        print(f"⚠️ Skipping {self.name} event {event.get('id')}: {str(e)}")
+                    self._state["cursor"] = event["id"]
@@ -0,0 +1,205 @@
+import bisect
+import os
+import threading
+
+# =====================================
+# 📈 Prometheus-Style Metrics (no client library)
+# =====================================
+# Counters, gauges and histograms keyed by label values, rendered in the
+# Prometheus text exposition format on scrape. Recording a sample is a dict
+# lookup, a bisect and a few additions under a per-metric lock; all string
+# formatting happens in render(), off the request path.
+#
+# Values are per process: with several workers, scrape each one (or run the
+# metrics endpoint on a single worker).
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Seconds; covers cached answers (~ms) up to the slowest provider timeouts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}  # label values tuple -> value
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for values, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values, value):
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                # per-bucket counts (not cumulative; the last slot is +Inf), sum
+                series = self._values[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        with self._lock:
+            items = sorted((values, (list(counts), total)) for values, (counts, total) in self._values.items())
+        lines = self._header()
+        for values, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+# =====================================
+# 📋 Registry
+# =====================================
+
+class Registry:
+    """Named metrics plus collector callbacks that report point-in-time state on scrape."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self._get_or_create(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=()):
+        return self._get_or_create(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labels, buckets)
+
+    def register_collector(self, collect):
+        """`collect()` returns (name, kind, help, [(labels dict, value), ...]) tuples."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collect in collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                print(f"⚠️ Metrics collector failed: {str(e)}")
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "phantomops_http_request_duration_seconds",
+    "Time to produce a response (streamed bodies: until the first byte), by blueprint and route.",
+    ("blueprint", "route", "method", "status"),
+)
+http_requests_in_flight = registry.gauge(
+    "phantomops_http_requests_in_flight",
+    "Requests currently being handled, by blueprint.",
+    ("blueprint",),
+)
+external_call_duration = registry.histogram(
+    "phantomops_external_call_duration_seconds",
+    "Outbound calls to Supabase and the enrichment/routing providers, by outcome.",
+    ("provider", "outcome"),
+)
+
+
+def observe_external_call(provider, outcome, seconds):
+    """Record one outbound call (outcome: success, client_error, server_error, timeout, error, circuit_open)."""
+    if METRICS_ENABLED:
+        external_call_duration.observe(seconds, provider, outcome)
+
+
+def classify_exception(error):
+    """Outcome label for a failed outbound call."""
+    if "Timeout" in type(error).__name__ or isinstance(error, TimeoutError):
+        return "timeout"
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return "server_error" if status >= 500 else "client_error"
+    return "error"
@@ -0,0 +1,107 @@
+import base64
+import json
+import re
+from datetime import datetime
+
+# =====================================
+# 📑 Keyset (Cursor) Pagination Helpers
+# =====================================
+# Pages are ordered by (created_at DESC, id DESC). The cursor is the sort key
+# of the last row returned, so every page is a bounded index range scan
+# instead of an OFFSET that grows with the table.
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Postgres trims trailing zeros from fractional seconds ("...00:00.12345+00:00"),
+# which datetime.fromisoformat rejects before Python 3.11
+_TIMESTAMP_RE = re.compile(
+    r"(\d{4}-\d\d-\d\d)"
+    r"(?:[T ](\d\d:\d\d(?::\d\d(?:\.(\d{1,6}))?)?)(Z|[+-]\d\d:?\d\d)?)?",
+    re.ASCII,
+)
+
+
+def normalize_timestamp(value):
+    """
+    Return `value` as a canonical ISO 8601 timestamp, raising ValueError if it
+    is not one. Accepts 1-6 fractional digits and a 'Z' or +HHMM offset on
+    every supported Python version.
+    """
+    match = _TIMESTAMP_RE.fullmatch(value) if isinstance(value, str) else None
+    if not match:
+        raise ValueError(f"Invalid timestamp: {value!r}")
+
+    day, clock, fraction, offset = match.groups()
+    if clock is None:
+        return datetime.fromisoformat(day).isoformat()
+    if fraction is not None:
+        clock = clock[: -len(fraction)] + fraction.ljust(6, "0")
+    if offset == "Z":
+        offset = "+00:00"
+    elif offset and ":" not in offset:
+        offset = f"{offset[:3]}:{offset[3:]}"
+    # fromisoformat still range-checks the fields (month 13, hour 25, ...)
+    return datetime.fromisoformat(f"{day}T{clock}{offset or ''}").isoformat()
+
+
+def encode_cursor(row):
+    """Build an opaque cursor from the last row of a page."""
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Return (created_at, id) from a cursor, raising ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(created_at, str) or not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise ValueError("Invalid cursor")
+    # The timestamp is pasted into a PostgREST filter, so only a real timestamp
+    # (re-serialized, never the raw string) may get there
+    try:
+        created_at = normalize_timestamp(created_at)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    return created_at, row_id
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Parse a `limit` query parameter, clamping it to [1, maximum]."""
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    return max(1, min(limit, maximum))
+
+
+def apply_keyset(query, cursor):
+    """Order a Supabase query by (created_at, id) descending, starting after `cursor`."""
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        # Quote the timestamp: it contains ':' and '+', which PostgREST treats as syntax
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{row_id})'
+        )
+    return query.order("created_at", desc=True).order("id", desc=True)
+
+
+def fetch_page(query, cursor, limit):
+    """
+    Execute a keyset-paginated query.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    # Ask for one extra row to know whether another page exists
+    response = apply_keyset(query, cursor).limit(limit + 1).execute()
+    rows = response.data or []
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
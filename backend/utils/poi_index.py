@@ -0,0 +1,320 @@
+"""
+Offline point-of-interest index for escape routes.
+
+Hospitals, police and fire stations are loaded from a GeoJSON or CSV extract
+into one KD-tree per amenity type. Points live on the unit sphere as (x, y, z)
+in flat `array('d')` buffers laid out as an implicit tree, so there are no
+per-node objects and the whole index loads from disk with a few reads.
+
+Build an index file (run from backend/):
+    python -m utils.poi_index build safety.geojson pois.idx
+
+From an OSM extract, export the amenities to GeoJSON first, e.g.
+    osmium tags-filter region.osm.pbf nwr/amenity=hospital,police,fire_station -o safety.osm.pbf
+    osmium export safety.osm.pbf -o safety.geojson
+"""
+import csv
+import heapq
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+
+EARTH_RADIUS_KM = 6371.0
+LEAF_SIZE = 16
+POI_TYPES = ("hospital", "police", "fire_station")
+
+_MAGIC = b"PHOPOI1\n"
+
+
+def _to_unit_vector(latitude, longitude):
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)
+
+
+def _chord_for_km(distance_km):
+    """Straight-line (chord) distance on the unit sphere for an arc length in km."""
+    angle = min(distance_km / EARTH_RADIUS_KM, math.pi)
+    return 2.0 * math.sin(angle / 2.0)
+
+
+def _km_for_chord(chord):
+    return 2.0 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2.0))
+
+
+# =====================================
+# 🌳 Implicit KD-Tree (one per amenity type)
+# =====================================
+
+class _KDTree:
+    """
+    Static KD-tree over unit-sphere coordinates. The node covering [lo, hi)
+    stores its splitting point at (lo + hi) // 2 and splits on axis depth % 3;
+    ranges of LEAF_SIZE points or fewer are scanned linearly.
+    """
+
+    def __init__(self, xs, ys, zs, lats, lons, names):
+        self.xs, self.ys, self.zs = xs, ys, zs
+        self.lats, self.lons = lats, lons
+        self.names = names
+
+    def __len__(self):
+        return len(self.xs)
+
+    @classmethod
+    def build(cls, points):
+        """Build from a list of (latitude, longitude, name) tuples."""
+        xs, ys, zs = array("d"), array("d"), array("d")
+        for latitude, longitude, _ in points:
+            x, y, z = _to_unit_vector(latitude, longitude)
+            xs.append(x)
+            ys.append(y)
+            zs.append(z)
+
+        order = list(range(len(points)))
+        axes = (xs, ys, zs)
+        stack = [(0, len(order), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= LEAF_SIZE:
+                continue
+            order[lo:hi] = sorted(order[lo:hi], key=axes[depth % 3].__getitem__)
+            mid = (lo + hi) // 2
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+        return cls(
+            array("d", (xs[i] for i in order)),
+            array("d", (ys[i] for i in order)),
+            array("d", (zs[i] for i in order)),
+            array("d", (points[i][0] for i in order)),
+            array("d", (points[i][1] for i in order)),
+            [points[i][2] for i in order],
+        )
+
+    def query(self, qx, qy, qz, k, max_chord):
+        """
+        Return [(chord, index)] for the `k` nearest points within `max_chord`,
+        nearest first. `k=None` returns every point within range.
+        """
+        xs, ys, zs = self.xs, self.ys, self.zs
+        axes = (xs, ys, zs)
+        query_point = (qx, qy, qz)
+        worst = max_chord * max_chord
+        heap = []  # max-heap of (-distance², index)
+
+        stack = [(0, len(xs), 0, 0.0)]
+        while stack:
+            lo, hi, depth, plane_d2 = stack.pop()
+            if plane_d2 > worst:
+                continue
+
+            if hi - lo <= LEAF_SIZE:
+                candidates = range(lo, hi)
+            else:
+                mid = (lo + hi) // 2
+                axis = depth % 3
+                diff = query_point[axis] - axes[axis][mid]
+                near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+                # Push the far side first so the near side is searched first
+                stack.append((far[0], far[1], depth + 1, diff * diff))
+                stack.append((near[0], near[1], depth + 1, 0.0))
+                candidates = (mid,)
+
+            for i in candidates:
+                dx = xs[i] - qx
+                dy = ys[i] - qy
+                dz = zs[i] - qz
+                d2 = dx * dx + dy * dy + dz * dz
+                if d2 > worst:
+                    continue
+                heapq.heappush(heap, (-d2, i))
+                if k is not None and len(heap) > k:
+                    heapq.heappop(heap)
+                if k is not None and len(heap) == k:
+                    worst = -heap[0][0]
+
+        return sorted((math.sqrt(-neg_d2), i) for neg_d2, i in heap)
+
+
+# =====================================
+# 📍 Public Index
+# =====================================
+
+class PoiIndex:
+    """Nearest-k / radius search over safety amenities, keyed by amenity type."""
+
+    def __init__(self, trees):
+        self.trees = trees  # place_type -> _KDTree
+
+    def __len__(self):
+        return sum(len(tree) for tree in self.trees.values())
+
+    @classmethod
+    def from_points(cls, points):
+        """Build from an iterable of (place_type, latitude, longitude, name)."""
+        grouped = {place_type: [] for place_type in POI_TYPES}
+        for place_type, latitude, longitude, name in points:
+            if place_type in grouped:
+                grouped[place_type].append((latitude, longitude, name))
+        return cls({place_type: _KDTree.build(pts) for place_type, pts in grouped.items()})
+
+    def nearest(self, latitude, longitude, place_type, k=5, radius_km=None):
+        """Return up to `k` places of `place_type`, nearest first, optionally within `radius_km`."""
+        tree = self.trees.get(place_type)
+        if tree is None or not len(tree):
+            return []
+
+        max_chord = _chord_for_km(radius_km) if radius_km is not None else 2.0
+        qx, qy, qz = _to_unit_vector(latitude, longitude)
+        return [
+            {
+                "name": tree.names[i],
+                "latitude": tree.lats[i],
+                "longitude": tree.lons[i],
+                "distance_km": round(_km_for_chord(chord), 2),
+                "type": place_type,
+            }
+            for chord, i in tree.query(qx, qy, qz, k, max_chord)
+        ]
+
+    def within(self, latitude, longitude, place_type, radius_km):
+        """Return every place of `place_type` within `radius_km`, nearest first."""
+        return self.nearest(latitude, longitude, place_type, k=None, radius_km=radius_km)
+
+    def nearby(self, latitude, longitude, radius_km, k=5):
+        """Return {place_type: [up to k nearest places within radius_km]} for every type."""
+        return {
+            place_type: self.nearest(latitude, longitude, place_type, k=k, radius_km=radius_km)
+            for place_type in self.trees
+        }
+
+    # ---------- Persistence ----------
+
+    def save(self, path):
+        """Write the index as a compact binary file (arrays are stored as raw doubles)."""
+        header = {"types": {place_type: len(tree) for place_type, tree in self.trees.items()}}
+        header_bytes = json.dumps(header).encode("utf-8")
+
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            for tree in self.trees.values():
+                for values in (tree.xs, tree.ys, tree.zs, tree.lats, tree.lons):
+                    values.tofile(f)
+                names = "\n".join(name.replace("\n", " ") for name in tree.names).encode("utf-8")
+                f.write(struct.pack("<Q", len(names)))
+                f.write(names)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by save()."""
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a POI index file")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len))
+
+            trees = {}
+            for place_type, count in header["types"].items():
+                columns = []
+                for _ in range(5):
+                    values = array("d")
+                    values.fromfile(f, count)
+                    columns.append(values)
+                (names_len,) = struct.unpack("<Q", f.read(8))
+                names = f.read(names_len).decode("utf-8").split("\n") if count else []
+                trees[place_type] = _KDTree(*columns, names)
+
+        return cls(trees)
+
+
+# =====================================
+# 📥 Importers (GeoJSON / CSV)
+# =====================================
+
+def _feature_coordinates(geometry):
+    """Representative (lat, lon) for a GeoJSON geometry: the point, or the mean of its outer ring."""
+    kind = geometry.get("type")
+    coords = geometry.get("coordinates")
+    if kind == "Point":
+        return coords[1], coords[0]
+    if kind == "Polygon":
+        ring = coords[0]
+    elif kind == "MultiPolygon":
+        ring = coords[0][0]
+    elif kind == "LineString":
+        ring = coords
+    else:
+        return None
+    lons = [c[0] for c in ring]
+    lats = [c[1] for c in ring]
+    return sum(lats) / len(lats), sum(lons) / len(lons)
+
+
+def read_geojson(path):
+    """Yield (place_type, latitude, longitude, name) from a GeoJSON FeatureCollection."""
+    with open(path, "r", encoding="utf-8") as f:
+        collection = json.load(f)
+
+    for feature in collection.get("features", []):
+        properties = feature.get("properties") or {}
+        place_type = properties.get("amenity")
+        if place_type not in POI_TYPES or not feature.get("geometry"):
+            continue
+        location = _feature_coordinates(feature["geometry"])
+        if location is None:
+            continue
+        name = properties.get("name") or f"Unnamed {place_type.replace('_', ' ').title()}"
+        yield place_type, location[0], location[1], name
+
+
+def read_csv(path):
+    """
+    Yield (place_type, latitude, longitude, name) from a CSV with columns
+    amenity (or type), name, latitude (or lat), longitude (or lon).
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            place_type = row.get("amenity") or row.get("type")
+            if place_type not in POI_TYPES:
+                continue
+            try:
+                latitude = float(row.get("latitude") or row.get("lat"))
+                longitude = float(row.get("longitude") or row.get("lon"))
+            except (TypeError, ValueError):
+                continue
+            name = row.get("name") or f"Unnamed {place_type.replace('_', ' ').title()}"
+            yield place_type, latitude, longitude, name
+
+
+def import_file(path):
+    """Build a PoiIndex from a .geojson/.json or .csv extract."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".geojson", ".json"):
+        return PoiIndex.from_points(read_geojson(path))
+    if extension == ".csv":
+        return PoiIndex.from_points(read_csv(path))
+    raise ValueError(f"Unsupported POI file type: {extension}")
+
+
+def load_index(path):
+    """Load a built index file, or build one on the fly from a GeoJSON/CSV extract."""
+    if os.path.splitext(path)[1].lower() in (".geojson", ".json", ".csv"):
+        return import_file(path)
+    return PoiIndex.load(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("Usage: python -m utils.poi_index build <input.geojson|input.csv> <output.idx>")
+        sys.exit(1)
+
+    index = import_file(sys.argv[2])
+    index.save(sys.argv[3])
+    print(f"✅ Indexed {len(index)} places into {sys.argv[3]}")
@@ -0,0 +1,235 @@
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+
+# =====================================
+# 🔥 Opt-In Sampling Profiler for Slow Requests
+# =====================================
+# A profiled request registers its thread. While any are registered, one
+# sampler thread snapshots their stacks every PROFILE_INTERVAL_MS through
+# sys._current_frames() and credits the time since the previous sample to the
+# stack it sees (samples arrive late while CPU-bound code holds the GIL, so
+# plain counts would under-weight it). Requests that are not profiled pay
+# nothing. Profiles of requests slower than PROFILE_SLOW_MS (or explicitly
+# requested) go into a bounded ring buffer and can be downloaded as collapsed
+# stacks (flamegraph.pl, speedscope) or speedscope JSON.
+#
+# Work a request hands to a thread pool is sampled too when it is submitted
+# through profiler.wrap(fn): while the task runs, the worker thread is
+# attached to the request's session and its stacks are rooted at a
+# "[thread <name>]" frame, so pool waiting on the request thread and the
+# network/parsing time on the workers show up side by side.
+
+PROFILE_REQUESTS = os.getenv("PROFILE_REQUESTS", "0") == "1"  # profile every request
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "1000"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "20"))
+PROFILE_MAX_DEPTH = 128
+
+PROFILE_FORMATS = {
+    "collapsed": "text/plain",
+    "speedscope": "application/json",
+}
+
+
+def _frame_key(frame):
+    code = frame.f_code
+    return code.co_name, os.path.basename(code.co_filename), code.co_firstlineno
+
+
+def _stack_of(frame):
+    """Root-first tuple of (function, file, line) for a thread's current frame."""
+    stack = []
+    while frame is not None and len(stack) < PROFILE_MAX_DEPTH:
+        stack.append(_frame_key(frame))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class ProfileSession:
+    """Stack samples for one request (its own thread plus attached pool workers)."""
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.stacks = Counter()  # stack -> seconds attributed to it
+        self.samples = 0
+        self.stopped = False
+
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads from one background thread."""
+
+    def __init__(self, interval_ms=PROFILE_INTERVAL_MS):
+        self.interval = interval_ms / 1000.0
+        self._threads = {}  # thread id -> [session, root frame or None, last sample time]
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self, thread_id=None):
+        session = ProfileSession(thread_id or threading.get_ident())
+        with self._cond:
+            self._threads[session.thread_id] = [session, None, session.started]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return session
+
+    def stop(self, session):
+        with self._cond:
+            session.stopped = True
+            for thread_id in [tid for tid, entry in self._threads.items() if entry[0] is session]:
+                del self._threads[thread_id]
+        return time.perf_counter() - session.started
+
+    def current_session(self):
+        """The session sampling the calling thread, if any."""
+        with self._cond:
+            entry = self._threads.get(threading.get_ident())
+        return entry[0] if entry else None
+
+    def wrap(self, fn):
+        """
+        Bind `fn` to the calling thread's session (if profiled) so a pool
+        worker running it is sampled into the same profile:
+            executor.submit(profiler.wrap(fetch_feed), url)
+        """
+        session = self.current_session()
+        if session is None:
+            return fn
+
+        def attached(*args, **kwargs):
+            thread_id = threading.get_ident()
+            root = (f"[thread {threading.current_thread().name}]", "", 0)
+            with self._cond:
+                # Skip if the request was already answered or the thread is attached elsewhere
+                registered = not session.stopped and thread_id not in self._threads
+                if registered:
+                    self._threads[thread_id] = [session, root, time.perf_counter()]
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if registered:
+                    with self._cond:
+                        if self._threads.get(thread_id, [None])[0] is session:
+                            del self._threads[thread_id]
+
+        return attached
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._threads:
+                    self._cond.wait()
+            time.sleep(self.interval)
+
+            frames = sys._current_frames()
+            now = time.perf_counter()
+            with self._cond:
+                for thread_id, entry in self._threads.items():
+                    frame = frames.get(thread_id)
+                    if frame is None:
+                        continue
+                    session, root, last_sample = entry
+                    stack = _stack_of(frame)
+                    if root is not None:
+                        stack = (root,) + stack
+                    session.stacks[stack] += now - last_sample
+                    session.samples += 1
+                    entry[2] = now
+            del frames  # drop frame references promptly
+
+
+class ProfileStore:
+    """Ring buffer holding the last `size` captured profiles."""
+
+    def __init__(self, size=PROFILE_BUFFER_SIZE):
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, session, duration, interval, **request_info):
+        profile = {
+            "id": uuid.uuid4().hex[:12],
+            "started_at": session.started_at,
+            "duration_ms": round(duration * 1000, 1),
+            "samples": session.samples,
+            "interval_ms": round(interval * 1000, 3),
+            "stacks": dict(session.stacks),
+            **request_info,
+        }
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def list(self):
+        """Newest first, without the stack data."""
+        with self._lock:
+            profiles = list(self._profiles)
+        return [{k: v for k, v in profile.items() if k != "stacks"} for profile in reversed(profiles)]
+
+    def get(self, profile_id):
+        with self._lock:
+            for profile in self._profiles:
+                if profile["id"] == profile_id:
+                    return profile
+        return None
+
+
+def _frame_label(frame):
+    name, filename, line = frame
+    return f"{name} ({filename}:{line})" if filename else name
+
+
+def to_collapsed(profile):
+    """Brendan Gregg collapsed-stack text: "root;child;leaf <milliseconds>" per line."""
+    lines = [
+        ";".join(_frame_label(frame) for frame in stack) + f" {max(1, round(seconds * 1000))}"
+        for stack, seconds in sorted(profile["stacks"].items(), key=lambda item: -item[1])
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def to_speedscope(profile):
+    """speedscope "sampled" profile; weights are milliseconds."""
+    frames = []
+    index = {}
+    samples = []
+    weights = []
+    for stack, seconds in profile["stacks"].items():
+        sample = []
+        for frame in stack:
+            if frame not in index:
+                index[frame] = len(frames)
+                name, filename, line = frame
+                frames.append({"name": name, "file": filename, "line": line})
+            sample.append(index[frame])
+        samples.append(sample)
+        weights.append(round(seconds * 1000, 3))
+
+    title = f"{profile.get('method', '')} {profile.get('path', '')} ({profile['duration_ms']} ms)".strip()
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "exporter": "phantomops",
+        "name": title,
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": title,
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 3),
+            "samples": samples,
+            "weights": weights,
+        }],
+    }
+
+
+profiler = SamplingProfiler()
+profile_store = ProfileStore()
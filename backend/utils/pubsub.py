@@ -0,0 +1,147 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+# =====================================
+# 📣 Change-Event Broker
+# =====================================
+# Write paths publish small change events per topic ("incidents", ...) and
+# stream endpoints read them with resume support. Each topic keeps a bounded
+# replay buffer; a reader whose Last-Event-ID fell out of it (or came from a
+# different process) gets `reset=True` and should refetch in full.
+#
+# The in-process broker serves a single worker. Set REDIS_URL (and install
+# `redis`) to share events across workers through Redis Streams.
+
+EVENT_HISTORY = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+
+
+class LocalEventBroker:
+    """Thread-safe in-process broker with a bounded replay buffer per topic."""
+
+    shared = False  # other workers never see these events
+
+    def __init__(self, history=EVENT_HISTORY):
+        self.history = history
+        # Event ids are "<epoch>-<seq>" so ids from a previous process are never mistaken for ours
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events = {}  # topic -> deque of (seq, event)
+        self._seq = {}  # topic -> last sequence number
+        self._cond = threading.Condition()
+
+    def _event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, topic, event_type, data):
+        """Append an event to `topic` and wake up readers. Returns the event id."""
+        with self._cond:
+            seq = self._seq.get(topic, 0) + 1
+            self._seq[topic] = seq
+            event = {"id": self._event_id(seq), "type": event_type, "data": data}
+            self._events.setdefault(topic, deque(maxlen=self.history)).append((seq, event))
+            self._cond.notify_all()
+        return event["id"]
+
+    def last_id(self, topic):
+        """Id of the newest event on `topic` (a valid resume point even if none were published)."""
+        with self._cond:
+            return self._event_id(self._seq.get(topic, 0))
+
+    def read(self, topic, last_id, timeout=15.0):
+        """
+        Return (events, reset) for events after `last_id`, waiting up to
+        `timeout` seconds for new ones. `reset` is True when `last_id` cannot
+        be resumed from.
+        """
+        epoch, _, seq = (last_id or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return [], True
+        after = int(seq)
+
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                current = self._seq.get(topic, 0)
+                if after > current:
+                    return [], True
+                if after < current:
+                    buffered = self._events.get(topic, ())
+                    oldest = buffered[0][0] if buffered else current + 1
+                    if after + 1 < oldest:
+                        return [], True  # fell out of the replay buffer
+                    return [event for seq, event in buffered if seq > after], False
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return [], False
+                self._cond.wait(remaining)
+
+
+class RedisEventBroker:
+    """Broker backed by Redis Streams, shared by every worker using the same REDIS_URL."""
+
+    shared = True
+
+    def __init__(self, url, history=EVENT_HISTORY, prefix="phantomops:events:"):
+        import redis
+
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.history = history
+        self.prefix = prefix
+
+    def publish(self, topic, event_type, data):
+        return self.redis.xadd(
+            self.prefix + topic,
+            {"type": event_type, "data": json.dumps(data, default=str)},
+            maxlen=self.history,
+            approximate=True,
+        )
+
+    def last_id(self, topic):
+        newest = self.redis.xrevrange(self.prefix + topic, count=1)
+        return newest[0][0] if newest else "0-0"
+
+    def read(self, topic, last_id, timeout=15.0):
+        stream = self.prefix + topic
+        if not last_id or "-" not in last_id:
+            return [], True
+
+        # Resuming from an id older than the trimmed stream would silently skip events
+        oldest = self.redis.xrange(stream, count=1)
+        try:
+            if oldest and last_id != "0-0" and _stream_id_lt(last_id, oldest[0][0]):
+                return [], True
+        except ValueError:
+            return [], True
+
+        response = self.redis.xread({stream: last_id}, block=int(timeout * 1000), count=self.history)
+        events = []
+        for _, entries in response or []:
+            for event_id, fields in entries:
+                events.append({"id": event_id, "type": fields["type"], "data": json.loads(fields["data"])})
+        return events, False
+
+
+def _stream_id_lt(a, b):
+    a_ms, _, a_seq = a.partition("-")
+    b_ms, _, b_seq = b.partition("-")
+    return (int(a_ms), int(a_seq or 0)) < (int(b_ms), int(b_seq or 0))
+
+
+def _create_broker():
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        try:
+            broker = RedisEventBroker(redis_url)
+            broker.redis.ping()
+            print("✅ Event broker: Redis Streams")
+            return broker
+        except Exception as e:
+            print(f"⚠️ Redis event broker unavailable ({str(e)}), using in-process broker")
+    return LocalEventBroker()
+
+
+broker = _create_broker()
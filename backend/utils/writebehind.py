@@ -0,0 +1,405 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single worker owns the spool file
+    fcntl = None
+
+# =====================================
+# ✍️ Write-Behind Buffer with a Durable Spool
+# =====================================
+# Submissions are appended to a local spool file (one JSON line each) and to
+# an in-memory queue, then acknowledged right away. A background thread
+# flushes them to the database in batches, when `batch_size` rows are waiting
+# or `flush_seconds` after the oldest one arrived, whichever comes first.
+#
+# Each flushed batch appends an {"ack": [seq, ...]} line. On restart every
+# record without an ack is replayed, so a crash loses nothing. A crash between
+# the insert and its ack replays that batch once more, so delivery is at
+# least once. The spool is truncated whenever the queue drains.
+#
+# A batch rejected for its data (`is_permanent(error)`, e.g. a constraint) is
+# retried row by row, so one bad row never blocks the rest. A row that still
+# fails is moved to a dead-letter file (one JSON line with the row and the
+# error) when its error is permanent or when other rows of the same pass went
+# through. Any other failure (connection, 5xx) means the store is likely
+# down: the whole batch waits, with the delay doubling from `retry_seconds`
+# up to `max_retry_seconds`, instead of N+1 failing calls per cycle.
+#
+# The spool is opened (and unflushed rows replayed) by start(), or by the
+# first submit(), never at construction, so importing a module that defines
+# a buffer touches no files. Several worker processes each claim their own
+# spool file (path, path.1, ...) with an exclusive lock.
+
+MAX_SPOOL_SLOTS = 16
+LATENCY_SAMPLES = 200
+
+
+class QueueFullError(Exception):
+    """Raised by submit() when `max_pending` rows are already waiting."""
+
+
+class WriteBehindBuffer:
+    """Batching write-behind queue backed by an append-only spool file."""
+
+    def __init__(self, name, flush_fn, spool_path=None, batch_size=100, flush_seconds=1.0,
+                 max_pending=10000, fsync=False, retry_seconds=5.0, max_retry_seconds=60.0, is_permanent=None,
+                 dead_letter_path=None):
+        self.name = name
+        self.flush_fn = flush_fn  # called with a list of rows; raises on failure
+        self.is_permanent = is_permanent or (lambda error: False)
+        self.dead_letter_path = dead_letter_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max(max_retry_seconds, retry_seconds)
+
+        self._pending = deque()  # (seq, enqueued_at, row)
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._spool = None
+        self._spool_base = spool_path
+        self._started = False
+        self.spool_path = None
+
+        self.submitted = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.rejected = 0
+        self.recovered = 0
+        self.dead_lettered = 0
+        self.max_depth = 0
+        self._flush_latencies = deque(maxlen=LATENCY_SAMPLES)  # seconds per flush call
+        self._queue_latencies = deque(maxlen=LATENCY_SAMPLES)  # submit -> stored, oldest row of each batch
+
+    def start(self):
+        """Open the spool, replay its unflushed rows and start flushing them. Idempotent."""
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+            if self._spool_base:
+                self._open_spool(self._spool_base)
+            pending = bool(self._pending)
+        if pending:
+            self._ensure_thread()
+
+    # ---------- Spool file ----------
+
+    def _open_spool(self, base_path):
+        for slot in range(MAX_SPOOL_SLOTS if fcntl else 1):
+            path = base_path if slot == 0 else f"{base_path}.{slot}"
+            spool = _open_locked(path)
+            if spool is None:
+                continue  # owned by another worker
+            self._spool = spool
+            self.spool_path = path
+            self.dead_letter_path = self.dead_letter_path or f"{path}.dead"
+            self._recover()
+            return
+        print(f"⚠️ No free spool file for {self.name} near {base_path}; buffering in memory only")
+
+    def _recover(self):
+        """Queue every spooled row written after the last acknowledged flush."""
+        self._spool.seek(0)
+        records = []
+        acked = set()
+        for line in self._spool:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a crash mid-write
+            if "ack" in record:
+                acked.update(record["ack"])
+            elif "seq" in record:
+                records.append(record)
+
+        now = time.time()
+        pending = [record for record in records if record["seq"] not in acked]
+        self._seq = max([0] + list(acked) + [record["seq"] for record in records])
+        self._pending.extend((record["seq"], now, record["row"]) for record in pending)
+        self.recovered = len(pending)
+
+        # Start a clean spool holding only what still has to be written. The
+        # new file is complete and on disk before it replaces the old one, so
+        # a crash or full disk here leaves either spool intact.
+        temp_path = f"{self.spool_path}.tmp"
+        try:
+            spool = _open_locked(temp_path, mode="w")
+            if spool is None:
+                raise OSError(f"{temp_path} is locked by another process")
+            try:
+                for record in pending:
+                    spool.write(json.dumps(record, default=str) + "\n")
+                spool.flush()
+                os.fsync(spool.fileno())
+                if fcntl is None:
+                    self._spool.close()  # Windows cannot replace an open file
+                os.replace(temp_path, self.spool_path)
+            except BaseException:
+                spool.close()
+                raise
+        except OSError as e:
+            # Keep appending to the old spool; its acks still describe it correctly
+            print(f"⚠️ Could not compact {self.spool_path} ({str(e)}), keeping it as is")
+            if self._spool.closed:
+                self._spool = _open_locked(self.spool_path)
+            else:
+                self._spool.seek(0, os.SEEK_END)
+        else:
+            # The locked temp file handle now is the spool; the old one (and its lock) can go
+            if not self._spool.closed:
+                self._spool.close()
+            self._spool = spool
+            _sync_directory(self.spool_path)
+        if pending:
+            print(f"♻️ Recovered {len(pending)} unflushed {self.name} rows from {self.spool_path}")
+
+    def _append(self, record):
+        if self._spool is not None and not self._spool.closed:
+            self._spool.write(json.dumps(record, default=str) + "\n")
+            self._sync()
+
+    def _sync(self):
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+
+    # ---------- Producer ----------
+
+    def submit(self, row):
+        """Spool and queue one row. Raises QueueFullError when the buffer is full."""
+        self.start()
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                raise QueueFullError(f"{self.name} buffer is full ({self.max_pending} rows waiting)")
+
+            self._seq += 1
+            self._append({"seq": self._seq, "row": row})
+            self._pending.append((self._seq, time.time(), row))
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._pending))
+            # First row starts the flush timer; a full batch flushes right away
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        # Started lazily so importing the module never spawns threads
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+                    self._thread.start()
+
+    # ---------- Flusher ----------
+
+    def _next_batch(self):
+        """Wait for a size or time trigger; returns the batch to write (oldest first)."""
+        with self._cond:
+            while True:
+                if len(self._pending) >= self.batch_size:
+                    break
+                if self._pending:
+                    remaining = self._pending[0][1] + self.flush_seconds - time.time()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+            return [self._pending[i] for i in range(min(self.batch_size, len(self._pending)))]
+
+    def _run(self):
+        delay = self.retry_seconds
+        while True:
+            batch = self._next_batch()
+            started = time.monotonic()
+            try:
+                self.flush_fn([row for _, _, row in batch])
+                stored, dead = batch, []
+            except Exception as e:
+                with self._cond:
+                    self.failed_flushes += 1
+                if not self.is_permanent(e):
+                    # Connection trouble or a server error: per-row retries would only fail N more times
+                    print(f"⚠️ {self.name} store unavailable ({str(e)}), retrying {len(batch)} rows in {delay:g}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_seconds)
+                    continue
+                print(f"⚠️ {self.name} flush of {len(batch)} rows rejected ({str(e)}), retrying row by row")
+                stored, dead = self._flush_rows(batch)
+                if not stored and not dead:
+                    print(f"⚠️ {self.name} store unavailable, retrying in {delay:g}s")
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_retry_seconds)
+                    continue
+            delay = self.retry_seconds
+
+            finished = time.monotonic()
+            # Disk trouble here (full disk, permissions) must not kill the flusher
+            try:
+                self._write_dead_letters(dead)
+            except Exception as e:
+                with self._cond:
+                    self.failed_flushes += 1
+                print(f"⚠️ {self.name} could not write dead letters ({str(e)}), keeping {len(dead)} rows queued")
+                dead, backoff = [], True
+            else:
+                backoff = False
+
+            with self._cond:
+                try:
+                    self._remove([entry[0] for entry in stored] + [entry[0] for entry, _ in dead])
+                except Exception as e:
+                    # The rows are written; without the ack they are replayed once more after a restart
+                    self.failed_flushes += 1
+                    print(f"⚠️ {self.name} could not ack {len(stored) + len(dead)} rows in {self.spool_path} ({str(e)})")
+                self.flushed += len(stored)
+                self.dead_lettered += len(dead)
+                if stored:
+                    self.batches += 1
+                    self._flush_latencies.append(finished - started)
+                    self._queue_latencies.append(time.time() - stored[0][1])
+            if backoff:
+                time.sleep(self.retry_seconds)
+
+    def _flush_rows(self, batch):
+        """Insert a failed batch one row at a time. Returns (stored, [(entry, error), ...] to dead-letter)."""
+        stored, failed = [], []
+        for entry in batch:
+            try:
+                self.flush_fn([entry[2]])
+                stored.append(entry)
+            except Exception as e:
+                failed.append((entry, e))
+        # Other rows going through means the failures are about the rows themselves
+        dead = [(entry, e) for entry, e in failed if stored or self.is_permanent(e)]
+        return stored, dead
+
+    def _remove(self, seqs):
+        """Drop written (or dead-lettered) rows from the queue and ack them in the spool."""
+        if not seqs:
+            return
+        done = set(seqs)
+        self._pending = deque(entry for entry in self._pending if entry[0] not in done)
+        self._append({"ack": sorted(done)})
+        if not self._pending and self._spool is not None:
+            self._spool.seek(0)
+            self._spool.truncate()
+
+    def _write_dead_letters(self, dead):
+        if dead and self.dead_letter_path:
+            self._append_dead_letters(dead)
+        for (seq, _, row), error in dead:
+            print(f"☠️ {self.name} row {seq} rejected ({str(error)}), moved to dead letters")
+
+    def _append_dead_letters(self, dead):
+        failed_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with open(self.dead_letter_path, "a", encoding="utf-8") as dead_letters:
+            for (seq, _, row), error in dead:
+                dead_letters.write(json.dumps({"row": row, "error": str(error), "failed_at": failed_at}, default=str) + "\n")
+            dead_letters.flush()
+            if self.fsync:
+                os.fsync(dead_letters.fileno())
+
+    def flush(self, timeout=10.0):
+        """Wake the flusher and wait until the queue drains (used on shutdown/tests)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._cond:
+                if not self._pending:
+                    return True
+                self._cond.notify()
+            time.sleep(0.05)
+        return False
+
+    # ---------- Metrics ----------
+
+    def stats(self):
+        with self._cond:
+            depth = len(self._pending)
+            oldest_age = time.time() - self._pending[0][1] if depth else 0.0
+            flush_latencies = sorted(self._flush_latencies)
+            queue_latencies = sorted(self._queue_latencies)
+            return {
+                "name": self.name,
+                "depth": depth,
+                "max_depth": self.max_depth,
+                "max_pending": self.max_pending,
+                "oldest_pending_seconds": round(oldest_age, 3),
+                "submitted": self.submitted,
+                "flushed": self.flushed,
+                "batches": self.batches,
+                "failed_flushes": self.failed_flushes,
+                "rejected": self.rejected,
+                "recovered": self.recovered,
+                "dead_lettered": self.dead_lettered,
+                "dead_letter_path": self.dead_letter_path,
+                "batch_size": self.batch_size,
+                "flush_seconds": self.flush_seconds,
+                "spool_path": self.spool_path,
+                "flush_latency_ms": _latency_summary(flush_latencies),
+                "queue_latency_ms": _latency_summary(queue_latencies),
+            }
+
+
+def _open_locked(path, mode="a+"):
+    """Open `path` under an exclusive lock, or return None if another process holds it."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    while True:
+        spool = open(path, mode, encoding="utf-8")
+        if fcntl is None:
+            return spool
+        try:
+            fcntl.flock(spool.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            spool.close()
+            return None
+        # The owner may have replaced the file between our open and our lock
+        try:
+            current = os.stat(path)
+        except FileNotFoundError:
+            current = None
+        opened = os.fstat(spool.fileno())
+        if current is not None and (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino):
+            return spool
+        spool.close()
+
+
+def _sync_directory(path):
+    """fsync the directory holding `path` so a rename survives power loss (POSIX only)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _latency_summary(samples):
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+
+    def percentile(q):
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)] * 1000
+
+    return {"p50": round(percentile(0.5), 2), "p95": round(percentile(0.95), 2), "max": round(samples[-1] * 1000, 2)}
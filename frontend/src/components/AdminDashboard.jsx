@@ -1,6 +1,7 @@
 import { useEffect, useState } from "react";
 import Swal from "sweetalert2";
 import { apiClient } from "../utils/apiClient";
+import { subscribeToIncidents } from "../utils/incidentStream";
 import LogoutButton from "./LogoutButton";
 import EnrichmentPanel from "./EnrichmentPanel";
 import "../styles/halloween.css";
@@ -12,20 +13,47 @@ const AdminDashboard = () => {
     severity: "all",
     status: "all",
   });
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true); // ✅ Added loading state
   const [selectedIncident, setSelectedIncident] = useState(null);
+  const [selectedIds, setSelectedIds] = useState([]);
   const [showEnrichmentPanel, setShowEnrichmentPanel] = useState(false);
 
-  // ✅ Fetch incidents from Flask backend
-  const fetchIncidents = async () => {
+  // ✅ Fetch a page of incidents from Flask backend (filters applied server-side)
+  const fetchIncidents = async (cursor = null) => {
+    const params = { limit: 100 };
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== "all") params[key] = value;
+    });
+    if (cursor) params.cursor = cursor;
+
     try {
-      const res = await apiClient.get("/api/incidents");
-      setIncidents(res.data.incidents || []);
+      const res = await apiClient.get("/api/incidents", { params });
+      const page = res.data.incidents || [];
+      setIncidents((prev) => (cursor ? [...prev, ...page] : page));
+      setNextCursor(res.data.next_cursor || null);
     } catch (err) {
       console.error("❌ Error fetching incidents:", err.response?.data || err.message);
     }
   };
 
+  // ✅ Merge changed rows into the list, dropping ones that no longer match the filters
+  const matchesFilters = (i) =>
+    (filters.type === "all" || i.type === filters.type) &&
+    (filters.severity === "all" || i.severity === parseInt(filters.severity)) &&
+    (filters.status === "all" || i.status === filters.status);
+
+  const applyUpdates = (rows) => {
+    setIncidents((prev) =>
+      prev
+        .map((i) => {
+          const row = rows.find((r) => r.id === i.id);
+          return row ? { ...i, ...row } : i;
+        })
+        .filter(matchesFilters)
+    );
+  };
+
   // ✅ Resolve incident via Flask route
   const resolveIncident = async (id) => {
     const confirm = await Swal.fire({
@@ -41,15 +69,48 @@ const AdminDashboard = () => {
 
     if (confirm.isConfirmed) {
       try {
-        await apiClient.patch(`/api/incidents/${id}/resolve`);
+        const res = await apiClient.patch(`/api/incidents/${id}/resolve`);
         Swal.fire("✅ Resolved!", "Incident marked as resolved.", "success");
-        fetchIncidents();
+        applyUpdates(res.data.data || []);
       } catch (err) {
         Swal.fire("❌ Error", err.response?.data?.error || "Failed to resolve.", "error");
       }
     }
   };
 
+  // ✅ Resolve every checked incident with one batch request
+  const resolveSelected = async () => {
+    const confirm = await Swal.fire({
+      title: `Resolve ${selectedIds.length} incident(s)?`,
+      text: "All selected incidents will be marked as resolved.",
+      icon: "question",
+      showCancelButton: true,
+      confirmButtonColor: "#22c55e",
+      cancelButtonColor: "#ef4444",
+      background: "#0f172a",
+      color: "#fff",
+    });
+
+    if (confirm.isConfirmed) {
+      try {
+        const res = await apiClient.patch("/api/incidents/status", {
+          status: "resolved",
+          ids: selectedIds,
+        });
+        const changed = res.data.data || [];
+        Swal.fire("✅ Resolved!", `${changed.length} incident(s) marked as resolved.`, "success");
+        applyUpdates(changed);
+        setSelectedIds([]);
+      } catch (err) {
+        Swal.fire("❌ Error", err.response?.data?.error || "Failed to resolve.", "error");
+      }
+    }
+  };
+
+  const toggleSelected = (id) => {
+    setSelectedIds((prev) => (prev.includes(id) ? prev.filter((s) => s !== id) : [...prev, id]));
+  };
+
   // ✅ Handle incident click to open enrichment panel
   const handleIncidentClick = (incident) => {
     setSelectedIncident(incident);
@@ -62,14 +123,26 @@ const AdminDashboard = () => {
     setShowEnrichmentPanel(false);
   };
 
-  // ✅ Load incidents on mount
+  // ✅ Load incidents on mount and whenever filters change
   useEffect(() => {
     const fetchData = async () => {
       await fetchIncidents();
       setLoading(false);
     };
     fetchData();
-  }, []);
+  }, [filters]);
+
+  // ✅ Live updates: apply streamed inserts/updates instead of refetching
+  useEffect(() => {
+    return subscribeToIncidents({
+      onInsert: (row) => {
+        if (!matchesFilters(row)) return;
+        setIncidents((prev) => (prev.some((i) => i.id === row.id) ? prev : [row, ...prev]));
+      },
+      onUpdate: (row) => applyUpdates([row]),
+      onReset: () => fetchIncidents(),
+    });
+  }, [filters]);
 
   // ✅ Show loading message until data is fetched
   if (loading) {
@@ -88,14 +161,8 @@ const AdminDashboard = () => {
     );
   }
 
-  // 🎛️ Apply filters
-  const filtered = incidents.filter((i) => {
-    return (
-      (filters.type === "all" || i.type === filters.type) &&
-      (filters.severity === "all" || i.severity === parseInt(filters.severity)) &&
-      (filters.status === "all" || i.status === filters.status)
-    );
-  });
+  // 🎛️ Filters are applied by the backend query
+  const filtered = incidents;
 
   return (
     <div style={{ minHeight: "100vh", padding: "2rem", position: "relative" }}>
@@ -163,6 +230,12 @@ const AdminDashboard = () => {
           <option value="acknowledged">🟡 Acknowledged</option>
           <option value="resolved">🟢 Resolved</option>
         </select>
+
+        {selectedIds.length > 0 && (
+          <button onClick={resolveSelected} className="halloween-button-danger">
+            ✅ Banish selected ({selectedIds.length})
+          </button>
+        )}
       </div>
 
       {/* 📋 Incident Table */}
@@ -171,6 +244,7 @@ const AdminDashboard = () => {
         <table style={{ width: "100%", borderCollapse: "collapse" }}>
           <thead>
             <tr>
+              <th></th>
               <th>🆔 ID</th>
               <th>👤 Name</th>
               <th>📍 Type</th>
@@ -182,7 +256,7 @@ const AdminDashboard = () => {
           <tbody>
             {filtered.length === 0 ? (
               <tr>
-                <td colSpan="6" style={{ padding: "3rem", textAlign: "center" }}>
+                <td colSpan="7" style={{ padding: "3rem", textAlign: "center" }}>
                   <div style={{ fontSize: "3rem", marginBottom: "1rem" }}>👻</div>
                   <div style={{ color: "var(--halloween-orange)" }}>
                     No spirits detected... yet
@@ -196,6 +270,15 @@ const AdminDashboard = () => {
                   onClick={() => handleIncidentClick(i)}
                   className="ghost-hover"
                 >
+                  <td style={{ textAlign: "center" }} onClick={(e) => e.stopPropagation()}>
+                    {i.status !== "resolved" && (
+                      <input
+                        type="checkbox"
+                        checked={selectedIds.includes(i.id)}
+                        onChange={() => toggleSelected(i.id)}
+                      />
+                    )}
+                  </td>
                   <td style={{ textAlign: "center" }}>#{i.id}</td>
                   <td style={{ textAlign: "center" }}>{i.name}</td>
                   <td style={{ textAlign: "center" }}>
@@ -238,6 +321,15 @@ const AdminDashboard = () => {
         </table>
       </div>
 
+      {/* ⏬ Next page */}
+      {nextCursor && (
+        <div style={{ textAlign: "center", marginTop: "1.5rem" }}>
+          <button onClick={() => fetchIncidents(nextCursor)} className="halloween-button">
+            👻 Load more
+          </button>
+        </div>
+      )}
+
       {/* 🔍 Enrichment Panel Modal */}
       {showEnrichmentPanel && selectedIncident && (
         <EnrichmentPanel
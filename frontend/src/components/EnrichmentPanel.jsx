@@ -26,6 +26,32 @@ const EnrichmentPanel = ({ incidentId, onClose, incidentData }) => {
   const fetchEnrichmentData = async () => {
     setLoading(true);
     setError(null);
+    setEnrichmentData(null);
+
+    // Sources arrive one NDJSON line at a time; show each as soon as it lands
+    let consumed = 0;
+    const applyLines = (text) => {
+      const lines = text.slice(consumed).split("\n");
+      const complete = lines.slice(0, -1);
+      consumed += complete.reduce((total, line) => total + line.length + 1, 0);
+
+      complete.filter(Boolean).forEach((line) => {
+        const message = JSON.parse(line);
+        setEnrichmentData((prev) => {
+          const current = prev || { reddit_posts: [], weather_data: null, news_items: [], errors: {}, pending: ["reddit", "weather", "news"] };
+          if (message.done) {
+            return { ...current, errors: message.errors || {}, pending: [] };
+          }
+          return {
+            ...current,
+            [message.key]: message.data,
+            errors: message.error ? { ...current.errors, [message.source]: message.error } : current.errors,
+            pending: current.pending.filter((source) => source !== message.source),
+          };
+        });
+        setLoading(false);
+      });
+    };
     
     try {
       // Create timeout promise
@@ -34,10 +60,17 @@ const EnrichmentPanel = ({ incidentId, onClose, incidentData }) => {
       );
       
       // Race between API call and timeout
-      const apiPromise = apiClient.get(`/api/incidents/${incidentId}/enrich`);
+      const apiPromise = apiClient.get(`/api/incidents/${incidentId}/enrich`, {
+        params: { stream: "ndjson" },
+        responseType: "text",
+        onDownloadProgress: (progressEvent) => {
+          const text = progressEvent.event?.target?.responseText;
+          if (text) applyLines(text);
+        },
+      });
       const response = await Promise.race([apiPromise, timeoutPromise]);
       
-      setEnrichmentData(response.data);
+      applyLines(typeof response.data === "string" ? response.data : "");
       setLoading(false);
     } catch (err) {
       console.error("Error fetching enrichment data:", err);
@@ -152,6 +185,13 @@ const EnrichmentPanel = ({ incidentId, onClose, incidentData }) => {
           </div>
         )}
 
+        {/* Sources still on their way */}
+        {!loading && enrichmentData?.pending?.length > 0 && (
+          <div style={{ padding: "0.75rem 1.5rem 0", color: "var(--halloween-ghost-white)", opacity: 0.7 }}>
+            ⏳ Still summoning: {enrichmentData.pending.join(", ")}...
+          </div>
+        )}
+
         {/* Content Grid */}
         {!loading && enrichmentData && (
           <div
@@ -3,11 +3,14 @@ import { apiClient } from "../utils/apiClient";
 import Swal from "sweetalert2";
 import "../styles/balanced-halloween.css";
 
+const NEARBY_RADIUS_KM = 10;
+
 const EscapeRoutes = ({ initialLocation, autoSearch }) => {
   const [escapeData, setEscapeData] = useState(null);
   const [loading, setLoading] = useState(false);
   const [location, setLocation] = useState({ latitude: "", longitude: "" });
   const [error, setError] = useState(null);
+  const [nearbyIncidents, setNearbyIncidents] = useState([]);
 
   // Sync location state with props and trigger automatic search
   useEffect(() => {
@@ -104,6 +107,20 @@ const EscapeRoutes = ({ initialLocation, autoSearch }) => {
     return { valid: true };
   };
 
+  // Active incidents around the searched point, ranked by distance on the server
+  const fetchNearbyIncidents = async (lat, lon) => {
+    try {
+      const response = await apiClient.get("/api/incidents/nearby", {
+        params: { lat, lon, radius: NEARBY_RADIUS_KM, status: "active", limit: 20 },
+      });
+      setNearbyIncidents(response.data.incidents || []);
+    } catch (err) {
+      // Safety resources are the priority; a failed incident lookup just hides the list
+      console.error("Failed to fetch nearby incidents:", err);
+      setNearbyIncidents([]);
+    }
+  };
+
   const fetchEscapeRoutes = async (lat, lon) => {
     // Validate coordinates before making API call
     const validation = validateCoordinates(lat, lon);
@@ -122,6 +139,7 @@ const EscapeRoutes = ({ initialLocation, autoSearch }) => {
     
     setLoading(true);
     setError(null);
+    fetchNearbyIncidents(lat, lon);
     
     try {
       const response = await apiClient.get(`/api/escape-routes?latitude=${lat}&longitude=${lon}`);
@@ -447,6 +465,41 @@ const EscapeRoutes = ({ initialLocation, autoSearch }) => {
         </div>
       )}
 
+      {/* Nearby Active Incidents */}
+      {!loading && escapeData && (
+        <div className="professional-card" style={{ padding: "1.5rem", marginTop: "1.5rem" }}>
+          <h3 style={{ color: "#f59e0b", fontSize: "1.2rem", marginBottom: "1rem", display: "flex", alignItems: "center", gap: "0.5rem" }}>
+            🚨 Active Incidents Nearby
+          </h3>
+          {nearbyIncidents.length > 0 ? (
+            <div style={{ display: "flex", flexDirection: "column", gap: "0.75rem" }}>
+              {nearbyIncidents.map((incident) => (
+                <div
+                  key={incident.id}
+                  style={{
+                    background: "rgba(245, 158, 11, 0.1)",
+                    border: "1px solid rgba(245, 158, 11, 0.3)",
+                    borderRadius: "8px",
+                    padding: "1rem",
+                  }}
+                >
+                  <div style={{ fontWeight: "600", color: "#fcd34d", marginBottom: "0.25rem" }}>
+                    {incident.name}
+                  </div>
+                  <div style={{ fontSize: "0.85rem", color: "#9ca3af" }}>
+                    {incident.type} · severity {incident.severity} · 📍 {incident.distance_km.toFixed(1)} km away
+                  </div>
+                </div>
+              ))}
+            </div>
+          ) : (
+            <p style={{ color: "#64748b" }}>
+              No active incidents reported within {NEARBY_RADIUS_KM}km of this location.
+            </p>
+          )}
+        </div>
+      )}
+
       {/* Initial State */}
       {!loading && !escapeData && (
         <div style={{ textAlign: "center", padding: "3rem", color: "#9ca3af" }}>
@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import { supabase } from "../utils/supabaseClient";
 import { apiClient } from "../utils/apiClient";
+import { subscribeToIncidents } from "../utils/incidentStream";
 import Swal from "sweetalert2";
 import LogoutButton from "./LogoutButton";
 import EscapeRoutes from "./EscapeRoutes";
@@ -8,6 +9,7 @@ import "../styles/balanced-halloween.css";
 
 const UserDashboard = () => {
   const [incidents, setIncidents] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showReportForm, setShowReportForm] = useState(false);
   const [formData, setFormData] = useState({
@@ -32,14 +34,17 @@ const UserDashboard = () => {
     return user;
   };
 
-  // Fetch user's own incidents
-  const fetchMyIncidents = async () => {
+  // Fetch a page of the user's own incidents
+  const fetchMyIncidents = async (cursor = null) => {
     try {
       const user = await getCurrentUser();
-      const res = await apiClient.get("/api/incidents");
-      // Filter to show only user's own incidents
-      const myIncidents = res.data.incidents?.filter(i => i.user_id === user.id) || [];
-      setIncidents(myIncidents);
+      // Only the user's own incidents are requested (filtered server-side)
+      const params = { user_id: user.id, limit: 100 };
+      if (cursor) params.cursor = cursor;
+      const res = await apiClient.get("/api/incidents", { params });
+      const page = res.data.incidents || [];
+      setIncidents((prev) => (cursor ? [...prev, ...page] : page));
+      setNextCursor(res.data.next_cursor || null);
     } catch (err) {
       console.error("Error fetching incidents:", err);
     } finally {
@@ -51,6 +56,23 @@ const UserDashboard = () => {
     fetchMyIncidents();
   }, []);
 
+  // Apply incident changes as they happen instead of refetching the list
+  useEffect(() => {
+    let userId = null;
+    getCurrentUser().then((user) => { userId = user?.id; });
+
+    return subscribeToIncidents({
+      onInsert: (row) => {
+        if (row.user_id !== userId) return;
+        setIncidents((prev) => (prev.some((i) => i.id === row.id) ? prev : [row, ...prev]));
+      },
+      onUpdate: (row) => {
+        setIncidents((prev) => prev.map((i) => (i.id === row.id ? { ...i, ...row } : i)));
+      },
+      onReset: () => fetchMyIncidents(),
+    });
+  }, []);
+
   // Get user's current location
   const getCurrentLocation = () => {
     if (navigator.geolocation) {
@@ -148,12 +170,21 @@ const UserDashboard = () => {
         status: "active",
       };
 
-      await apiClient.post("/api/incidents", incidentData);
+      const res = await apiClient.post("/api/incidents", incidentData);
+      // A near-duplicate is counted on the existing incident instead of creating a new one
+      const linked = res.data.duplicate_of != null;
+      if (!linked) {
+        // Show the new incident right away (the stream event is de-duplicated by id)
+        const created = res.data.data || [];
+        setIncidents((prev) => [...created.filter((c) => !prev.some((i) => i.id === c.id)), ...prev]);
+      }
 
       Swal.fire({
         icon: "success",
-        title: "Incident Reported",
-        text: "Your incident has been reported successfully!",
+        title: linked ? "Already Reported" : "Incident Reported",
+        text: linked
+          ? "This incident was already reported nearby. Your report has been added to it."
+          : "Your incident has been reported successfully!",
         background: "#1a1f2e",
         color: "#e5e7eb",
         confirmButtonColor: "#10b981",
@@ -169,7 +200,6 @@ const UserDashboard = () => {
         severity: 3,
       });
       setShowReportForm(false);
-      fetchMyIncidents();
     } catch (err) {
       Swal.fire({
         icon: "error",
@@ -415,6 +445,15 @@ const UserDashboard = () => {
             </table>
           </div>
         )}
+
+        {/* Next page */}
+        {nextCursor && (
+          <div style={{ textAlign: "center", marginTop: "1.5rem" }}>
+            <button onClick={() => fetchMyIncidents(nextCursor)} className="halloween-button">
+              👻 Load more
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,51 @@
+import { apiClient } from "./apiClient";
+import { supabase } from "./supabaseClient";
+
+// ✅ Subscribe to incident change events (Server-Sent Events)
+// EventSource cannot send an Authorization header, so the JWT goes in the query string.
+// Handlers: onInsert(row), onUpdate(row), onReset() — onReset means "refetch the list".
+export const subscribeToIncidents = ({ onInsert, onUpdate, onReset }) => {
+  let source = null;
+  let closed = false;
+  let lastEventId = null;
+
+  const connect = async () => {
+    const { data } = await supabase.auth.getSession();
+    const token = data?.session?.access_token;
+    if (!token || closed) return;
+
+    const params = new URLSearchParams({ access_token: token });
+    // Resume where the previous connection stopped
+    if (lastEventId) params.set("last_event_id", lastEventId);
+
+    source = new EventSource(`${apiClient.defaults.baseURL}/api/incidents/stream?${params}`);
+
+    const track = (handler) => (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      handler?.(JSON.parse(event.data));
+    };
+    source.addEventListener("insert", track(onInsert));
+    source.addEventListener("update", track(onUpdate));
+    source.addEventListener("reset", (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      onReset?.();
+    });
+
+    // Token expired or connection refused: reconnect with a fresh token
+    const reconnect = () => {
+      source?.close();
+      if (!closed) setTimeout(connect, 3000);
+    };
+    source.addEventListener("expired", reconnect);
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) reconnect();
+    };
+  };
+
+  connect();
+
+  return () => {
+    closed = true;
+    source?.close();
+  };
+};